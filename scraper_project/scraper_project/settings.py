@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -142,6 +143,56 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Cola de jobs (scrapers/jobs.py, la ejecuta `manage.py run_worker`)
+JOB_CONCURRENCIA_DEFAULT = int(os.environ.get('JOB_CONCURRENCIA_DEFAULT', 1))
+JOB_CONCURRENCIA_POR_TIENDA = {}
+# Cada cuánto el proceso que corre un job actualiza heartbeat_at, y cuánto sin latido
+# hace falta para darlo por muerto (worker caído) y liberar su lugar en la tienda
+JOB_LATIDO_SEGUNDOS = int(os.environ.get('JOB_LATIDO_SEGUNDOS', 60))
+JOB_SIN_LATIDO_MINUTOS = int(os.environ.get('JOB_SIN_LATIDO_MINUTOS', 10))
+
+# Spans OTLP/JSON en outputs/<store>/trazas_<run_id>.jsonl (scrapers/trazas.py)
+TRAZAS_ACTIVAS = os.environ.get('TRAZAS_ACTIVAS', '0') == '1'
+
+# Alertas (scrapers/alertas.py). Backend "slack" o "stub"; por defecto slack si hay SLACK_BOT_TOKEN
+ALERTAS_BACKEND = os.environ.get('ALERTAS_BACKEND')
+ALERTAS_MODO = os.environ.get('ALERTAS_MODO', 'inmediato')
+ALERTAS_VENTANA_SEGUNDOS = int(os.environ.get('ALERTAS_VENTANA_SEGUNDOS', 60))
+ALERTAS_MAX_POR_MINUTO = int(os.environ.get('ALERTAS_MAX_POR_MINUTO', 20))
+ALERTAS_DIGEST_SEGUNDOS = int(os.environ.get('ALERTAS_DIGEST_SEGUNDOS', 300))
+
+# Categorías y colores para clasificar productos (scrapers/taxonomia.py)
+TAXONOMIA_PATH = os.environ.get('TAXONOMIA_PATH', str(BASE_DIR / 'scrapers' / 'taxonomia.json'))
+
+# Selectores CSS por tienda que usan los parsear_producto (scrapers/selectores.py)
+SELECTORES_PATH = os.environ.get('SELECTORES_PATH', str(BASE_DIR / 'scrapers' / 'selectores.json'))
+
+# Ritmo por dominio (scrapers/ritmo.py): token bucket de pedidos por segundo y concurrencia
+# AIMD entre MIN y MAX (o la cantidad de drivers del pool). RITMO_POR_DOMINIO pisa valores
+# por host, p. ej. '{"www.dashdeportes.com.ar": {"rps": 1, "max": 6}}' ("*" para todos)
+RITMO_RPS = float(os.environ.get('RITMO_RPS', 2))
+RITMO_RAFAGA = int(os.environ.get('RITMO_RAFAGA', 4))
+RITMO_CONCURRENCIA_MIN = int(os.environ.get('RITMO_CONCURRENCIA_MIN', 1))
+RITMO_CONCURRENCIA_INICIAL = int(os.environ.get('RITMO_CONCURRENCIA_INICIAL', 2))
+RITMO_CONCURRENCIA_MAX = int(os.environ.get('RITMO_CONCURRENCIA_MAX', 8))
+RITMO_LATENCIA_TOLERANCIA = float(os.environ.get('RITMO_LATENCIA_TOLERANCIA', 2.0))
+RITMO_POR_DOMINIO = json.loads(os.environ.get('RITMO_POR_DOMINIO', '{}'))
+
+# Reintentos por ítem en los scrapers producto por producto (scrapers/reintentos.py):
+# intentos totales y backoff exponencial con jitter entre 0 y BASE·2^n segundos, hasta TOPE
+REINTENTOS_MAX = int(os.environ.get('REINTENTOS_MAX', 3))
+REINTENTOS_BASE_SEGUNDOS = float(os.environ.get('REINTENTOS_BASE_SEGUNDOS', 2))
+REINTENTOS_TOPE_SEGUNDOS = float(os.environ.get('REINTENTOS_TOPE_SEGUNDOS', 60))
+
+# Circuit breaker de la creación de drivers remotos (scrapers/circuito.py): se abre tras UMBRAL
+# fallas seguidas y sondea pasado el enfriamiento, que se duplica con cada sondeo fallido hasta MAX.
+# Con el circuito abierto se usan hasta CIRCUITO_RESPALDO_LOCAL drivers locales (0 = fallar rápido)
+CIRCUITO_UMBRAL = int(os.environ.get('CIRCUITO_UMBRAL', 3))
+CIRCUITO_ENFRIAMIENTO_SEGUNDOS = float(os.environ.get('CIRCUITO_ENFRIAMIENTO_SEGUNDOS', 30))
+CIRCUITO_ENFRIAMIENTO_MAX_SEGUNDOS = float(os.environ.get('CIRCUITO_ENFRIAMIENTO_MAX_SEGUNDOS', 300))
+CIRCUITO_RESPALDO_LOCAL = int(os.environ.get('CIRCUITO_RESPALDO_LOCAL', 0))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -16,8 +16,10 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from scrapers.views import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('scrapers.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
@@ -0,0 +1,206 @@
+import atexit
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SLACK_TOKEN = os.getenv("SLACK_BOT_TOKEN")
+SLACK_ALERT_USERS = os.getenv("SLACK_ALERT_USERS", "")
+
+# "slack" o "stub" (escribe en outputs/alertas_stub.log, para correr sin red)
+BACKEND = getattr(settings, "ALERTAS_BACKEND", None) or ("slack" if SLACK_TOKEN else "stub")
+# "inmediato": se manda cada alerta (con coalescing y rate limit); "digest": un resumen cada N segundos
+MODO = getattr(settings, "ALERTAS_MODO", "inmediato")
+# Alertas iguales (salvo números) dentro de esta ventana se agrupan en una sola
+VENTANA_SEGUNDOS = getattr(settings, "ALERTAS_VENTANA_SEGUNDOS", 60)
+MAX_POR_MINUTO = getattr(settings, "ALERTAS_MAX_POR_MINUTO", 20)
+DIGEST_SEGUNDOS = getattr(settings, "ALERTAS_DIGEST_SEGUNDOS", 300)
+# Líneas máximas de un digest
+MAX_LINEAS_DIGEST = 30
+TIMEOUT_FLUSH = 15
+
+PATRON_NUMEROS = re.compile(r"\d+")
+
+
+def clave_mensaje(mensaje):
+    """'[ScraperDash_3] ... ítem 812' y '[ScraperDash_1] ... ítem 90' son la misma alerta."""
+    return PATRON_NUMEROS.sub("#", mensaje)
+
+
+class BackendSlack:
+    def __init__(self, token=SLACK_TOKEN, usuarios=SLACK_ALERT_USERS):
+        from slack_sdk import WebClient
+
+        self.client = WebClient(token=token)
+        self.usuarios = [uid.strip() for uid in usuarios.split(",") if uid.strip()]
+
+    def enviar(self, texto):
+        from slack_sdk.errors import SlackApiError
+
+        for user_id in self.usuarios:
+            try:
+                self.client.chat_postMessage(channel=user_id, text=texto)
+                print(f"✅ Alerta enviada a usuario: {user_id}")
+            except SlackApiError as e:
+                print(f"❌ Error al enviar alerta a Slack: {e.response['error']}")
+
+
+class BackendStub:
+    def __init__(self, path="outputs/alertas_stub.log"):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def enviar(self, texto):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {texto}\n")
+        print(f"📭 Alerta (stub): {texto}")
+
+
+class DespachadorAlertas:
+    """
+    Manda las alertas desde un hilo propio: enviar() solo encola, así los hilos
+    de scraping nunca esperan a Slack.
+
+    - Coalescing: una alerta repetida (misma clave_mensaje) dentro de VENTANA_SEGUNDOS
+      se cuenta y al cerrar la ventana se manda una sola línea con la cantidad.
+    - Rate limit: como mucho MAX_POR_MINUTO mensajes por minuto; lo que sobra
+      se junta en un digest que sale cuando vuelve a haber cupo.
+    - Modo digest: todo se acumula y sale un resumen cada DIGEST_SEGUNDOS.
+    """
+    def __init__(self, backend, modo=MODO, ventana=VENTANA_SEGUNDOS,
+                 max_por_minuto=MAX_POR_MINUTO, intervalo_digest=DIGEST_SEGUNDOS):
+        self.backend = backend
+        self.modo = modo
+        self.ventana = ventana
+        self.max_por_minuto = max_por_minuto
+        self.intervalo_digest = intervalo_digest
+        self.cola = queue.Queue()
+        self.repetidas = {}
+        self.envios = deque()
+        self.digest = []
+        self.ultimo_digest = time.monotonic()
+        self.hilo = threading.Thread(target=self._loop, name="AlertasSlack", daemon=True)
+        self.hilo.start()
+
+    def enviar(self, mensaje):
+        self.cola.put(mensaje)
+
+    def flush(self, timeout=TIMEOUT_FLUSH):
+        """Manda lo pendiente (repetidas y digest) y espera a que salga, hasta `timeout`."""
+        listo = threading.Event()
+        self.cola.put(listo)
+        return listo.wait(timeout)
+
+    def _loop(self):
+        while True:
+            try:
+                elemento = self.cola.get(timeout=1)
+            except queue.Empty:
+                elemento = None
+
+            try:
+                if isinstance(elemento, threading.Event):
+                    self._vaciar()
+                    elemento.set()
+                elif elemento is not None:
+                    self._procesar(elemento)
+                self._vencimientos()
+            except Exception as e:
+                logger.error(f"❌ Error en el despachador de alertas: {e}")
+
+    def _procesar(self, mensaje):
+        clave = clave_mensaje(mensaje)
+        ahora = time.monotonic()
+        repetida = self.repetidas.get(clave)
+        if repetida and ahora - repetida["desde"] < self.ventana:
+            repetida["cantidad"] += 1
+            repetida["ultimo"] = mensaje
+            return
+        self.repetidas[clave] = {"desde": ahora, "cantidad": 0, "ultimo": mensaje}
+        self._salida(mensaje)
+
+    def _resumen_repetida(self, repetida):
+        return (
+            f"🔁 {repetida['cantidad']} alertas similares más en {self.ventana}s. "
+            f"Última: {repetida['ultimo']}"
+        )
+
+    def _vencimientos(self):
+        ahora = time.monotonic()
+        for clave, repetida in list(self.repetidas.items()):
+            if ahora - repetida["desde"] >= self.ventana:
+                del self.repetidas[clave]
+                if repetida["cantidad"]:
+                    self._salida(self._resumen_repetida(repetida))
+
+        if self.modo == "digest":
+            if ahora - self.ultimo_digest >= self.intervalo_digest:
+                self._enviar_digest()
+        elif self.digest and self._hay_cupo():
+            self._enviar_digest()
+
+    def _vaciar(self):
+        for repetida in self.repetidas.values():
+            if repetida["cantidad"]:
+                self.digest.append(self._resumen_repetida(repetida))
+        self.repetidas.clear()
+        self._enviar_digest()
+
+    def _salida(self, mensaje):
+        if self.modo == "digest" or not self._hay_cupo():
+            self.digest.append(mensaje)
+        else:
+            self._entregar(mensaje)
+
+    def _hay_cupo(self):
+        limite = time.monotonic() - 60
+        while self.envios and self.envios[0] < limite:
+            self.envios.popleft()
+        return len(self.envios) < self.max_por_minuto
+
+    def _enviar_digest(self):
+        self.ultimo_digest = time.monotonic()
+        if not self.digest:
+            return
+        if len(self.digest) == 1:
+            texto = self.digest[0]
+        else:
+            lineas = [f"• {m}" for m in self.digest[:MAX_LINEAS_DIGEST]]
+            if len(self.digest) > MAX_LINEAS_DIGEST:
+                lineas.append(f"… y {len(self.digest) - MAX_LINEAS_DIGEST} alertas más")
+            texto = f"📋 Resumen de {len(self.digest)} alertas:\n" + "\n".join(lineas)
+        self.digest = []
+        self._entregar(texto)
+
+    def _entregar(self, texto):
+        self.envios.append(time.monotonic())
+        try:
+            self.backend.enviar(texto)
+        except Exception as e:
+            logger.error(f"❌ Error al enviar alerta: {e}")
+
+
+_despachador = None
+_lock = threading.Lock()
+
+
+def crear_backend(nombre=BACKEND):
+    return BackendSlack() if nombre == "slack" else BackendStub()
+
+
+def despachador():
+    global _despachador
+    if _despachador is None:
+        with _lock:
+            if _despachador is None:
+                _despachador = DespachadorAlertas(crear_backend())
+                # Al terminar el comando se manda lo que quedó pendiente
+                atexit.register(_despachador.flush)
+    return _despachador
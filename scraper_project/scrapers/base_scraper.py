@@ -1,29 +1,193 @@
 import os
+import time
+import functools
+from contextlib import contextmanager
 from datetime import datetime
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from scrapers.utils_scraping import normalizar_columnas
+from scrapers.registro import Producto, serializar
+from scrapers.selectores import extractor as extractor_tienda
+from scrapers.ritmo import dominio
 from scrapers.utils import setup_logger, send_alert_message
+from scrapers.metricas import CARGA_PAGINA, PARSEO, CREACION_DRIVER, ERRORES_WEBDRIVER, ITEMS, RSS
+from scrapers.jobs import registrar_run
+from scrapers.progreso import ProgressTracker, rss_actual_kb
+from scrapers.rendimiento import ReporteRendimiento, JS_BYTES_DESCARGADOS, resumir
+from scrapers.trazas import traza, span, trazado
+from selenium.common.exceptions import WebDriverException
 import json
 
 
+def _con_reporte(run):
+    """
+    Envuelve el run() de cada scraper: registra la corrida como Job (con su progreso
+    por sección y por URL) y genera el reporte de rendimiento al terminar.
+    """
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        self.rendimiento = ReporteRendimiento(self.name, self.session_id)
+        self.seccion_actual = None
+        estado = "error"
+        try:
+            with registrar_run(self.comando, self.name) as job, \
+                    traza(self.session_id, self.name, "scraper.run", **{"scraper.store": self.name}):
+                self.progreso = ProgressTracker(len(self.secciones), job)
+                self.secciones_terminadas = self.paginas_cargadas = self.items_scrapeados = 0
+                self.publicar_progreso()
+                resultado = run(self, *args, **kwargs)
+            estado = "ok"
+            return resultado
+        finally:
+            # Un error al escribir el reporte no puede tapar el del scraper
+            try:
+                self.guardar_reporte_rendimiento(estado)
+            except Exception as e:
+                self.logger.error(f"❌ No se pudo guardar el reporte de rendimiento: {e}")
+    return wrapper
+
+
+def _con_registro(parsear):
+    """Convierte cada producto en un registro tipado apenas se parsea: run() ya recibe Producto."""
+    @functools.wraps(parsear)
+    def wrapper(self, *args, **kwargs):
+        producto = parsear(self, *args, **kwargs)
+        if not isinstance(producto, dict):
+            return producto
+        with span("normalizar", **{"scraper.store": self.name}):
+            return self.registro.desde_dict(producto)
+    return wrapper
+
+
 class BaseScraper:
+    # Registro que devuelve parsear_producto (el parser puede seguir armando un dict con "N/A")
+    registro = Producto
+    # Sección → URL; el progreso de la corrida se mide en secciones terminadas
+    secciones = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "run" in cls.__dict__:
+            cls.run = _con_reporte(cls.__dict__["run"])
+        if "parsear_producto" in cls.__dict__:
+            cls.parsear_producto = trazado("parsear_producto")(
+                _con_registro(cls.__dict__["parsear_producto"])
+            )
+
     def __init__(self, name):
         self.name = name
+        # Comando con el que se registra la corrida cuando se lanza a mano (run_dash, run_dexter, ...)
+        self.comando = f"run_{name}"
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.output_dir = f"outputs/{self.name}"
         os.makedirs(self.output_dir, exist_ok=True)
         self.logger = setup_logger(self.name, self.output_dir)
         self.driver = None
+        self.rendimiento = ReporteRendimiento(self.name, self.session_id)
+        self.seccion_actual = None
+        self.reporte = None
+        self._extractor = None
+        self.progreso = None
+        self.secciones_terminadas = 0
+        self.paginas_cargadas = 0
+        self.items_scrapeados = 0
+
+    @property
+    def extractor(self):
+        """Selectores de la tienda (scrapers/selectores.json), compilados la primera vez."""
+        if self._extractor is None:
+            self._extractor = extractor_tienda(self.name)
+        return self._extractor
 
     def setup_browser(self):
-        service = Service(ChromeDriverManager().install())
-        options = webdriver.ChromeOptions()
-        # options.add_argument("--window-size=1280,720")
-        options.add_argument("--headless")  # modo headless
-        self.driver = webdriver.Chrome(service=service, options=options)
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        with CREACION_DRIVER.medir(store=self.name, mode="local"):
+            service = Service(ChromeDriverManager().install())
+            options = webdriver.ChromeOptions()
+            # options.add_argument("--window-size=1280,720")
+            options.add_argument("--headless")  # modo headless
+            self.driver = webdriver.Chrome(service=service, options=options)
+
+    def cargar_pagina(self, url, seccion):
+        """driver.get() midiendo el tiempo de carga y contando WebDriverException por sección."""
+        self.seccion_actual = seccion
+        # Token del rate limiter del dominio (la espera no cuenta como carga); un timeout lo frena
+        turno = dominio(url).entrar()
+        inicio = time.perf_counter()
+        try:
+            with span("driver.get", url=url, section=seccion):
+                self.driver.get(url)
+        except WebDriverException as e:
+            turno.fallo(e)
+            ERRORES_WEBDRIVER.inc(store=self.name, section=seccion)
+            if self.progreso:
+                self.progreso.error()
+            raise
+        finally:
+            turno.terminar()
+            segundos = time.perf_counter() - inicio
+            CARGA_PAGINA.observe(segundos, store=self.name, section=seccion)
+        self.rendimiento.pagina(seccion, url, segundos, self._bytes_descargados())
+        self.paginas_cargadas += 1
+        self.publicar_progreso(url=url)
+
+    def _bytes_descargados(self):
+        try:
+            return int(self.driver.execute_script(JS_BYTES_DESCARGADOS) or 0)
+        except Exception:
+            return 0
+
+    @contextmanager
+    def fase(self, nombre, seccion):
+        """Suma el tiempo del bloque a la fase (wait / scroll / ...) de la sección en el reporte."""
+        with span(nombre, section=seccion), self.rendimiento.fase(seccion, nombre):
+            yield
+
+    @contextmanager
+    def medir_parseo(self, seccion):
+        with PARSEO.medir(store=self.name, section=seccion), self.fase("parse", seccion):
+            yield
+
+    def registrar_seccion(self, seccion, cantidad):
+        self.seccion_actual = seccion
+        self.rendimiento.items(seccion, cantidad)
+        ITEMS.inc(cantidad, store=self.name, section=seccion)
+        RSS.set(rss_actual_kb(), store=self.name)
+        self.secciones_terminadas += 1
+        self.items_scrapeados += cantidad
+        self.publicar_progreso()
+
+    def publicar_progreso(self, url=None):
+        """Publica en el Job cuántas secciones terminaron, la sección y URL actuales, páginas e ítems."""
+        if self.progreso is None:
+            return
+        self.progreso.publicar(
+            self.secciones_terminadas,
+            section=self.seccion_actual,
+            url=url,
+            pages_loaded=self.paginas_cargadas,
+            items_scraped=self.items_scrapeados,
+        )
+
+    def guardar_reporte_rendimiento(self, estado="ok"):
+        self.reporte = self.rendimiento.generar(estado)
+        if self._extractor is not None:
+            self.reporte["selectors"] = self._extractor.tasas()
+            faltantes = [
+                f"{campo} {tasa['hit_rate']:.0%} (respaldo {tasa['fallback_rate']:.0%})"
+                for campo, tasa in self.reporte["selectors"].items()
+                if tasa["hit_rate"] < 1 or tasa["fallback_rate"] > 0
+            ]
+            if faltantes:
+                self.logger.info(f"🎯 Selectores con datos faltantes o de respaldo: {', '.join(faltantes)}")
+        filepath = os.path.join(self.output_dir, f"rendimiento_{self.name}_{self.session_id}.json")
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(self.reporte, f, ensure_ascii=False, indent=2)
+        self.logger.info(f"📊 Reporte de rendimiento en {filepath}")
+        return filepath
+
+    def resumen_rendimiento(self):
+        return resumir(self.reporte) if self.reporte else ""
 
     
     def close_browser(self):
@@ -35,12 +199,14 @@ class BaseScraper:
 
     def export_to_json(self, data: list, filename: str) -> str:
         filepath = os.path.join(self.output_dir, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with self.fase("export", self.seccion_actual or "combinado"), \
+                open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=serializar)
         self.logger.info(f"✅ Exported {len(data)} items to {filepath}")
         return filepath
     
     def exportar_combinado_json(self, all_data: list, filename: str) -> str:
+        self.seccion_actual = None
         return self.export_to_json(all_data, filename)
     
     def run(self):
@@ -2,9 +2,29 @@ import os
 import threading
 import time
 from queue import Queue, Empty
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from scrapers.ritmo import dominio
+
+
+class _DriverCronometrado:
+    """
+    El driver del pool tal cual, salvo que get() suma su duración a turno.latencia: el
+    AIMD juzga solo la navegación y no las esperas fijas que haga process_fn después.
+    """
+
+    def __init__(self, driver, turno):
+        self._driver = driver
+        self._turno = turno
+
+    def get(self, url):
+        inicio = time.perf_counter()
+        try:
+            return self._driver.get(url)
+        finally:
+            self._turno.latencia = (self._turno.latencia or 0.0) + time.perf_counter() - inicio
+
+    def __getattr__(self, nombre):
+        return getattr(self._driver, nombre)
+
 
 class ThreadedDriverPool:
     """
@@ -27,6 +47,10 @@ class ThreadedDriverPool:
         self.driver_pool = Queue(maxsize=self.max_threads)
 
     def _init_driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
         service = Service(ChromeDriverManager().install())
         options = webdriver.ChromeOptions()
         options.add_argument("--headless")
@@ -58,7 +82,7 @@ class ThreadedDriverPool:
         - items: lista de dicts (o cualquier objeto mutable) que contengan la clave "link"
                  (o el campo que necesite process_fn).
         - process_fn: función(driver, item), donde:
-            * driver: WebDriver sacado del pool
+            * driver: WebDriver sacado del pool (si el item tiene link, envuelto para cronometrar get())
             * item: el diccionario a procesar en ese hilo
             * process_fn puede actualizar item in-place (p. ej. item["modelo_id"] = ...)
               o devolver un dict con nuevos campos (que luego se mezclarán en item).
@@ -85,7 +109,14 @@ class ThreadedDriverPool:
 
                 try:
                     driver = self.driver_pool.get()
-                    retorno = process_fn(driver, itm)
+                    link = itm.get("link")
+                    if link:
+                        # Cuántos hilos navegan a la vez lo decide el ritmo del dominio (AIMD)
+                        with dominio(link, maximo=self.max_threads).turno() as turno:
+                            retorno = process_fn(_DriverCronometrado(driver, turno), itm)
+                    else:
+                        # Sin URL no hay dominio al que cuidar
+                        retorno = process_fn(driver, itm)
                     if isinstance(retorno, dict):
                         itm.update(retorno)
                 except Exception as e:
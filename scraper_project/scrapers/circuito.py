@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from django.conf import settings
+from scrapers.alertas import despachador
+from scrapers.metricas import ESTADO_CIRCUITO, RECHAZOS_CIRCUITO
+
+logger = logging.getLogger(__name__)
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+# Valor del gauge scraper_circuit_state por estado
+VALOR_ESTADO = {CERRADO: 0, SEMIABIERTO: 1, ABIERTO: 2}
+
+
+class CircuitoAbierto(Exception):
+    """El circuito rechazó la llamada sin intentarla; `restante` es cuánto falta para el próximo sondeo."""
+
+    def __init__(self, nombre, restante):
+        super().__init__(f"Circuito '{nombre}' abierto, próximo sondeo en {restante:.0f}s")
+        self.nombre = nombre
+        self.restante = restante
+
+
+class Circuito:
+    """
+    Circuit breaker: después de `umbral` fallas seguidas se abre y rechaza todas las
+    llamadas al instante (CircuitoAbierto) durante `enfriamiento` segundos. Pasado ese
+    tiempo queda semiabierto y deja pasar una sola llamada de sondeo: si anda se cierra,
+    si falla se vuelve a abrir con el doble de enfriamiento (hasta `enfriamiento_max`).
+    Alerta a Slack solo cuando cambia de estado, no por cada llamada rechazada.
+    """
+
+    def __init__(self, nombre, umbral, enfriamiento, enfriamiento_max):
+        self.nombre = nombre
+        self.umbral = max(1, umbral)
+        self.enfriamiento_base = enfriamiento
+        self.enfriamiento_max = max(enfriamiento, enfriamiento_max)
+        self.enfriamiento = enfriamiento
+        self.estado = CERRADO
+        self.fallas = 0
+        self.abierto_hasta = 0.0
+        self.sondeando = False
+        self.ultimo_error = None
+        self.lock = threading.Lock()
+        ESTADO_CIRCUITO.set(VALOR_ESTADO[CERRADO], circuit=nombre)
+
+    def llamar(self, funcion, *args, **kwargs):
+        sondeo = self._permitir()
+        try:
+            resultado = funcion(*args, **kwargs)
+        except Exception as e:
+            self._fallo(e, sondeo)
+            raise
+        self._exito(sondeo)
+        return resultado
+
+    def _permitir(self):
+        """True si la llamada es el sondeo del estado semiabierto."""
+        with self.lock:
+            if self.estado == CERRADO:
+                return False
+            restante = self.abierto_hasta - time.monotonic()
+            if self.estado == ABIERTO and restante <= 0:
+                self._cambiar(SEMIABIERTO)
+            if self.estado == SEMIABIERTO and not self.sondeando:
+                self.sondeando = True
+                return True
+        RECHAZOS_CIRCUITO.inc(circuit=self.nombre)
+        raise CircuitoAbierto(self.nombre, max(restante, 0.0))
+
+    def _exito(self, sondeo):
+        with self.lock:
+            self.fallas = 0
+            if sondeo:
+                self.sondeando = False
+                self.enfriamiento = self.enfriamiento_base
+                self._cambiar(CERRADO)
+        if sondeo:
+            despachador().enviar(f"✅ Circuito '{self.nombre}' cerrado: el sondeo respondió, se retoma el uso normal")
+
+    def _fallo(self, error, sondeo):
+        self.ultimo_error = error
+        with self.lock:
+            self.fallas += 1
+            if sondeo:
+                # El sondeo falló: otra vuelta abierto, con el doble de espera
+                self.sondeando = False
+                self.enfriamiento = min(self.enfriamiento * 2, self.enfriamiento_max)
+                self._abrir()
+                logger.warning(f"🔌 Sondeo del circuito '{self.nombre}' falló ({error}); reabierto por {self.enfriamiento:.0f}s")
+                return
+            if self.estado != CERRADO or self.fallas < self.umbral:
+                return
+            self._abrir()
+        despachador().enviar(
+            f"🔌 Circuito '{self.nombre}' abierto tras {self.umbral} fallas seguidas ({error}). "
+            f"Se rechaza sin intentar por {self.enfriamiento:.0f}s y después se sondea."
+        )
+
+    def _abrir(self):
+        self.abierto_hasta = time.monotonic() + self.enfriamiento
+        self._cambiar(ABIERTO)
+
+    def _cambiar(self, estado):
+        if estado != self.estado:
+            logger.info(f"🔌 Circuito '{self.nombre}': {self.estado} → {estado}")
+            self.estado = estado
+            ESTADO_CIRCUITO.set(VALOR_ESTADO[estado], circuit=self.nombre)
+
+    @property
+    def abierto(self):
+        return self.estado != CERRADO
+
+
+_circuitos = {}
+_lock = threading.Lock()
+
+
+def circuito(nombre):
+    """Circuito compartido por todos los hilos del proceso (uno por nombre)."""
+    with _lock:
+        if nombre not in _circuitos:
+            _circuitos[nombre] = Circuito(
+                nombre,
+                settings.CIRCUITO_UMBRAL,
+                settings.CIRCUITO_ENFRIAMIENTO_SEGUNDOS,
+                settings.CIRCUITO_ENFRIAMIENTO_MAX_SEGUNDOS,
+            )
+        return _circuitos[nombre]
@@ -0,0 +1,79 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+from scrapers.parseo import normalizar_numero
+
+# Cuotas, interés y monto en una sola pasada:
+# "6 cuotas sin interés de $ 2.000", "3cuotas de$66.666,33sin interés"
+PATRON_FINANCIACION = re.compile(
+    r"(?P<cuotas>\d+)\s*cuotas?\b"
+    r"|(?P<sin>sin)\s*inter[eé]s"
+    r"|(?P<con>con)\s*inter[eé]s"
+    r"|\$\s*(?P<precio>\d[\d.,]*)",
+    re.IGNORECASE,
+)
+# "Hasta 6 cuotas de $1.500 con Tarjeta de Naranja" (GoCuotas); Dash trae el banco aparte
+PATRON_BANCO = re.compile(
+    r"tarjeta\s+de\s+([a-záéíóúüñ ]+?)(?=\s*(?:$|[,.;(]|\d|sin\b|con\b|de\b))", re.IGNORECASE
+)
+# Los textos de cuotas se repiten mucho entre productos de una misma tienda
+TAMANO_CACHE_FINANCIACION = 4096
+
+Financiacion = namedtuple("Financiacion", ["banco", "num_cuotas", "precio_por_cuota", "sin_interes"])
+
+
+@lru_cache(maxsize=TAMANO_CACHE_FINANCIACION)
+def extraer_financiacion(texto, banco=""):
+    """
+    Banco, cantidad de cuotas, monto por cuota (Decimal) y si es sin interés de un
+    texto de cuotas, recorriéndolo una vez. Lo que no aparece queda en None (el banco
+    en `banco`); si no aparece nada devuelve None.
+    """
+    if not texto:
+        return None
+    num_cuotas = precio = sin_interes = None
+    # findall devuelve una tupla por coincidencia con un solo grupo no vacío
+    for cuotas, sin, _con, monto in PATRON_FINANCIACION.findall(texto):
+        if cuotas:
+            if num_cuotas is None:
+                num_cuotas = int(cuotas)
+        elif monto:
+            if precio is None:
+                precio = normalizar_numero(monto)
+        elif sin:
+            sin_interes = True
+        elif sin_interes is None:
+            sin_interes = False
+    if num_cuotas is None and precio is None and sin_interes is None:
+        return None
+    if not banco and "arjeta" in texto:
+        match = PATRON_BANCO.search(texto)
+        if match:
+            banco = match.group(1).strip()
+    return Financiacion(banco, num_cuotas, precio, sin_interes)
+
+
+def cuotas_dash(soup):
+    """Planes del modal de tarjetas de Dash (un wrapper por banco)."""
+    resultados = []
+    for wrapper in soup.select("div.dash-theme-6-x-wrapperModalCC"):
+        banco_el = wrapper.select_one("div.dash-theme-6-x-topBarTarjetasCC p")
+        cuota_el = wrapper.select_one("div.dash-theme-6-x-containerCuotasCC p")
+        financiacion = extraer_financiacion(
+            cuota_el.get_text(strip=True) if cuota_el else "",
+            banco_el.get_text(strip=True) if banco_el else "",
+        )
+        if financiacion:
+            resultados.append(financiacion._asdict())
+    return resultados
+
+
+def cuotas_gocuotas(soup):
+    """Widget de GoCuotas (Solo Urbano): solo cuenta si trae cuotas y monto; siempre sin interés."""
+    go_tag = soup.select_one("#gocuotas-widget .gocuotas-widget-text p")
+    if not go_tag:
+        return []
+    financiacion = extraer_financiacion(go_tag.get_text(" ", strip=True))
+    if not financiacion or financiacion.num_cuotas is None or financiacion.precio_por_cuota is None:
+        return []
+    return [financiacion._replace(sin_interes=True)._asdict()]
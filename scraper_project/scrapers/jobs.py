@@ -0,0 +1,168 @@
+import os
+import socket
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+from io import StringIO
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from scrapers.models import Job
+
+# Cuántos jobs de la misma tienda pueden correr a la vez (entre todos los workers)
+CONCURRENCIA_POR_TIENDA = getattr(settings, "JOB_CONCURRENCIA_POR_TIENDA", {})
+CONCURRENCIA_DEFAULT = getattr(settings, "JOB_CONCURRENCIA_DEFAULT", 1)
+# El proceso que corre un job refresca heartbeat_at cada LATIDO_SEGUNDOS; un job en
+# "running" sin latido hace más que SIN_LATIDO se da por muerto (worker caído)
+LATIDO_SEGUNDOS = getattr(settings, "JOB_LATIDO_SEGUNDOS", 60)
+SIN_LATIDO = timedelta(minutes=getattr(settings, "JOB_SIN_LATIDO_MINUTOS", 10))
+
+# Job que está ejecutando este proceso (lo setea ejecutar_job)
+_job_actual = None
+
+
+def nombre_worker():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def limite_tienda(store):
+    return CONCURRENCIA_POR_TIENDA.get(store, CONCURRENCIA_DEFAULT)
+
+
+def encolar(command, args=None, store=None):
+    return Job.objects.create(
+        command=command,
+        args=list(args or []),
+        store=store or command,
+        created_at=timezone.now(),
+    )
+
+
+def liberar_colgados():
+    """
+    Marca como fallidos los jobs en running cuyo proceso dejó de latir (murió). Un job
+    largo pero vivo sigue latiendo y no se libera, así no se pisa con otro de su tienda.
+    """
+    return Job.objects.annotate(
+        ultimo_latido=Coalesce("heartbeat_at", "started_at")
+    ).filter(
+        status=Job.CORRIENDO, ultimo_latido__lt=timezone.now() - SIN_LATIDO
+    ).update(
+        status=Job.FALLIDO,
+        error="Timeout: el worker dejó de reportar latidos",
+        finished_at=timezone.now(),
+    )
+
+
+@contextmanager
+def latido(job):
+    """Mientras dura el bloque, un hilo refresca job.heartbeat_at cada LATIDO_SEGUNDOS."""
+    parar = threading.Event()
+
+    def _loop():
+        try:
+            while not parar.wait(LATIDO_SEGUNDOS):
+                try:
+                    Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now())
+                except Exception:
+                    # Un corte de la base no tiene que tirar el job; el próximo latido reintenta
+                    pass
+        finally:
+            connection.close()
+
+    hilo = threading.Thread(target=_loop, name="LatidoJob", daemon=True)
+    hilo.start()
+    try:
+        yield
+    finally:
+        parar.set()
+        hilo.join(timeout=5)
+
+
+def reclamar_job(worker, candidatos=20):
+    """
+    Toma el job pendiente más viejo cuya tienda no esté en su límite de concurrencia.
+
+    SELECT ... FOR UPDATE SKIP LOCKED hace que varios workers (en la misma o en
+    distintas máquinas) no se pisen: cada uno ve solo los jobs que nadie está
+    reclamando. El advisory lock por tienda serializa el chequeo del límite.
+    """
+    with transaction.atomic():
+        pendientes = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.PENDIENTE)
+            .order_by("created_at", "id")[:candidatos]
+        )
+        for job in pendientes:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [f"job:{job.store}"])
+            corriendo = Job.objects.filter(store=job.store, status=Job.CORRIENDO).count()
+            if corriendo >= limite_tienda(job.store):
+                continue
+            job.status = Job.CORRIENDO
+            job.worker = worker
+            job.started_at = job.heartbeat_at = timezone.now()
+            job.save(update_fields=["status", "worker", "started_at", "heartbeat_at"])
+            return job
+    return None
+
+
+def job_actual():
+    return _job_actual
+
+
+@contextmanager
+def registrar_run(command, store):
+    """
+    Devuelve el Job de la corrida actual. Si el comando lo lanzó run_worker usa ese
+    job; si se corrió a mano con manage.py crea uno en estado running, así toda
+    corrida queda visible en /api/jobs/ y /api/runs/.
+    """
+    if _job_actual is not None:
+        yield _job_actual
+        return
+
+    job = Job.objects.create(
+        command=command,
+        store=store,
+        status=Job.CORRIENDO,
+        worker=nombre_worker(),
+        created_at=timezone.now(),
+        started_at=timezone.now(),
+        heartbeat_at=timezone.now(),
+    )
+    try:
+        with latido(job):
+            yield job
+        job.status = Job.TERMINADO
+    except BaseException as e:
+        job.status = Job.FALLIDO
+        job.error = "".join(traceback.format_exception(e))
+        raise
+    finally:
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at"])
+
+
+def ejecutar_job(job):
+    global _job_actual
+    _job_actual = job
+    out = StringIO()
+    try:
+        with latido(job):
+            call_command(job.command, *job.args, stdout=out, stderr=out)
+        job.status = Job.TERMINADO
+    except BaseException as e:
+        job.status = Job.FALLIDO
+        job.error = "".join(traceback.format_exception(e))
+        if not isinstance(e, Exception):
+            raise
+    finally:
+        _job_actual = None
+        job.output = out.getvalue()
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "output", "error", "finished_at"])
+    return job
@@ -0,0 +1,287 @@
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Módulos caros de importar: el web y los comandos que no abren navegador no deberían cargarlos
+PESADOS = ("pandas", "numpy", "selenium.webdriver", "webdriver_manager", "bs4", "slack_sdk", "openpyxl")
+
+# objetivo: (módulo que se importa después de django.setup(), ¿tiene que quedar sin PESADOS?)
+OBJETIVOS_IMPORTS = {
+    "web": ("scraper_project.urls", True),
+    "alertas": ("scrapers.utils", True),
+    "run_worker": ("scrapers.management.commands.run_worker", True),
+    "import_data": ("scrapers.management.commands.import_data", True),
+    "import_productos_dash": ("scrapers.management.commands.import_productos_dash", True),
+    "populate_dexter_codes": ("scrapers.management.commands.populate_dexter_codes", True),
+    "base_scraper": ("scrapers.base_scraper", True),
+    "run_dash": ("scrapers.management.commands.run_dash", False),
+    "dash_2": ("scrapers.management.commands.dash_2", False),
+}
+
+# __import__ y no importlib.import_module: -X importtime no registra la línea del
+# módulo pedido si se importa por importlib
+SCRIPT_IMPORT = "import sys, django; django.setup(); __import__(sys.argv[1])"
+
+# Corpus de nombres reales de los scrapers
+CORPUS_JSON = "json_pruebas/*.json"
+
+
+def medir_import(modulo):
+    """
+    Corre `python -X importtime` en un proceso nuevo e importa `modulo` después de
+    django.setup(). Devuelve (ms acumulados del módulo, PESADOS que cargó).
+    """
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "scraper_project.settings"}
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT_IMPORT, modulo],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if proceso.returncode != 0:
+        raise CommandError(f"No se pudo importar {modulo}:\n{proceso.stderr[-2000:]}")
+
+    acumulado_us = 0
+    pesados = set()
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:"):
+            continue
+        partes = linea.split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        nombre = partes[2].strip()
+        if nombre in PESADOS:
+            pesados.add(nombre)
+        # La línea sin indentación del módulo pedido trae el acumulado de todo lo que arrastró
+        if partes[2] == f" {modulo}":
+            acumulado_us = int(partes[1])
+    return acumulado_us / 1000, sorted(pesados)
+
+
+def cargar_registros(patron=CORPUS_JSON):
+    registros = []
+    for path in sorted(glob.glob(os.path.join(settings.BASE_DIR, patron))):
+        with open(path, encoding="utf-8") as f:
+            registros += json.load(f)
+    return registros
+
+
+def cargar_nombres(patron=CORPUS_JSON):
+    return [p["nombre"] for p in cargar_registros(patron) if isinstance(p.get("nombre"), str)]
+
+
+def _cronometrar(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks de rendimiento. imports: tiempo de arranque con python -X importtime; "
+        "clasificador: taxonomía sobre los nombres de json_pruebas, con y sin memo; "
+        "precios: parseo de los precios de json_pruebas, por valor y por columna; "
+        "financiacion: extracción de los textos de cuotas de json_pruebas, con y sin memo"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("objetivo", choices=["imports", "clasificador", "precios", "financiacion"], help="Qué se mide")
+        parser.add_argument(
+            "--repeticiones",
+            type=int,
+            default=3,
+            help="Corridas por caso; se informa la mediana"
+        )
+        parser.add_argument(
+            "--estricto",
+            action="store_true",
+            help="Falla si un caso que debería ser liviano carga módulos pesados"
+        )
+        parser.add_argument(
+            "--guardar",
+            action="store_true",
+            help="Guarda el resultado en outputs/benchmarks/<objetivo>_<fecha>.json"
+        )
+
+    def handle(self, *args, **options):
+        benchmark = getattr(self, f"benchmark_{options['objetivo']}")
+        resultado = benchmark(options)
+
+        if options["guardar"]:
+            output_dir = "outputs/benchmarks"
+            os.makedirs(output_dir, exist_ok=True)
+            path = os.path.join(
+                output_dir, f"{options['objetivo']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            )
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(resultado, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"💾 Resultado guardado en {path}")
+
+    def benchmark_imports(self, options):
+        repeticiones = max(1, options["repeticiones"])
+        resultado = {}
+        violaciones = []
+
+        self.stdout.write(f"{'caso':<24} {'ms (mediana)':>12}  pesados")
+        for caso, (modulo, liviano) in OBJETIVOS_IMPORTS.items():
+            tiempos = []
+            for _ in range(repeticiones):
+                ms, pesados = medir_import(modulo)
+                tiempos.append(ms)
+            mediana = statistics.median(tiempos)
+            resultado[caso] = {"module": modulo, "median_ms": round(mediana, 1), "heavy": pesados}
+
+            marca = "⚠️" if liviano and pesados else "  "
+            self.stdout.write(f"{caso:<24} {mediana:>12.1f}  {marca}{', '.join(pesados) or '-'}")
+            if liviano and pesados:
+                violaciones.append(f"{caso} ({modulo}): {', '.join(pesados)}")
+
+        if violaciones:
+            mensaje = "Casos livianos que cargan módulos pesados:\n" + "\n".join(violaciones)
+            if options["estricto"]:
+                raise CommandError(mensaje)
+            self.stdout.write(self.style.WARNING(mensaje))
+        else:
+            self.stdout.write(self.style.SUCCESS("✔️ Web, worker e importers arrancan sin módulos pesados."))
+        return resultado
+
+    def benchmark_clasificador(self, options):
+        from scrapers.taxonomia import inferir_tipo_producto, taxonomia
+        from scrapers.utils_scraping import inferir_categoria, inferir_variante
+
+        nombres = cargar_nombres()
+        if not nombres:
+            raise CommandError(f"No hay nombres en {CORPUS_JSON}")
+        repeticiones = max(1, options["repeticiones"])
+        actual = taxonomia()
+
+        def sin_cache():
+            for nombre in nombres:
+                actual._clasificar(nombre)
+
+        # Como lo llaman los scrapers: las tres funciones por producto, la 2da y 3ra salen del cache
+        def con_cache():
+            actual.clasificar.cache_clear()
+            for nombre in nombres:
+                inferir_categoria(nombre), inferir_tipo_producto(nombre), inferir_variante(nombre)
+
+        categorias = Counter(actual.clasificar(nombre).categoria for nombre in dict.fromkeys(nombres))
+        resultado = {
+            "taxonomy_version": actual.version,
+            "names": len(nombres),
+            "distinct_names": len(set(nombres)),
+            "single_pass_ms": round(_cronometrar(sin_cache, repeticiones), 2),
+            "memoized_ms": round(_cronometrar(con_cache, repeticiones), 2),
+            "categories": dict(categorias.most_common()),
+        }
+        self.stdout.write(f"🧪 {resultado['names']} nombres ({resultado['distinct_names']} distintos)")
+        self.stdout.write(f"{'taxonomía v' + str(actual.version):<24} {resultado['single_pass_ms']:>10.2f} ms")
+        self.stdout.write(f"{'taxonomía + memo':<24} {resultado['memoized_ms']:>10.2f} ms")
+        self.stdout.write("🗂️ Categorías (nombres distintos):")
+        for categoria, cantidad in resultado["categories"].items():
+            self.stdout.write(f"   {categoria}: {cantidad}")
+        return resultado
+
+    def benchmark_precios(self, options):
+        from scrapers.parseo import _precio_texto, parsear_precio, parsear_precios
+
+        textos = [
+            r[campo] for r in cargar_registros() for campo in ("precio", "precio_anterior")
+            if isinstance(r.get(campo), str)
+        ]
+        if not textos:
+            raise CommandError(f"No hay precios en {CORPUS_JSON}")
+        repeticiones = max(1, options["repeticiones"])
+        sin_parsear = sum(1 for t in textos if parsear_precio(t) is None)
+
+        def sin_cache():
+            _precio_texto.cache_clear()
+            for texto in textos:
+                parsear_precio(texto)
+
+        def con_cache():
+            for texto in textos:
+                parsear_precio(texto)
+
+        def columna():
+            _precio_texto.cache_clear()
+            parsear_precios(textos)
+
+        resultado = {
+            "values": len(textos),
+            "distinct_values": len(set(textos)),
+            "unparsed": sin_parsear,
+            "compiled_ms": round(_cronometrar(sin_cache, repeticiones), 2),
+            "memoized_ms": round(_cronometrar(con_cache, repeticiones), 2),
+            "column_ms": round(_cronometrar(columna, repeticiones), 2),
+        }
+        try:
+            import pandas as pd
+        except ImportError:
+            pd = None
+        if pd is not None:
+            serie = pd.Series(textos, dtype=object)
+            resultado["pandas_ms"] = round(_cronometrar(lambda: parsear_precios(serie), repeticiones), 2)
+
+        self.stdout.write(
+            f"🧪 {resultado['values']} precios ({resultado['distinct_values']} distintos); "
+            f"{sin_parsear} sin precio (N/A o vacíos)"
+        )
+        self.stdout.write(f"{'parsear_precio':<24} {resultado['compiled_ms']:>10.2f} ms")
+        self.stdout.write(f"{'parsear_precio + memo':<24} {resultado['memoized_ms']:>10.2f} ms")
+        self.stdout.write(f"{'parsear_precios (lista)':<24} {resultado['column_ms']:>10.2f} ms")
+        if "pandas_ms" in resultado:
+            self.stdout.write(f"{'parsear_precios (Series)':<24} {resultado['pandas_ms']:>10.2f} ms")
+        return resultado
+
+    def benchmark_financiacion(self, options):
+        from scrapers.financiacion import extraer_financiacion
+
+        textos = [r["cuotas"] for r in cargar_registros() if isinstance(r.get("cuotas"), str)]
+        if not textos:
+            raise CommandError(f"No hay textos de cuotas en {CORPUS_JSON}")
+        repeticiones = max(1, options["repeticiones"])
+
+        con_datos = sum(1 for texto in dict.fromkeys(textos) if extraer_financiacion(texto))
+
+        def una_pasada():
+            for texto in textos:
+                extraer_financiacion.__wrapped__(texto)
+
+        def con_cache():
+            extraer_financiacion.cache_clear()
+            for texto in textos:
+                extraer_financiacion(texto)
+
+        resultado = {
+            "texts": len(textos),
+            "distinct_texts": len(set(textos)),
+            "with_data": con_datos,
+            "single_pass_ms": round(_cronometrar(una_pasada, repeticiones), 2),
+            "memoized_ms": round(_cronometrar(con_cache, repeticiones), 2),
+        }
+        for clave in ("single_pass", "memoized"):
+            resultado[f"{clave}_per_s"] = round(len(textos) / (resultado[f"{clave}_ms"] / 1000))
+
+        self.stdout.write(
+            f"🧪 {resultado['texts']} textos de cuotas ({resultado['distinct_texts']} distintos); "
+            f"{con_datos} textos distintos con datos de financiación"
+        )
+        self.stdout.write(
+            f"{'extractor una pasada':<24} {resultado['single_pass_ms']:>10.2f} ms  "
+            f"{resultado['single_pass_per_s']:>10} textos/s"
+        )
+        self.stdout.write(
+            f"{'extractor + memo':<24} {resultado['memoized_ms']:>10.2f} ms  "
+            f"{resultado['memoized_per_s']:>10} textos/s"
+        )
+        return resultado
@@ -0,0 +1,101 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from scrapers.models import (
+    Product, ProductPage, Pricing, ProductQuota, Size, CodesDexter
+)
+
+# (descripción, queryset de la consulta caliente, índice que debería usar)
+CONSULTAS = [
+    (
+        "Product por model_code + página (import_productos_*)",
+        lambda: Product.objects.filter(model_code="X", pages__page_id=1),
+        "product_model_code_idx",
+    ),
+    (
+        "Product por sku (import_data)",
+        lambda: Product.objects.filter(sku="X"),
+        "product_sku_idx",
+    ),
+    (
+        "Product por link (import_data)",
+        lambda: Product.objects.filter(link="X"),
+        "product_link_idx",
+    ),
+    (
+        "ProductPage por producto + página",
+        lambda: ProductPage.objects.filter(product_id=1, page_id=1),
+        "product_page_product_page_uniq",
+    ),
+    (
+        "Productos de una página (--clear)",
+        lambda: ProductPage.objects.filter(page_id=1).values("product_id"),
+        "product_page_page_product_idx",
+    ),
+    (
+        "Último Pricing por producto + página",
+        lambda: Pricing.objects.filter(product_id=1, page_id=1).order_by("-recorded_at")[:1],
+        "pricing_product_page_rec_idx",
+    ),
+    (
+        "Pricing por rango de fechas (historial)",
+        lambda: Pricing.objects.filter(recorded_at__gte=timezone.now() - timedelta(days=30)),
+        "pricing_recorded_at_brin",
+    ),
+    (
+        "ProductQuota por producto + página",
+        lambda: ProductQuota.objects.filter(product_id=1, page_id=1),
+        "product_quota_product_page_idx",
+    ),
+    (
+        "Size por nombre (get_or_create)",
+        lambda: Size.objects.filter(name="X"),
+        "size_name",
+    ),
+    (
+        "CodesDexter por dexter_code (update_provider_code)",
+        lambda: CodesDexter.objects.filter(dexter_code="X"),
+        "dexter_code_dexter_code_idx",
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = "Corre EXPLAIN sobre las consultas que usan los importers y verifica que usen índices"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--plan",
+            action="store_true",
+            help="Muestra el plan completo de cada consulta"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("check_indexes solo está soportado en PostgreSQL")
+
+        fallas = 0
+        for descripcion, consulta, indice in CONSULTAS:
+            # Con tablas chicas Postgres prefiere un Seq Scan aunque el índice exista,
+            # así que lo deshabilitamos para ver si el índice es utilizable.
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+                plan = consulta().explain()
+
+            if "Seq Scan" in plan:
+                fallas += 1
+                self.stdout.write(self.style.ERROR(f"❌ {descripcion} hace Seq Scan"))
+            elif indice in plan:
+                self.stdout.write(self.style.SUCCESS(f"✔️ {descripcion} → {indice}"))
+            else:
+                # Usa otro índice: no es un error, pero conviene revisar el plan
+                self.stdout.write(self.style.WARNING(f"⚠️ {descripcion} no usa {indice}"))
+
+            if options["plan"] or indice not in plan:
+                self.stdout.write(plan)
+
+        if fallas:
+            raise CommandError(f"{fallas} consultas hacen Seq Scan")
+        self.stdout.write(self.style.SUCCESS(f"✅ Las {len(CONSULTAS)} consultas usan índices."))
@@ -3,13 +3,12 @@ import re
 import logging
 import time
 import threading
-import resource
-from queue import Queue, Empty
+from queue import Queue, Empty, Full
 from pathlib import Path
 import os
 from datetime import datetime
 
-from django.core.management.base import BaseCommand
+from scrapers.perfilado import ComandoPerfilable
 from django.conf import settings
 
 from selenium import webdriver
@@ -25,6 +24,24 @@ from scrapers.utils import (
     initialize_driver_remote,
     initialize_driver_local,
 )
+from scrapers.jobs import registrar_run
+from scrapers.progreso import ProgressTracker, rss_actual_kb
+from scrapers.metricas import CARGA_PAGINA, PARSEO, ERRORES_WEBDRIVER, ITEMS, RSS
+from scrapers.trazas import traza, span
+from scrapers.financiacion import cuotas_dash
+from scrapers.registro import serializar
+from scrapers.ritmo import SOBRECARGA, dominio
+from scrapers.circuito import CircuitoAbierto
+from scrapers.reintentos import (
+    BLOQUEADO,
+    DRIVER_CAIDO,
+    ERROR,
+    SIN_DRIVER,
+    ColaReintentos,
+    FalloItem,
+    clasificar_fallo,
+    verificar_pagina,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +50,11 @@ JSON_DIR = BASE_DIR / "json_pruebas"
 
 JSON_PATH = JSON_DIR / "productos_dash_20250530_124755_combinado.json"
 PROGRESS_INTERVAL = 30
+PUBLISH_INTERVAL = 5
+STORE = "dash"
+BASE_URL = "https://www.dashdeportes.com.ar"
+# Código de proveedor en la descripción cuando no está en la tabla de especificaciones
+PATRON_CODIGO = re.compile(r"[Cc]ódigo[:\s]*([\w\/\-\d]+)")
 
 def scroll_page(driver):
     try:
@@ -60,7 +82,7 @@ def extraer_modelo_id(soup):
     desc = soup.select_one("div.dash-theme-6-x-DescripcionProd div")
     if desc:
         text = desc.get_text(separator=" ", strip=True)
-        m = re.search(r"[Cc]ódigo[:\s]*([\w\/\-\d]+)", text)
+        m = PATRON_CODIGO.search(text)
         if m:
             return m.group(1)
     return "N/A"
@@ -79,224 +101,210 @@ def extraer_talles(soup):
             disponibles.append(talla)
     return disponibles, no_disponibles
 
-def extraer_cuotas_bancos(soup):
-    resultados = []
-    for wrapper in soup.select("div.dash-theme-6-x-wrapperModalCC"):
-        banco = ""
-        banco_el = wrapper.select_one("div.dash-theme-6-x-topBarTarjetasCC p")
-        if banco_el:
-            banco = banco_el.get_text(strip=True)
-
-        texto_cuota = ""
-        cuota_el = wrapper.select_one("div.dash-theme-6-x-containerCuotasCC p")
-        if cuota_el:
-            texto_cuota = cuota_el.get_text(strip=True)
-
-        num_cuotas       = None
-        precio_por_cuota = None
-        sin_interes      = None
-
-        m1 = re.search(r"(\d+)\s+cuotas?", texto_cuota, re.IGNORECASE)
-        if m1:
-            num_cuotas = int(m1.group(1))
-
-        if re.search(r"sin\s+interés", texto_cuota, re.IGNORECASE):
-            sin_interes = True
-        elif re.search(r"con\s+interés", texto_cuota, re.IGNORECASE):
-            sin_interes = False
-
-        m2 = re.search(r"\$\s*([\d\.\,]+)", texto_cuota)
-        if m2:
-            precio_texto = m2.group(1)
-            precio_texto_norm = precio_texto.replace(".", "").replace(",", ".")
-            try:
-                precio_por_cuota = float(precio_texto_norm)
-            except ValueError:
-                precio_por_cuota = None
+def crear_driver(use_local):
+    return initialize_driver_local(STORE) if use_local else initialize_driver_remote(STORE)
 
-        if num_cuotas is not None or precio_por_cuota is not None or sin_interes is not None:
-            resultados.append({
-                "banco":            banco,
-                "num_cuotas":       num_cuotas,
-                "precio_por_cuota": precio_por_cuota,
-                "sin_interes":      sin_interes,
-            })
+def tomar_driver(driver_queue, use_local, tname):
+    """Un driver libre del pool; si no aparece en 10s se intenta crear uno nuevo."""
+    try:
+        # Si este span es largo, el pool se quedó sin drivers libres
+        with span("driver_queue.get", **{"pool.libres": driver_queue.qsize()}):
+            return driver_queue.get(timeout=10)
+    except Empty:
+        pass
+    logger.warning(f"[{tname}] No hubo driver libre en 10s, creo uno nuevo")
+    try:
+        return crear_driver(use_local)
+    except CircuitoAbierto as e:
+        # Browserless caído: el ítem espera al próximo sondeo del circuito
+        raise FalloItem(SIN_DRIVER, str(e), espera=e.restante)
+    except Exception as e:
+        raise FalloItem(SIN_DRIVER, str(e))
+
+def devolver_driver(driver_queue, driver):
+    try:
+        driver_queue.put_nowait(driver)
+    except Full:
+        # El pool ya está completo (se creó uno de más mientras faltaban)
+        try:
+            driver.quit()
+        except Exception:
+            pass
 
-    return resultados
+def reponer_driver(driver_queue, driver, use_local, tname):
+    """Descarta un driver muerto y deja uno nuevo en el pool, si se puede crear."""
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    try:
+        devolver_driver(driver_queue, crear_driver(use_local))
+    except Exception as e:
+        # El hilo sigue vivo: el próximo ítem vuelve a intentar crear un driver
+        logger.warning(f"[{tname}] Falló recrear driver: {e}")
+
+def worker(cola, driver_queue, resultados, lock, total, use_local, tracker):
+    """
+    Procesa ítems hasta que la cola no tenga nada pendiente. Un ítem que falla se
+    clasifica y vuelve a la cola con backoff; el hilo nunca abandona el trabajo.
+    """
+    while True:
+        tarea = cola.obtener()
+        if tarea is None:
+            return
+        try:
+            procesar_tarea(tarea, cola, driver_queue, resultados, lock, total, use_local, tracker)
+        except Exception as e:
+            # Falló el propio manejo del error (p. ej. la base del tracker): el hilo sigue
+            logger.error(f"[{threading.current_thread().name}] Error inesperado con el ítem {tarea.idx}: {e}")
+        finally:
+            # Una tarea que queda abierta deja a los demás hilos esperando para siempre
+            if tarea.en_curso:
+                cola.fallar(tarea, ERROR)
 
-def worker(task_queue, driver_queue, resultados, lock, total, use_local):
+def procesar_tarea(tarea, cola, driver_queue, resultados, lock, total, use_local, tracker):
+    """Un intento de un ítem: termina con cola.completar() o con cola.fallar() (reintento o falla final)."""
     tname = threading.current_thread().name
+    idx, item = tarea.idx, tarea.item
 
-    while True:
-        try:
-            idx, item = task_queue.get_nowait()
-        except Empty:
-            return
+    seccion = item.get("categoria", "")
+    url = item.get("link", "")
+    intento = f" (intento {tarea.intento})" if tarea.intento > 1 else ""
+    logger.info(f"[{tname}] Inicio item {idx}/{total}{intento}")
+    driver = None
+    turno = None
 
-        mem_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
-        logger.info(f"[{tname}] Inicio item {idx}/{total} - Memoria inicial (KB): {mem_inicial}")
+    try:
+        driver = tomar_driver(driver_queue, use_local, tname)
+        # Lugar en la concurrencia AIMD del dominio y token del rate limiter
+        with span("ritmo.turno", url=url):
+            turno = dominio(url).entrar()
+        logger.info(f"[{tname}] [{idx}/{total}] Abriendo {url}")
+        inicio_get = time.perf_counter()
+        with CARGA_PAGINA.medir(store=STORE, section=seccion), span("driver.get", url=url, section=seccion):
+            driver.get(url)
+        turno.latencia = time.perf_counter() - inicio_get
 
         try:
-            try:
-                driver = driver_queue.get(timeout=10)
-            except Empty:
-                logger.error(f"[{tname}] No se pudo obtener driver en 10s para ítem {idx}, lo marco como ERROR.")
-                send_alert_message(
-                    f"[{tname}] No se pudo obtener driver en 10s para ítem {idx}, lo marco como ERROR."
-                )
-                item["modelo_id"]      = ""
-                item["disponible"]     = []
-                item["no_disponible"]  = []
-                item["financiacion"]   = []
-                with lock:
-                    resultados.append(item)
-                task_queue.task_done()
-
-                continue
-
-            url = item.get("link", "")
-            logger.info(f"[{tname}] [{idx}/{total}] Abriendo {url}")
-            try:
-                driver.get(url)
-            except WebDriverException as e:
-                logger.error(f"[{tname}] [{idx}/{total}] Driver inválido (GET): {e}")
-                try:
-                    driver.quit()
-                except Exception:
-                    pass
-                driver = None
-
-                creado = False
-                for intento in range(2):
-                    try:
-                        nuevo = initialize_driver_local() if use_local else initialize_driver_remote()
-                        driver_queue.put(nuevo)
-                        creado = True
-                        break
-                    except Exception as ex_init:
-                        logger.warning(f"[{tname}] Falló recrear driver (intento {intento+1}): {ex_init}")
-                        time.sleep(1)
-
-                if not creado:
-                    logger.error(f"[{tname}] No pude recrear driver tras 2 intentos, marco ítem {idx} como ERROR.")
-                    item["modelo_id"]      = "ERROR_INIT_DRIVER"
-                    item["disponible"]     = []
-                    item["no_disponible"]  = []
-                    item["financiacion"]   = []
-                    with lock:
-                        resultados.append(item)
-                    task_queue.task_done()
-                    return
-                driver = driver_queue.get(timeout=10)
-                driver.get(url)
-
-            try:
+            with span("wait", url=url, espera="readyState"):
                 WebDriverWait(driver, 10).until(
                     lambda d: d.execute_script("return document.readyState") == "complete"
                 )
-            except (TimeoutException, WebDriverException):
-                logger.warning(f"[{tname}] [{idx}/{total}] Timeout esperando readyState")
+        except TimeoutException:
+            logger.warning(f"[{tname}] [{idx}/{total}] Timeout esperando readyState")
 
+        with span("scroll", url=url):
             scroll_page(driver)
 
-            try:
+        try:
+            with span("wait", url=url, espera="widget_cuotas"):
                 WebDriverWait(driver, 10).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, "div.dash-theme-6-x-wrapperModalCC"))
                 )
-            except (TimeoutException, WebDriverException):
-                logger.warning(f"[{tname}] [{idx}/{total}] Widget cuotas no apareció en 10s")
+        except TimeoutException:
+            logger.warning(f"[{tname}] [{idx}/{total}] Widget cuotas no apareció en 10s")
 
-            time.sleep(1)
-            soup = BeautifulSoup(driver.page_source, "html.parser")
+        time.sleep(1)
+        with PARSEO.medir(store=STORE, section=seccion), span("parse", url=url, section=seccion):
+            html = driver.page_source
+            verificar_pagina(html)
+            soup = BeautifulSoup(html, "html.parser")
 
             modelo, disp, nodisp, cuotas_bancos = "N/A", [], [], []
             try:
                 modelo       = extraer_modelo_id(soup)
                 disp, nodisp = extraer_talles(soup)
-                cuotas_bancos = extraer_cuotas_bancos(soup)
+                cuotas_bancos = cuotas_dash(soup)
             except Exception as e:
                 logger.warning(f"[{tname}] [{idx}/{total}] Error extrayendo datos: {e}")
 
-            num_wrappers = len(soup.select("div.dash-theme-6-x-wrapperModalCC"))
-            logger.info(f"[{tname}] [{idx}/{total}] Encontré {num_wrappers} wrappers en {url}")
-
-            item["modelo_id"]      = modelo
-            item["disponible"]     = disp
-            item["no_disponible"]  = nodisp
-            item["financiacion"]   = cuotas_bancos
-
-            logger.info(f"[{tname}] [{idx}/{total}] → Modelo: {modelo}")
-            logger.info(f"[{tname}] [{idx}/{total}] → Disponibles: {disp}")
-            logger.info(f"[{tname}] [{idx}/{total}] → No disponibles: {nodisp}")
-            logger.info(f"[{tname}] [{idx}/{total}] → Cuotas/Bancos: {cuotas_bancos}")
-
-            mem_final = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
-            logger.info(f"[{tname}] Item {idx} finalizado - Memoria final (KB): {mem_final}")
-
-        except WebDriverException as e:
-            logger.error(f"[{tname}] [{idx}/{total}] WebDriverException imprevisto: {e}")
-            try:
-                driver.quit()
-            except Exception:
-                pass
-
-            creado = False
-            for intento in range(2):
-                try:
-                    nuevo = initialize_driver_local() if use_local else initialize_driver_remote()
-                    driver_queue.put(nuevo)
-                    creado = True
-                    break
-                except Exception as ex_init:
-                    logger.warning(f"[{tname}] Falló recrear driver (intento {intento+1}): {ex_init}")
-                    time.sleep(1)
-
-            if not creado:
-                logger.error(f"[{tname}] No pude recrear driver tras 2 intentos, marco ítem {idx} como ERROR.")
-                item["modelo_id"]      = "ERROR_INIT_DRIVER"
-                item["disponible"]     = []
-                item["no_disponible"]  = []
-                item["financiacion"]   = []
-                with lock:
-                    resultados.append(item)
-                task_queue.task_done()
-                return
-
-            driver = driver_queue.get(timeout=10)
-            try:
-                driver.get(item.get("link", ""))
-            except Exception:
-                pass
-
-        except Exception as e:
-            logger.error(f"[{tname}] [{idx}/{total}] Error inesperado: {e}")
+        num_wrappers = len(soup.select("div.dash-theme-6-x-wrapperModalCC"))
+        logger.info(f"[{tname}] [{idx}/{total}] Encontré {num_wrappers} wrappers en {url}")
+
+        item["modelo_id"]      = modelo
+        item["disponible"]     = disp
+        item["no_disponible"]  = nodisp
+        item["financiacion"]   = cuotas_bancos
+        item.pop("error", None)
+
+        logger.info(f"[{tname}] [{idx}/{total}] → Modelo: {modelo}")
+        logger.info(f"[{tname}] [{idx}/{total}] → Disponibles: {disp}")
+        logger.info(f"[{tname}] [{idx}/{total}] → No disponibles: {nodisp}")
+        logger.info(f"[{tname}] [{idx}/{total}] → Cuotas/Bancos: {cuotas_bancos}")
+
+        ITEMS.inc(store=STORE, section=seccion)
+        RSS.set(rss_actual_kb(), store=STORE)
+
+    except Exception as e:
+        clase = clasificar_fallo(e)
+        # Primero se cierra (o reagenda) la tarea; después los efectos que pueden fallar
+        espera = cola.fallar(tarea, clase, e.espera if isinstance(e, FalloItem) else 0.0)
+        if turno:
+            if clase == BLOQUEADO:
+                logger.warning(f"[{tname}] [{idx}/{total}] Página de bloqueo ('{e.detalle}'), bajo el ritmo")
+                turno.marcar(SOBRECARGA, e.detalle)
+            else:
+                turno.fallo(e)
+        if isinstance(e, WebDriverException):
+            ERRORES_WEBDRIVER.inc(store=STORE, section=seccion)
+        if clase == DRIVER_CAIDO:
+            reponer_driver(driver_queue, driver, use_local, tname)
+            driver = None
+
+        if espera is not None:
+            logger.warning(
+                f"[{tname}] [{idx}/{total}] Falla {clase} ({e}); reintento en {espera:.1f}s"
+            )
+        else:
+            logger.error(f"[{tname}] [{idx}/{total}] Falla {clase} definitiva tras {tarea.intento} intento(s): {e}")
             item["modelo_id"]      = item.get("modelo_id", "N/A")
             item["disponible"]     = item.get("disponible", [])
             item["no_disponible"]  = item.get("no_disponible", [])
             item["financiacion"]   = item.get("financiacion", [])
-
-        finally:
-            if 'driver' in locals() and driver:
-                try:
-                    driver_queue.put(driver)
-                except Exception as e_put:
-                    logger.warning(f"[{tname}] Error devolviendo driver al pool: {e_put}")
-
+            item["error"]          = clase
             with lock:
                 resultados.append(item)
-
-            task_queue.task_done()
-            logger.info(f"[{tname}] Terminado item {idx}/{total}")
-
-def progress_reporter(total, resultados, stop_event):
+            tracker.error()
+
+    else:
+        with lock:
+            resultados.append(item)
+        cola.completar(tarea)
+
+    finally:
+        if turno:
+            turno.terminar()
+        if driver:
+            devolver_driver(driver_queue, driver)
+        logger.info(f"[{tname}] Terminado item {idx}/{total}")
+
+def progress_reporter(total, resultados, stop_event, tracker, threads, driver_queue, ritmo, cola):
+    """
+    Publica el progreso en el Job cada PUBLISH_INTERVAL segundos (lo lee
+    /api/runs/<id>/progress/) y lo loguea cada PROGRESS_INTERVAL segundos.
+    """
     last_count = -1
     stagnation = 0
+    ticks_por_log = max(PROGRESS_INTERVAL // PUBLISH_INTERVAL, 1)
+    tick = 0
 
     while not stop_event.is_set():
         procesados = len(resultados)
+        tracker.publicar(
+            procesados,
+            active_workers=sum(t.is_alive() for t in threads),
+            idle_drivers=driver_queue.qsize(),
+            concurrency_limit=ritmo.limite,
+            retries_pending=cola.reintentos_en_espera,
+        )
+        tick += 1
+        if (tick - 1) % ticks_por_log:
+            stop_event.wait(PUBLISH_INTERVAL)
+            continue
+
         if procesados != last_count:
             porcentaje = (procesados / total) * 100 if total else 100
-            logger.info(f"Progreso: {procesados}/{total} ({porcentaje:.2f}%)")
+            logger.info(f"Progreso: {procesados}/{total} ({porcentaje:.2f}%) | concurrencia {ritmo.limite}")
             last_count = procesados
             stagnation = 0
         else:
@@ -305,10 +313,12 @@ def progress_reporter(total, resultados, stop_event):
                 mins = (stagnation * PROGRESS_INTERVAL) // 60
                 segs = (stagnation * PROGRESS_INTERVAL) % 60
                 logger.warning(f"No hubo avance en los últimos {mins}m {segs}s; {procesados}/{total} sigue igual.")
-        stop_event.wait(PROGRESS_INTERVAL)
+        stop_event.wait(PUBLISH_INTERVAL)
 
-class Command(BaseCommand):
+class Command(ComandoPerfilable):
     help = 'Scraper Dash con pool de WebDrivers, threading variable, progreso y alertas a Slack'
+    store = "dash"
+    perfil_por_muestreo = True
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -320,7 +330,12 @@ class Command(BaseCommand):
             '--threads',
             type=int,
             default=4,
-            help='Cantidad de hilos a utilizar (por defecto: 4)'
+            help='Máximo de hilos/drivers (por defecto: 4); cuántos trabajan a la vez lo ajusta el control AIMD'
+        )
+        parser.add_argument(
+            '--rps',
+            type=float,
+            help='Pedidos por segundo máximos a la tienda (por defecto: RITMO_RPS)'
         )
         parser.add_argument(
             '--output',
@@ -343,7 +358,7 @@ class Command(BaseCommand):
 
         OUTPUT_PATH = JSON_DIR / output_name
 
-        send_alert_message(f"🚀 Scraper Dash iniciado con {num_threads} hilos. Salida: {output_name}")
+        send_alert_message(f"🚀 Scraper Dash iniciado con hasta {num_threads} hilos. Salida: {output_name}")
 
         logging.basicConfig(
             level=logging.INFO,
@@ -352,81 +367,89 @@ class Command(BaseCommand):
         )
 
         inicio_total = datetime.now()
+        session_id = inicio_total.strftime("%Y%m%d_%H%M%S")
 
-        try:
-            with open(JSON_PATH, encoding="utf-8") as f:
-                items = json.load(f)
-            total = len(items)
-            logger.info(f"Hilos activos al inicio: {threading.active_count()}")
-            logger.info(f"Cargados {total} productos desde {JSON_PATH}")
-
-            driver_queue = Queue(maxsize=num_threads)
-            for _ in range(num_threads):
-                try:
-                    if use_local:
-                        driver_queue.put(initialize_driver_local())
-                    else:
-                        driver_queue.put(initialize_driver_remote())
-                except Exception as e:
-                    logger.error(f"Error iniciando driver {'local' if use_local else 'remoto'}: {e}")
-
-            task_queue = Queue()
-            for idx, item in enumerate(items, start=1):
-                task_queue.put((idx, item))
-
-            resultados = []
-            lock = threading.Lock()
-
-            stop_event = threading.Event()
-            reporter = threading.Thread(
-                target=progress_reporter,
-                args=(total, resultados, stop_event),
-                name="ProgressReporter",
-                daemon=True
-            )
-            reporter.start()
-
-            threads = []
-            for i in range(num_threads):
-                t = threading.Thread(
-                    target=worker,
-                    name=f"ScraperDash_{i+1}",
-                    args=(task_queue, driver_queue, resultados, lock, total, use_local)
+        with registrar_run("dash_2", STORE) as job, \
+                traza(session_id, STORE, "dash_2.run", **{"dash.threads": num_threads}):
+            try:
+                with open(JSON_PATH, encoding="utf-8") as f:
+                    items = json.load(f)
+                total = len(items)
+                logger.info(f"Hilos activos al inicio: {threading.active_count()}")
+                logger.info(f"Cargados {total} productos desde {JSON_PATH}")
+                tracker = ProgressTracker(total, job)
+                ritmo = dominio(BASE_URL, maximo=num_threads, rps=options.get('rps'))
+
+                driver_queue = Queue(maxsize=num_threads)
+                for _ in range(num_threads):
+                    try:
+                        driver_queue.put(crear_driver(use_local))
+                    except Exception as e:
+                        logger.error(f"Error iniciando driver {'local' if use_local else 'remoto'}: {e}")
+
+                cola = ColaReintentos(items, store=STORE)
+
+                resultados = []
+                lock = threading.Lock()
+
+                stop_event = threading.Event()
+                threads = []
+                reporter = threading.Thread(
+                    target=progress_reporter,
+                    args=(total, resultados, stop_event, tracker, threads, driver_queue, ritmo, cola),
+                    name="ProgressReporter",
+                    daemon=True
+                )
+                reporter.start()
+
+                for i in range(num_threads):
+                    t = threading.Thread(
+                        target=worker,
+                        name=f"ScraperDash_{i+1}",
+                        args=(cola, driver_queue, resultados, lock, total, use_local, tracker)
+                    )
+                    threads.append(t)
+                    t.start()
+
+                for t in threads:
+                    t.join()
+
+                stop_event.set()
+                reporter.join(timeout=5)
+                tracker.publicar(
+                    len(resultados), active_workers=0, idle_drivers=driver_queue.qsize(),
+                    concurrency_limit=ritmo.limite, retries_pending=0,
                 )
-                threads.append(t)
-                t.start()
-
-            task_queue.join()
-
-            stop_event.set()
-            reporter.join(timeout=5)
-
-            while not driver_queue.empty():
-                try:
-                    d = driver_queue.get_nowait()
-                    d.quit()
-                except Empty:
-                    break
-                except Exception:
-                    pass
-
-            with open(OUTPUT_PATH, 'w', encoding='utf-8') as out_f:
-                json.dump(resultados, out_f, ensure_ascii=False, indent=2)
-
-            fin_total = datetime.now()
-            duracion = fin_total - inicio_total
-            fecha_inicio = inicio_total.strftime("%d-%m-%Y %H:%M:%S")
-            fecha_fin = fin_total.strftime("%d-%m-%Y %H:%M:%S")
-            segundos = duracion.total_seconds()
-            logger.info(f"Inicio: {fecha_inicio} | Fin: {fecha_fin} | Duración total: {segundos:.2f} segundos")
-
-            send_alert_message(
-                f"✅ Scraper completado: {len(resultados)}/{total} productos procesados.\n"
-                f"Archivo: {output_name}\n"
-                f"Inicio: {fecha_inicio} | Fin: {fecha_fin} | Duración: {segundos:.2f}s"
-            )
 
-        except Exception as e:
-            logger.error(f"Fallo general del scraper: {e}")
-            send_alert_message(f"❌ Scraper producto por producto falló con error: {e}")
-            raise
+                while not driver_queue.empty():
+                    try:
+                        d = driver_queue.get_nowait()
+                        d.quit()
+                    except Empty:
+                        break
+                    except Exception:
+                        pass
+
+                with open(OUTPUT_PATH, 'w', encoding='utf-8') as out_f:
+                    json.dump(resultados, out_f, ensure_ascii=False, indent=2, default=serializar)
+
+                fin_total = datetime.now()
+                duracion = fin_total - inicio_total
+                fecha_inicio = inicio_total.strftime("%d-%m-%Y %H:%M:%S")
+                fecha_fin = fin_total.strftime("%d-%m-%Y %H:%M:%S")
+                segundos = duracion.total_seconds()
+                logger.info(f"Inicio: {fecha_inicio} | Fin: {fecha_fin} | Duración total: {segundos:.2f} segundos")
+                resumen_fallos = cola.resumen()
+                logger.info(resumen_fallos)
+
+                send_alert_message(
+                    f"✅ Scraper completado: {len(resultados)}/{total} productos procesados.\n"
+                    f"Archivo: {output_name}\n"
+                    f"Inicio: {fecha_inicio} | Fin: {fecha_fin} | Duración: {segundos:.2f}s\n"
+                    f"{resumen_fallos}"
+                )
+
+            except Exception as e:
+                logger.error(f"Fallo general del scraper: {e}")
+                send_alert_message(f"❌ Scraper producto por producto falló con error: {e}")
+                raise
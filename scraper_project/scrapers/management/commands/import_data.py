@@ -1,13 +1,16 @@
 import json
-import re
 from decimal import Decimal
 from django.utils import timezone
 from django.db import transaction
-from django.core.management.base import BaseCommand
+from scrapers.perfilado import ComandoPerfilable
 from scrapers.models import (
     Brand, Category, Page, Product,
-    Pricing, ProductQuota, Size, ProductSize
+    ProductQuota, Size, ProductSize
 )
+from scrapers.utils_import import refrescar_ultimos_precios, registrar_precio
+from scrapers.metricas import instrumentar_import
+from scrapers.financiacion import extraer_financiacion
+from scrapers.registro import Producto
 import time
 from pathlib import Path
 from django.conf import settings
@@ -25,19 +28,9 @@ JSON_FILES = [
 ]
 
 
-def parse_decimal(s):
-    if not s or s.strip().upper() in ("N/A", ""):
-        return None
-    clean = s.replace('$','').replace('.','').strip().replace('%','')
-    if ',' in clean and clean.count(',') == 1:
-        clean = clean.replace(',', '.')
-    try:
-        return Decimal(clean)
-    except:
-        return None
-
-class Command(BaseCommand):
+class Command(ComandoPerfilable):
     help = 'Importa y cuenta productos y pricings nuevos por JSON'
+    store = "import_data"
 
     def handle(self, *args, **opts):
         self.stdout.write(f"CWD: {os.getcwd()}")
@@ -61,7 +54,7 @@ class Command(BaseCommand):
             last_log = time.time()
             processed = 0
 
-            with transaction.atomic():
+            with instrumentar_import("import_data", path), transaction.atomic():
                 pending_sizes = []
 
                 for obj in data:
@@ -71,19 +64,16 @@ class Command(BaseCommand):
                         self.stdout.write(f'  {processed}/{total} registros procesados ({pct:.1f}%)')
                         last_log = time.time()
 
-                    page = Page.objects.filter(name=obj.get('nombre_pagina','').strip()).first()
+                    p = Producto.desde_dict(obj)
+                    page = Page.objects.filter(name=p.nombre_pagina or '').first()
                     if not page:
                         continue
 
-                    raw_brand = obj.get('marca','').strip()
-                    brand = Brand.objects.get_or_create(name=raw_brand.lower())[0] if raw_brand else otro_brand
-
-                    raw_cat = obj.get('categoria','').strip()
-                    category = Category.objects.get_or_create(name=raw_cat.lower())[0] if raw_cat else otro_cat
+                    brand = Brand.objects.get_or_create(name=p.marca.lower())[0] if p.marca else otro_brand
+                    category = Category.objects.get_or_create(name=p.categoria.lower())[0] if p.categoria else otro_cat
 
-                    raw_sku = obj.get('sku','').strip().upper()
-                    sku = raw_sku if raw_sku and raw_sku!='N/A' else None
-                    lookup = {'sku': sku} if sku else {'link': obj.get('link','').strip()}
+                    sku = p.sku.upper() if p.sku else None
+                    lookup = {'sku': sku} if sku else {'link': p.link or ''}
 
                     prod, was_created = Product.objects.get_or_create(
                         **lookup,
@@ -93,60 +83,51 @@ class Command(BaseCommand):
                     if was_created:
                         prod_created += 1
 
-                    prod.name          = obj.get('nombre','').strip()
+                    prod.name          = p.nombre or ''
                     prod.brand         = brand
                     prod.category      = category
-                    prod.product_class = obj.get('clase_de_producto','').strip()
-                    prod.model_code    = obj.get('modelo_id','').strip()
+                    prod.product_class = p.clase_de_producto or ''
+                    prod.model_code    = p.modelo_id or ''
                     prod.sku           = sku
-                    prod.image_url     = obj.get('imagen_url','').strip()
-                    prod.link          = obj.get('link','').strip()
+                    prod.image_url     = p.imagen_url or ''
+                    prod.link          = p.link or ''
                     prod.updated_at    = now
                     prod.save()
 
-                    price_current = parse_decimal(obj.get('precio',''))
-                    if price_current is not None:
-                        env = obj.get('envio_gratis','')
-                        free_shipping = env if isinstance(env,bool) else str(env).lower() in ('sí','si','yes','true')
-                        pricing, pricing_new = Pricing.objects.update_or_create(
-                            product=prod, page=page,
-                            defaults={
-                                'price_current': price_current,
-                                'price_prev':    parse_decimal(obj.get('precio_anterior','')),
-                                'discount':      parse_decimal(obj.get('descuento','')),
-                                'free_shipping': free_shipping,
-                                'currency':      'ARS',
-                                'recorded_at':   now,
-                            }
-                        )
-                        if pricing_new:
+                    if p.precio is not None:
+                        pricing = registrar_precio(prod, page, {
+                            'price_current': p.precio,
+                            'price_prev':    p.precio_anterior,
+                            'discount':      p.descuento,
+                            'free_shipping': p.envio_gratis,
+                            'currency':      'ARS',
+                            'recorded_at':   now,
+                        })
+                        if pricing:
                             pricing_created += 1
 
-                    cuotas_txt = obj.get('cuotas','')
-                    m = re.search(r'(\d+)', cuotas_txt)
-                    if m:
-                        count = int(m.group(1))
-                        monto_match = re.search(r'de\s*\$?([\d\.,]+)', cuotas_txt)
-                        price_per = parse_decimal(monto_match.group(1)) if monto_match else Decimal('0')
+                    financiacion = extraer_financiacion(p.cuotas)
+                    if financiacion and financiacion.num_cuotas:
                         ProductQuota.objects.update_or_create(
                             product=prod, page=page, payment_method='default',
                             defaults={
-                                'quota_count':     count,
-                                'price_per_quota': price_per,
-                                'interest_free':   'sin interés' in cuotas_txt.lower()
+                                'quota_count':     financiacion.num_cuotas,
+                                'price_per_quota': financiacion.precio_por_cuota or Decimal('0'),
+                                'interest_free':   bool(financiacion.sin_interes)
                             }
                         )
 
-                    for size_str in obj.get('disponible',[]) or []:
+                    for size_str in p.disponible:
                         sz, _ = Size.objects.get_or_create(name=size_str)
                         pending_sizes.append(ProductSize(
                             product=prod, size=sz, available=1, country='AR'))
-                    for size_str in obj.get('no_disponible',[]) or []:
+                    for size_str in p.no_disponible:
                         sz, _ = Size.objects.get_or_create(name=size_str)
                         pending_sizes.append(ProductSize(
                             product=prod, size=sz, available=0, country='AR'))
 
                 ProductSize.objects.bulk_create(pending_sizes, ignore_conflicts=True)
+                refrescar_ultimos_precios()
 
             self.stdout.write(self.style.SUCCESS(
                 f'{path} → {prod_created} productos nuevos, {pricing_created} pricings nuevos.'
@@ -1,7 +1,7 @@
 import os
 import json
-from decimal import Decimal
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
+from scrapers.perfilado import ComandoPerfilable
 from django.utils import timezone
 from django.conf import settings
 from django.db import transaction
@@ -9,39 +9,55 @@ from scrapers.models import (
     Brand, Category, Product, Page, ProductPage,
     Pricing, ProductQuota, Size, ProductSize
 )
+from scrapers.utils_import import purgar_pagina, refrescar_ultimos_precios, upsert_productos
+from scrapers.metricas import instrumentar_import
+from scrapers.registro import Producto
 
-def parse_decimal(s):
-    if not s or s.strip().upper() in ("N/A", ""):
+def armar_fila(item):
+    p = Producto.desde_dict(item)
+    if not p.modelo_id:
         return None
-    clean = s.replace('$','').replace('.','').strip().replace('%','')
-    if ',' in clean and clean.count(',') == 1:
-        clean = clean.replace(',', '.')
-    try:
-        return Decimal(clean)
-    except:
-        return None
-
-def parse_bool(val):
-    if isinstance(val, bool):
-        return val
-    val = str(val).strip().lower()
-    return val in ["true", "1", "sí", "si", "gratis", "envío gratis"]
-
-def get_discount(raw_discount, price, original_price):
-    if raw_discount:
-        try:
-            return Decimal(str(raw_discount).replace('%', '').replace('-', ''))
-        except:
-            pass
-    if original_price and price and original_price > price:
-        try:
-            return ((original_price - price) / original_price * 100).quantize(Decimal("0.01"))
-        except:
-            pass
-    return None
 
-class Command(BaseCommand):
+    return {
+        "model_code": p.modelo_id,
+        "producto": {
+            "name": p.nombre or "",
+            "brand": p.marca or "",
+            "category": p.categoria or "",
+            "product_class": p.clase_de_producto or "",
+            "sku": p.sku,
+            "image_url": p.imagen_url,
+            "link": p.link or "",
+            "provider_code": p.modelo_id,
+        },
+        "pagina": {
+            "cuotas": p.cuotas,
+            "payment_info": "",
+            "shipping_info": "Envio gratis" if p.envio_gratis else "",
+        },
+        "precio": {
+            "price_current": p.precio,
+            "price_prev": p.precio_anterior,
+            "discount": p.descuento_calculado(),
+            "free_shipping": p.envio_gratis,
+            "currency": "ARS",
+            "recorded_at": timezone.now(),
+        },
+        "talles": [(t, 1) for t in p.disponible] + [(t, 0) for t in p.no_disponible],
+        "cuotas": [
+            {
+                "payment_method": cuota.banco,
+                "quota_count": cuota.num_cuotas,
+                "price_per_quota": cuota.precio_por_cuota,
+                "interest_free": cuota.sin_interes,
+            }
+            for cuota in p.financiacion
+        ],
+    }
+
+class Command(ComandoPerfilable):
     help = "Importa productos desde JSON de Dash para page_id=2"
+    store = "dash"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -55,6 +71,11 @@ class Command(BaseCommand):
             action="store_true",
             help="Borra todos los registros relacionados con la página id=2 antes de cargar"
         )
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Actualiza los productos existentes (y registra precios que cambiaron) en vez de saltearlos"
+        )
 
     def handle(self, *args, **options):
         path = options["file"]
@@ -67,7 +88,7 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f"Error leyendo JSON: {e}")
 
-        with transaction.atomic():
+        with instrumentar_import("dash", path), transaction.atomic():
             try:
                 page_obj = Page.objects.get(pk=2)
             except Page.DoesNotExist:
@@ -75,29 +96,28 @@ class Command(BaseCommand):
 
             if options["clear"]:
                 self.stdout.write("🧹 Borrando registros relacionados con page_id=2…")
-                ProductSize.objects.filter(product__pages__page=page_obj).delete()
-                ProductQuota.objects.filter(product__pages__page=page_obj).delete()
-                Pricing.objects.filter(page=page_obj).delete()
-                ProductPage.objects.filter(page=page_obj).delete()
-                Product.objects.filter(pages__page=page_obj).delete()
+                for tabla, filas in purgar_pagina(page_obj).items():
+                    self.stdout.write(f"   {tabla}: {filas} filas borradas")
+
+            if options["upsert"]:
+                filas = [f for f in (armar_fila(item) for item in data) if f]
+                stats = upsert_productos(page_obj, filas)
+                refrescar_ultimos_precios()
+                self.stdout.write(self.style.SUCCESS(
+                    f"✔️ Upsert Dash (page_id=2): {stats['creados']} nuevos, "
+                    f"{stats['actualizados']} actualizados, {stats['precios']} precios nuevos."
+                ))
+                return
 
             total = 0
             for item in data:
-                model_code = item.get("modelo_id")
+                p = Producto.desde_dict(item)
+                model_code = p.modelo_id
                 if not model_code:
                     continue
 
-                brand_obj, _ = Brand.objects.get_or_create(
-                    name=(item.get("marca") or "").strip()
-                )
-                category_obj, _ = Category.objects.get_or_create(
-                    name=(item.get("categoria") or "").strip()
-                )
-
-                price = parse_decimal(item.get("precio"))
-                original_price = parse_decimal(item.get("precio_anterior"))
-                discount = get_discount(item.get("descuento"), price, original_price)
-
+                brand_obj, _ = Brand.objects.get_or_create(name=p.marca or "")
+                category_obj, _ = Category.objects.get_or_create(name=p.categoria or "")
 
                 producto_existente = Product.objects.filter(
                     model_code=model_code
@@ -107,57 +127,56 @@ class Command(BaseCommand):
                     continue
 
                 product = Product.objects.create(
-                    name=(item.get("nombre") or "").strip(),
+                    name=p.nombre or "",
                     brand=brand_obj,
                     category=category_obj,
-                    product_class=(item.get("clase_de_producto") or "").strip(),
+                    product_class=p.clase_de_producto or "",
                     model_code=model_code,
-                    sku=item.get("sku"),
-                    image_url=item.get("imagen_url"),
-                    link=item.get("link"),
+                    sku=p.sku,
+                    image_url=p.imagen_url,
+                    link=p.link or "",
                     created_at=timezone.now(),
                     updated_at=timezone.now(),
-                    provider_code=item.get("modelo_id")
+                    provider_code=model_code
                 )
 
                 ProductPage.objects.create(
                     product=product,
                     page=page_obj,
-                    cuotas=item.get("cuotas"),
+                    cuotas=p.cuotas,
                     payment_info="",
-                    shipping_info=item.get("envio_gratis") or ""
+                    shipping_info="Envio gratis" if p.envio_gratis else ""
                 )
 
                 Pricing.objects.create(
                     product=product,
                     page=page_obj,
-                    price_current=price,
-                    price_prev=original_price,
-                    discount=discount,
-                    free_shipping=parse_bool(item.get("envio_gratis")),
+                    price_current=p.precio,
+                    price_prev=p.precio_anterior,
+                    discount=p.descuento_calculado(),
+                    free_shipping=p.envio_gratis,
                     currency="ARS",
                     recorded_at=timezone.now()
                 )
 
-                for size_name in item.get("disponible", []):
+                for size_name in p.disponible:
                     size_obj, _ = Size.objects.get_or_create(name=size_name)
                     ProductSize.objects.create(product=product, size=size_obj, available=1)
-                for size_name in item.get("no_disponible", []):
+                for size_name in p.no_disponible:
                     size_obj, _ = Size.objects.get_or_create(name=size_name)
                     ProductSize.objects.create(product=product, size=size_obj, available=0)
 
-                for cuota in item.get("financiacion", []):
-                    if not cuota.get("num_cuotas") or not cuota.get("precio_por_cuota"):
-                        continue
+                for cuota in p.financiacion:
                     ProductQuota.objects.create(
                         product=product,
                         page=page_obj,
-                        payment_method=cuota.get("banco") or "",
-                        quota_count=int(cuota.get("num_cuotas")),
-                        price_per_quota=Decimal(str(cuota.get("precio_por_cuota"))),
-                        interest_free=parse_bool(cuota.get("sin_interes"))
+                        payment_method=cuota.banco,
+                        quota_count=cuota.num_cuotas,
+                        price_per_quota=cuota.precio_por_cuota,
+                        interest_free=cuota.sin_interes
                     )
 
                 total += 1
 
+            refrescar_ultimos_precios()
             self.stdout.write(self.style.SUCCESS(f"✔️ Importados {total} productos para Dash (page_id=2)."))
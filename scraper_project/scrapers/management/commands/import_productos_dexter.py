@@ -1,47 +1,55 @@
 import os
 import json
-from decimal import Decimal, InvalidOperation
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
+from scrapers.perfilado import ComandoPerfilable
 from django.utils import timezone
 from django.conf import settings
 from django.db import transaction
 from scrapers.models import (
     Brand, Category, Product, Page, ProductPage,
-    Pricing, ProductQuota, Size, ProductSize
+    Pricing, Size, ProductSize
 )
+from scrapers.utils_import import purgar_pagina, refrescar_ultimos_precios, upsert_productos
+from scrapers.metricas import instrumentar_import
+from scrapers.registro import Producto
 
-def parse_decimal(s):
-    if not s or s.strip().upper() in ("N/A", ""):
+def armar_fila(item, marca_otro):
+    p = Producto.desde_dict(item)
+    if not p.modelo_id:
         return None
-    clean = s.replace('$', '').replace('.', '').strip().replace('%', '')
-    if ',' in clean and clean.count(',') == 1:
-        clean = clean.replace(',', '.')
-    try:
-        return Decimal(clean)
-    except:
-        return None
-
-def parse_bool(val):
-    if isinstance(val, bool):
-        return val
-    val = str(val).strip().lower()
-    return val in ["true", "1", "sí", "si", "gratis", "envío gratis"]
-
-def get_discount(raw_discount, price, original_price):
-    if raw_discount:
-        try:
-            return Decimal(str(raw_discount).replace('%', '').strip())
-        except:
-            pass
-    if original_price and price and original_price > price:
-        try:
-            return ((original_price - price) / original_price * 100).quantize(Decimal("0.01"))
-        except:
-            pass
-    return None
 
-class Command(BaseCommand):
+    return {
+        "model_code": p.modelo_id,
+        "producto": {
+            "name": p.nombre or "",
+            "brand": p.marca or marca_otro,
+            "category": p.categoria or "",
+            "product_class": p.clase_de_producto or "",
+            "sku": p.modelo_id,
+            "image_url": p.imagen_url,
+            "link": p.link or "",
+            "provider_code": p.modelo_id,
+        },
+        "pagina": {
+            "cuotas": p.cuotas or "",
+            "payment_info": "",
+            "shipping_info": "",
+        },
+        "precio": {
+            "price_current": p.precio,
+            "price_prev": p.precio_anterior,
+            "discount": p.descuento_calculado(),
+            "free_shipping": False,
+            "currency": "ARS",
+            "recorded_at": item.get("created") or timezone.now(),
+        },
+        "talles": [(t, 1) for t in p.disponible] + [(t, 0) for t in p.no_disponible],
+        "cuotas": None,
+    }
+
+class Command(ComandoPerfilable):
     help = "Importa productos desde productos_dexter_*.json para page_id=1 (Dexter)"
+    store = "dexter"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -55,6 +63,11 @@ class Command(BaseCommand):
             action="store_true",
             help="Borra todos los registros relacionados con la página id=1 antes de cargar"
         )
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Actualiza los productos existentes (y registra precios que cambiaron) en vez de saltearlos"
+        )
 
     def handle(self, *args, **options):
         path = options["file"]
@@ -67,7 +80,7 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f"Error leyendo JSON: {e}")
 
-        with transaction.atomic():
+        with instrumentar_import("dexter", path), transaction.atomic():
             try:
                 page_obj = Page.objects.get(pk=1)
             except Page.DoesNotExist:
@@ -75,31 +88,33 @@ class Command(BaseCommand):
 
             if options["clear"]:
                 self.stdout.write("🧹 Borrando registros relacionados con page_id=1…")
-                ProductSize.objects.filter(product__pages__page=page_obj).delete()
-                ProductQuota.objects.filter(product__pages__page=page_obj).delete()
-                Pricing.objects.filter(page=page_obj).delete()
-                ProductPage.objects.filter(page=page_obj).delete()
-                Product.objects.filter(pages__page=page_obj).delete()
+                for tabla, filas in purgar_pagina(page_obj).items():
+                    self.stdout.write(f"   {tabla}: {filas} filas borradas")
+
+            if options["upsert"]:
+                marca_otro = Brand.objects.get(name__iexact="otro").name
+                filas = [f for f in (armar_fila(item, marca_otro) for item in data) if f]
+                stats = upsert_productos(page_obj, filas)
+                refrescar_ultimos_precios()
+                self.stdout.write(self.style.SUCCESS(
+                    f"✔️ Upsert Dexter (page_id=1): {stats['creados']} nuevos, "
+                    f"{stats['actualizados']} actualizados, {stats['precios']} precios nuevos."
+                ))
+                return
 
             total = 0
             for item in data:
-                model_code = item.get("modelo_id")
+                p = Producto.desde_dict(item)
+                model_code = p.modelo_id
                 if not model_code:
                     continue
 
-                brand_name = (item.get("marca") or "").strip()
-                if brand_name.upper() in ("N/A", ""):
-                    brand_obj = Brand.objects.get(name__iexact="otro")
+                if p.marca:
+                    brand_obj, _ = Brand.objects.get_or_create(name=p.marca)
                 else:
-                    brand_obj, _ = Brand.objects.get_or_create(name=brand_name)
-
-                category_obj, _ = Category.objects.get_or_create(
-                    name=(item.get("categoria") or "").strip()
-                )
+                    brand_obj = Brand.objects.get(name__iexact="otro")
 
-                price = parse_decimal(item.get("precio"))
-                original_price = parse_decimal(item.get("precio_anterior"))
-                discount = get_discount(item.get("descuento"), price, original_price)
+                category_obj, _ = Category.objects.get_or_create(name=p.categoria or "")
 
                 producto_existente = Product.objects.filter(
                     model_code=model_code
@@ -109,14 +124,14 @@ class Command(BaseCommand):
                     continue
 
                 product = Product.objects.create(
-                    name=(item.get("nombre") or "").strip(),
+                    name=p.nombre or "",
                     brand=brand_obj,
                     category=category_obj,
-                    product_class=(item.get("clase_de_producto") or "").strip(),
+                    product_class=p.clase_de_producto or "",
                     model_code=model_code,
                     sku=model_code,
-                    image_url=item.get("imagen_url"),
-                    link=item.get("link"),
+                    image_url=p.imagen_url,
+                    link=p.link or "",
                     created_at=timezone.now(),
                     updated_at=timezone.now(),
                     provider_code=model_code
@@ -125,7 +140,7 @@ class Command(BaseCommand):
                 ProductPage.objects.create(
                     product=product,
                     page=page_obj,
-                    cuotas=item.get("cuotas") or "",
+                    cuotas=p.cuotas or "",
                     payment_info="",
                     shipping_info=""
                 )
@@ -133,21 +148,22 @@ class Command(BaseCommand):
                 Pricing.objects.create(
                     product=product,
                     page=page_obj,
-                    price_current=price,
-                    price_prev=original_price,
-                    discount=discount,
+                    price_current=p.precio,
+                    price_prev=p.precio_anterior,
+                    discount=p.descuento_calculado(),
                     free_shipping=False,
                     currency="ARS",
                     recorded_at=item.get("created") or timezone.now()
                 )
 
-                for size_name in item.get("disponible", []):
+                for size_name in p.disponible:
                     size_obj, _ = Size.objects.get_or_create(name=size_name)
                     ProductSize.objects.create(product=product, size=size_obj, available=1)
-                for size_name in item.get("no_disponible", []):
+                for size_name in p.no_disponible:
                     size_obj, _ = Size.objects.get_or_create(name=size_name)
                     ProductSize.objects.create(product=product, size=size_obj, available=0)
 
                 total += 1
 
+            refrescar_ultimos_precios()
             self.stdout.write(self.style.SUCCESS(f"✔️ Importados {total} productos para Dexter (page_id=1)."))
@@ -1,34 +1,55 @@
 import os
 import json
-from decimal import Decimal
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
+from scrapers.perfilado import ComandoPerfilable
 from django.utils import timezone
 from django.conf import settings
 from django.db import transaction
 from scrapers.models import (
     Brand, Category, Product, Page, ProductPage,
-    Pricing, ProductQuota, Size, ProductSize
+    Pricing, Size, ProductSize
 )
+from scrapers.utils_import import purgar_pagina, refrescar_ultimos_precios, upsert_productos
+from scrapers.metricas import instrumentar_import
+from scrapers.registro import Producto
 
-def parse_decimal(s):
-    if not s or s.strip().upper() in ("N/A", ""):
+def armar_fila(item, now):
+    p = Producto.desde_dict(item)
+    if not p.modelo_id:
         return None
-    clean = s.replace('$', '').replace('.', '').strip().replace('%', '')
-    if ',' in clean and clean.count(',') == 1:
-        clean = clean.replace(',', '.')
-    try:
-        return Decimal(clean)
-    except:
-        return None
-
-def parse_bool(val):
-    if isinstance(val, bool):
-        return val
-    val = str(val).strip().lower()
-    return val in ["true", "1", "sí", "si", "gratis", "envío gratis"]
 
-class Command(BaseCommand):
+    return {
+        "model_code": p.modelo_id,
+        "producto": {
+            "name": p.nombre or "",
+            "brand": p.marca or "",
+            "category": p.categoria or "",
+            "product_class": p.clase_de_producto or "",
+            "sku": p.sku,
+            "image_url": p.imagen_url,
+            "link": p.link or "",
+            "provider_code": p.modelo_id,
+        },
+        "pagina": {
+            "cuotas": p.cuotas,
+            "payment_info": "",
+            "shipping_info": "Envio gratis" if p.envio_gratis else "",
+        },
+        "precio": {
+            "price_current": p.precio,
+            "price_prev": p.precio_anterior,
+            "discount": p.descuento,
+            "free_shipping": p.envio_gratis,
+            "currency": "ARS",
+            "recorded_at": now,
+        },
+        "talles": [(t, 1) for t in p.disponible] + [(t, 0) for t in p.no_disponible],
+        "cuotas": None,
+    }
+
+class Command(ComandoPerfilable):
     help = "Importa productos desde JSON de Grid para page_id=7"
+    store = "grid"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -42,6 +63,11 @@ class Command(BaseCommand):
             action="store_true",
             help="Borra todos los registros relacionados con la página id=7 antes de cargar"
         )
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Actualiza los productos existentes (y registra precios que cambiaron) en vez de saltearlos"
+        )
 
     def handle(self, *args, **options):
         path = options["file"]
@@ -54,7 +80,7 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f"Error leyendo JSON: {e}")
 
-        with transaction.atomic():
+        with instrumentar_import("grid", path), transaction.atomic():
             try:
                 page_obj = Page.objects.get(pk=6)
             except Page.DoesNotExist:
@@ -62,41 +88,46 @@ class Command(BaseCommand):
 
             if options["clear"]:
                 self.stdout.write("🧹 Borrando registros relacionados con page_id=7…")
-                ProductSize.objects.filter(product__pages__page=page_obj).delete()
-                ProductQuota.objects.filter(product__pages__page=page_obj).delete()
-                Pricing.objects.filter(page=page_obj).delete()
-                ProductPage.objects.filter(page=page_obj).delete()
-                Product.objects.filter(pages__page=page_obj).delete()
+                for tabla, filas in purgar_pagina(page_obj).items():
+                    self.stdout.write(f"   {tabla}: {filas} filas borradas")
 
             now = timezone.now()
+
+            if options["upsert"]:
+                filas = [f for f in (armar_fila(item, now) for item in data) if f]
+                stats = upsert_productos(page_obj, filas, now=now)
+                refrescar_ultimos_precios()
+                self.stdout.write(self.style.SUCCESS(
+                    f"✔️ Upsert Grid (page_id=6): {stats['creados']} nuevos, "
+                    f"{stats['actualizados']} actualizados, {stats['precios']} precios nuevos."
+                ))
+                return
+
             total = 0
 
             print('Cantidad de productos: ', len(data))
             
             for item in data:
-                model_code = item.get("model_id")
+                p = Producto.desde_dict(item)
+                model_code = p.modelo_id
                 if not model_code:
                     continue
 
                 if Product.objects.filter(model_code=model_code, pages__page=page_obj).exists():
                     continue
 
-                brand_obj, _ = Brand.objects.get_or_create(
-                    name=(item.get("marca") or "").strip()
-                )
-                category_obj, _ = Category.objects.get_or_create(
-                    name=(item.get("categoria") or "").strip()
-                )
+                brand_obj, _ = Brand.objects.get_or_create(name=p.marca or "")
+                category_obj, _ = Category.objects.get_or_create(name=p.categoria or "")
 
                 product = Product.objects.create(
-                    name=(item.get("nombre") or "").strip(),
+                    name=p.nombre or "",
                     brand=brand_obj,
                     category=category_obj,
-                    product_class=(item.get("clase_de_producto") or "").strip(),
+                    product_class=p.clase_de_producto or "",
                     model_code=model_code,
-                    sku=item.get("sku"),
-                    image_url=item.get("imagen_url"),
-                    link=item.get("link"),
+                    sku=p.sku,
+                    image_url=p.imagen_url,
+                    link=p.link or "",
                     created_at=now,
                     updated_at=now,
                     provider_code=model_code
@@ -105,29 +136,30 @@ class Command(BaseCommand):
                 ProductPage.objects.create(
                     product=product,
                     page=page_obj,
-                    cuotas=item.get("cuotas"),
+                    cuotas=p.cuotas,
                     payment_info="",
-                    shipping_info=item.get("envio_gratis") or ""
+                    shipping_info="Envio gratis" if p.envio_gratis else ""
                 )
 
                 Pricing.objects.create(
                     product=product,
                     page=page_obj,
-                    price_current=parse_decimal(item.get("precio")),
-                    price_prev=parse_decimal(item.get("precio_anterior")),
-                    discount=parse_decimal(item.get("descuento")),
-                    free_shipping=parse_bool(item.get("envio_gratis")),
+                    price_current=p.precio,
+                    price_prev=p.precio_anterior,
+                    discount=p.descuento,
+                    free_shipping=p.envio_gratis,
                     currency="ARS",
                     recorded_at=now
                 )
 
-                for size in item.get("disponibles", []):
+                for size in p.disponible:
                     size_obj, _ = Size.objects.get_or_create(name=size)
                     ProductSize.objects.create(product=product, size=size_obj, available=1)
-                for size in item.get("no_disponibles", []):
+                for size in p.no_disponible:
                     size_obj, _ = Size.objects.get_or_create(name=size)
                     ProductSize.objects.create(product=product, size=size_obj, available=0)
 
                 total += 1
 
+            refrescar_ultimos_precios()
             self.stdout.write(self.style.SUCCESS(f"✔️ Importados {total} productos para Grid (page_id=7)."))
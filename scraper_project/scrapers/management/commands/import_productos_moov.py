@@ -1,38 +1,22 @@
 import os
 import json
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
+from scrapers.perfilado import ComandoPerfilable
 from django.conf import settings
 from django.utils import timezone
 from scrapers.models import (
     Brand, Category, Product, Page, ProductPage,
-    Pricing, ProductQuota, Size, ProductSize
+    Pricing, Size, ProductSize
 )
+from scrapers.utils_import import purgar_pagina, refrescar_ultimos_precios
+from scrapers.metricas import instrumentar_import
 from django.db import transaction
-from decimal import Decimal, InvalidOperation
-
-
-def parse_decimal(s):
-    if not s or s.strip().upper() in ("N/A", ""):
-        return None
-    clean = s.replace('$','').replace('.','').strip().replace('%','')
-    if ',' in clean and clean.count(',') == 1:
-        clean = clean.replace(',', '.')
-    try:
-        return Decimal(clean)
-    except:
-        return None
-
-def parse_bool(val):
-    if isinstance(val, bool):
-        return val
-    val = str(val).strip().lower()
-    if val in ["true", "1", "sí", "si", "gratis", "envío gratis"]:
-        return True
-    return False
-
-
-class Command(BaseCommand):
+from scrapers.registro import Producto
+
+
+class Command(ComandoPerfilable):
     help = "Importa productos desde json_pruebas/moov.json"
+    store = "moov"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -60,7 +44,7 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f"Error leyendo JSON: {e}")
         
-        with transaction.atomic():
+        with instrumentar_import("moov", path), transaction.atomic():
             try:
                 page_obj = Page.objects.get(pk=10)
             except Page.DoesNotExist:
@@ -68,26 +52,20 @@ class Command(BaseCommand):
             
             if options["clear"]:
                 self.stdout.write("🧹 Borrando registros relacionados con page_id=10…")
-                ProductSize.objects.filter(product__pages__page=page_obj).delete()
-                ProductQuota.objects.filter(product__pages__page=page_obj).delete()
-                Pricing.objects.filter(page=page_obj).delete()
-                ProductPage.objects.filter(page=page_obj).delete()
-                Product.objects.filter(pages__page=page_obj).delete()
+                for tabla, filas in purgar_pagina(page_obj).items():
+                    self.stdout.write(f"   {tabla}: {filas} filas borradas")
             
             print('Cantidad de productos: ', len(data))
 
             total = 0
             for item in data:
-                model_code = item.get("model_id")
+                p = Producto.desde_dict(item)
+                model_code = p.modelo_id
                 if not model_code:
                     continue
 
-                brand_obj, _ = Brand.objects.get_or_create(
-                    name=(item.get("marca") or "").strip()
-                )
-                category_obj, _ = Category.objects.get_or_create(
-                    name=(item.get("categoria") or "").strip()
-                )
+                brand_obj, _ = Brand.objects.get_or_create(name=p.marca or "")
+                category_obj, _ = Category.objects.get_or_create(name=p.categoria or "")
 
 
                 producto_existente = Product.objects.filter(
@@ -99,14 +77,14 @@ class Command(BaseCommand):
 
 
                 producto = Product.objects.create(
-                    name=(item.get("nombre") or "").strip(),
+                    name=p.nombre or "",
                     brand=brand_obj,
                     category=category_obj,
-                    product_class=(item.get("clase_de_producto") or "").strip(),
+                    product_class=p.clase_de_producto or "",
                     model_code=model_code,
-                    sku=item.get("sku"),
-                    image_url=item.get("imagen_url"),
-                    link=item.get("link"),
+                    sku=p.sku,
+                    image_url=p.imagen_url,
+                    link=p.link or "",
                     created_at=now,
                     updated_at=now,
                     provider_code=model_code
@@ -115,7 +93,7 @@ class Command(BaseCommand):
                 ProductPage.objects.create(
                     product=producto,
                     page=page_obj,
-                    cuotas=item.get("cuotas"),
+                    cuotas=p.cuotas,
                     payment_info=item.get("payment_info"),
                     shipping_info=item.get("shipping_info")
                 )
@@ -123,28 +101,27 @@ class Command(BaseCommand):
                 Pricing.objects.create(
                     product=producto,
                     page=page_obj,
-                    price_current=parse_decimal(item.get("precio")),
-                    price_prev=parse_decimal(item.get("precio_anterior")),
-                    discount=parse_decimal(item.get("descuento")),
-                    free_shipping=parse_bool(item.get("envio_gratis")),
+                    price_current=p.precio,
+                    price_prev=p.precio_anterior,
+                    discount=p.descuento,
+                    free_shipping=p.envio_gratis,
                     currency=item.get("moneda", ""),
                     recorded_at=now
                 )
 
-                cuotas_str = item.get("cuotas")
-                if cuotas_str:
+                if p.cuotas:
                     # TODO: implementar parseo de cuotas:
                     # número de cuotas, monto por cuota, interés, método de pago
                     pass
 
-                for size_name in item.get("disponible", []):
+                for size_name in p.disponible:
                     size_obj, _ = Size.objects.get_or_create(name=size_name)
                     ProductSize.objects.create(
                         product=producto,
                         size=size_obj,
                         available=1
                     )
-                for size_name in item.get("no_disponible", []):
+                for size_name in p.no_disponible:
                     size_obj, _ = Size.objects.get_or_create(name=size_name)
                     ProductSize.objects.create(
                         product=producto,
@@ -154,4 +131,5 @@ class Command(BaseCommand):
 
                 total += 1
 
+            refrescar_ultimos_precios()
             self.stdout.write(self.style.SUCCESS(f"✔️ Importados {total} productos."))
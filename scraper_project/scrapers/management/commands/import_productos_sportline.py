@@ -1,45 +1,22 @@
 import os
 import json
-from decimal import Decimal
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
+from scrapers.perfilado import ComandoPerfilable
 from django.utils import timezone
 from django.conf import settings
 from django.db import transaction
 from scrapers.models import (
     Brand, Category, Product, Page, ProductPage,
-    Pricing, ProductQuota, Size, ProductSize
+    Pricing, Size, ProductSize
 )
+from scrapers.utils_import import purgar_pagina, refrescar_ultimos_precios
+from scrapers.metricas import instrumentar_import
+from scrapers.registro import Producto
 
-def parse_decimal(s):
-    if not s or s.strip().upper() in ("N/A", "", "Sin precio anterior", "Sin descuento"):
-        return None
-    clean = s.replace('$', '').replace('.', '').strip().replace('%', '').replace('\xa0', '').replace(',', '.')
-    try:
-        return Decimal(clean)
-    except:
-        return None
-
-def parse_bool(val):
-    if isinstance(val, bool):
-        return val
-    val = str(val).strip().lower()
-    return val in ["true", "1", "sí", "si", "gratis", "envío gratis"]
-
-def get_discount(raw_discount, price, original_price):
-    if raw_discount:
-        try:
-            return Decimal(str(raw_discount).replace('%', '').replace('-', ''))
-        except:
-            pass
-    if original_price and price and original_price > price:
-        try:
-            return ((original_price - price) / original_price * 100).quantize(Decimal("0.01"))
-        except:
-            pass
-    return None
 
-class Command(BaseCommand):
+class Command(ComandoPerfilable):
     help = "Importa productos desde JSON de Sportline para page_id=4"
+    store = "sportline"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -65,7 +42,7 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f"Error leyendo JSON: {e}")
 
-        with transaction.atomic():
+        with instrumentar_import("sportline", path), transaction.atomic():
             try:
                 page_obj = Page.objects.get(pk=4)
             except Page.DoesNotExist:
@@ -73,11 +50,8 @@ class Command(BaseCommand):
 
             if options["clear"]:
                 self.stdout.write("Borrando registros relacionados con page_id=4…")
-                ProductSize.objects.filter(product__pages__page=page_obj).delete()
-                ProductQuota.objects.filter(product__pages__page=page_obj).delete()
-                Pricing.objects.filter(page=page_obj).delete()
-                ProductPage.objects.filter(page=page_obj).delete()
-                Product.objects.filter(pages__page=page_obj).delete()
+                for tabla, filas in purgar_pagina(page_obj).items():
+                    self.stdout.write(f"   {tabla}: {filas} filas borradas")
 
             total = 0
             now = timezone.now()
@@ -85,36 +59,31 @@ class Command(BaseCommand):
             self.stdout.write(f'Cantidad de productos a importar: {len(data)}')
 
             for item in data:
-                model_code = item.get("id_producto")
+                p = Producto.desde_dict(item)
+                model_code = p.id_producto
                 if not model_code:
                     continue
 
                 if Product.objects.filter(model_code=model_code, pages__page=page_obj).exists():
                     continue
 
-                brand_obj, _ = Brand.objects.get_or_create(
-                    name=(item.get("marca") or "").strip()
-                )
-                category_obj, _ = Category.objects.get_or_create(
-                    name=(item.get("categoria") or "").strip()
-                )
+                brand_obj, _ = Brand.objects.get_or_create(name=p.marca or "")
+                category_obj, _ = Category.objects.get_or_create(name=p.categoria or "")
 
-                price = parse_decimal(item.get("precio"))
+                price = p.precio
                 if not price:
                     continue
 
-                original_price = parse_decimal(item.get("precio_anterior"))
-                discount = get_discount(item.get("descuento"), price, original_price)
 
                 product = Product.objects.create(
-                    name=(item.get("nombre") or "").strip(),
+                    name=p.nombre or "",
                     brand=brand_obj,
                     category=category_obj,
-                    product_class=(item.get("clase_de_producto") or "").strip(),
+                    product_class=p.clase_de_producto or "",
                     model_code=model_code,
-                    sku=item.get("sku") or model_code,
-                    image_url=item.get("imagen_url"),
-                    link=item.get("link"),
+                    sku=p.sku or model_code,
+                    image_url=p.imagen_url,
+                    link=p.link or "",
                     created_at=now,
                     updated_at=now,
                     provider_code=model_code
@@ -123,31 +92,32 @@ class Command(BaseCommand):
                 ProductPage.objects.create(
                     product=product,
                     page=page_obj,
-                    cuotas=item.get("cuotas") or "",
+                    cuotas=p.cuotas or "",
                     payment_info="",
-                    shipping_info=item.get("envio_gratis") or ""
+                    shipping_info="Envio gratis" if p.envio_gratis else ""
                 )
 
                 Pricing.objects.create(
                     product=product,
                     page=page_obj,
                     price_current=price,
-                    price_prev=original_price,
-                    discount=discount,
-                    free_shipping=parse_bool(item.get("envio_gratis")),
+                    price_prev=p.precio_anterior,
+                    discount=p.descuento_calculado(),
+                    free_shipping=p.envio_gratis,
                     currency="ARS",
                     recorded_at=now
                 )
 
-                for size_name in item.get("disponible", []):
+                for size_name in p.disponible:
                     size_obj, _ = Size.objects.get_or_create(name=size_name)
                     ProductSize.objects.create(product=product, size=size_obj, available=1)
-                for size_name in item.get("no_disponible", []):
+                for size_name in p.no_disponible:
                     size_obj, _ = Size.objects.get_or_create(name=size_name)
                     ProductSize.objects.create(product=product, size=size_obj, available=0)
 
                 total += 1
 
+            refrescar_ultimos_precios()
             self.stdout.write(self.style.SUCCESS(
                 f"✔️ Importados {total} productos para Sportline (page_id=4)."
             ))
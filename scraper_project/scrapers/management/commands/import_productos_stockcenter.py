@@ -1,47 +1,22 @@
 import os
 import json
-from decimal import Decimal, InvalidOperation
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
+from scrapers.perfilado import ComandoPerfilable
 from django.utils import timezone
 from django.conf import settings
 from django.db import transaction
 from scrapers.models import (
     Brand, Category, Product, Page, ProductPage,
-    Pricing, ProductQuota, Size, ProductSize
+    Pricing, Size, ProductSize
 )
+from scrapers.utils_import import purgar_pagina, refrescar_ultimos_precios
+from scrapers.metricas import instrumentar_import
+from scrapers.registro import Producto
 
-def parse_decimal(s):
-    if not s or s.strip().upper() in ("N/A", ""):
-        return None
-    clean = s.replace('$','').replace('.','').strip().replace('%','')
-    if ',' in clean and clean.count(',') == 1:
-        clean = clean.replace(',', '.')
-    try:
-        return Decimal(clean)
-    except:
-        return None
-
-def parse_bool(val):
-    if isinstance(val, bool):
-        return val
-    val = str(val).strip().lower()
-    return val in ["true", "1", "sí", "si", "gratis", "envío gratis"]
-
-def get_discount(raw_discount, price, original_price):
-    if raw_discount:
-        try:
-            return Decimal(str(raw_discount))
-        except:
-            pass
-    if original_price and price and original_price > price:
-        try:
-            return ((original_price - price) / original_price * 100).quantize(Decimal("0.01"))
-        except:
-            pass
-    return None
 
-class Command(BaseCommand):
+class Command(ComandoPerfilable):
     help = "Importa productos desde productos_stockcenter_*.json para page_id=9 (Stock Center)"
+    store = "stock_center"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -67,7 +42,7 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f"Error leyendo JSON: {e}")
 
-        with transaction.atomic():
+        with instrumentar_import("stock_center", path), transaction.atomic():
             try:
                 page_obj = Page.objects.get(pk=9)
             except Page.DoesNotExist:
@@ -75,27 +50,22 @@ class Command(BaseCommand):
 
             if options["clear"]:
                 self.stdout.write("🧹 Borrando registros relacionados con page_id=9…")
-                ProductSize.objects.filter(product__pages__page=page_obj).delete()
-                ProductQuota.objects.filter(product__pages__page=page_obj).delete()
-                Pricing.objects.filter(page=page_obj).delete()
-                ProductPage.objects.filter(page=page_obj).delete()
-                Product.objects.filter(pages__page=page_obj).delete()
+                for tabla, filas in purgar_pagina(page_obj).items():
+                    self.stdout.write(f"   {tabla}: {filas} filas borradas")
 
             total = 0
             for item in data:
-                model_code = item.get("modelo_id")
+                p = Producto.desde_dict(item)
+                model_code = p.modelo_id
                 if not model_code:
                     continue
 
-                brand_name = (item.get("marca") or "").strip()
-                if brand_name.upper() in ("N/A", ""):
-                    brand_obj = Brand.objects.get(name__iexact="otro")
+                if p.marca:
+                    brand_obj, _ = Brand.objects.get_or_create(name=p.marca)
                 else:
-                    brand_obj, _ = Brand.objects.get_or_create(name=brand_name)
+                    brand_obj = Brand.objects.get(name__iexact="otro")
 
-                category_obj, _ = Category.objects.get_or_create(
-                    name=(item.get("categoria") or "").strip()
-                )
+                category_obj, _ = Category.objects.get_or_create(name=p.categoria or "")
 
                 producto_existente = Product.objects.filter(
                     model_code=model_code
@@ -107,14 +77,14 @@ class Command(BaseCommand):
                 product = Product.objects.filter(model_code=model_code).first()
                 if not product:
                     product = Product.objects.create(
-                        name=(item.get("nombre") or "").strip(),
+                        name=p.nombre or "",
                         brand=brand_obj,
                         category=category_obj,
-                        product_class=(item.get("clase_de_producto") or "").strip(),
+                        product_class=p.clase_de_producto or "",
                         model_code=model_code,
                         sku=model_code,
-                        image_url=item.get("imagen_url"),
-                        link=item.get("link") or "https://stockcenter.com.ar/",
+                        image_url=p.imagen_url,
+                        link=p.link or "https://stockcenter.com.ar/",
                         created_at=timezone.now(),
                         updated_at=timezone.now(),
                         provider_code=model_code
@@ -128,28 +98,25 @@ class Command(BaseCommand):
                     shipping_info=""
                 )
 
-                price = parse_decimal(item.get("precio"))
-                original_price = parse_decimal(item.get("precio_anterior"))
-                discount = get_discount(item.get("descuento"), price, original_price)
-
                 Pricing.objects.create(
                     product=product,
                     page=page_obj,
-                    price_current=price,
-                    price_prev=original_price,
-                    discount=discount,
+                    price_current=p.precio,
+                    price_prev=p.precio_anterior,
+                    discount=p.descuento_calculado(),
                     free_shipping=False,
                     currency="ARS",
                     recorded_at=item.get("created") or timezone.now()
                 )
 
-                for size_name in item.get("available_sizes", []):
+                for size_name in p.disponible:
                     size_obj, _ = Size.objects.get_or_create(name=size_name)
                     ProductSize.objects.create(product=product, size=size_obj, available=1)
-                for size_name in item.get("unavailable_sizes", []):
+                for size_name in p.no_disponible:
                     size_obj, _ = Size.objects.get_or_create(name=size_name)
                     ProductSize.objects.create(product=product, size=size_obj, available=0)
 
                 total += 1
 
+            refrescar_ultimos_precios()
             self.stdout.write(self.style.SUCCESS(f"✔️ Importados {total} productos para Stock Center (page_id=9)."))
\ No newline at end of file
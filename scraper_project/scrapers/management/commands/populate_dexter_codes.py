@@ -1,14 +1,69 @@
 import os
-import pandas as pd
-from django.core.management.base import BaseCommand, CommandError
+import hashlib
+from django.core.management.base import CommandError
 from django.conf import settings
+from django.db import transaction
 from scrapers.models import CodesDexter
+from scrapers.perfilado import ComandoPerfilable
 from scrapers.utils import (
     send_alert_message,
 )
 
-class Command(BaseCommand):
+COLUMNAS = {
+    "MARCA": "brand",
+    "CODIGO PROVEEDOR": "provider_code",
+    "CODIGO GRUPO DEXTER": "dexter_code",
+}
+CACHE_DIR = os.path.join(settings.BASE_DIR, "dexter_codes", ".cache")
+BATCH_SIZE = 5000
+
+
+def hash_archivo(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def leer_excel_cacheado(path, usar_cache=True):
+    """
+    Lee la hoja 'codigos' del Excel. El parseo con openpyxl es lento, así que el
+    DataFrame ya leído se guarda en dexter_codes/.cache con el hash del archivo
+    como nombre: si el Excel no cambió, la próxima carga lee el cache directo.
+    """
+    import pandas as pd
+
+    cache_path = os.path.join(CACHE_DIR, f"codigos_{hash_archivo(path)[:16]}.pkl")
+    if usar_cache and os.path.exists(cache_path):
+        try:
+            return pd.read_pickle(cache_path), True
+        except Exception:
+            pass
+
+    df = pd.read_excel(path, sheet_name="codigos", engine="openpyxl")
+    if usar_cache:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df.to_pickle(cache_path)
+    return df, False
+
+
+def limpiar_codigos(df):
+    """
+    Limpieza vectorizada: renombra columnas, pasa todo a str con strip (los NaN
+    quedan en None), descarta filas vacías y duplicadas.
+    """
+    df = df.reindex(columns=list(COLUMNAS)).rename(columns=COLUMNAS)
+    for col in COLUMNAS.values():
+        serie = df[col]
+        df[col] = serie.astype(str).str.strip().where(serie.notna(), None)
+    df = df.dropna(how="all")
+    return df.drop_duplicates(ignore_index=True)
+
+
+class Command(ComandoPerfilable):
     help = "Importa los codigos desde el Excel en dexter_codes/codigos_dexter.xlsx"
+    store = "dexter"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -16,6 +71,16 @@ class Command(BaseCommand):
             action="store_true",
             help="Si se pasa, borra todos los registros antes de cargar"
         )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Compara contra la tabla: inserta solo los códigos nuevos y borra los que ya no están en el Excel"
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Ignora el cache del Excel parseado y lo vuelve a leer"
+        )
         parser.add_argument(
             "--file",
             type=str,
@@ -29,30 +94,57 @@ class Command(BaseCommand):
         if not os.path.exists(path):
             raise CommandError(f"No encontré el archivo: {path}")
 
-        if options["clear"]:
-            self.stdout.write("🔄 Borrando registros existentes...")
-            CodesDexter.objects.all().delete()
+        if options["clear"] and options["incremental"]:
+            raise CommandError("--clear y --incremental no se pueden usar juntos")
 
         try:
-            df = pd.read_excel(path, sheet_name="codigos", engine="openpyxl")
+            df, desde_cache = leer_excel_cacheado(path, usar_cache=not options["no_cache"])
         except Exception as e:
             raise CommandError(f"Error leyendo Excel: {e}")
 
-        total = 0
-        for _, row in df.iterrows():
-            marca = row.get("MARCA", None)
-            prov = row.get("CODIGO PROVEEDOR", None)
-            dex = row.get("CODIGO GRUPO DEXTER", None)
+        if desde_cache:
+            self.stdout.write("⚡ Excel leído desde cache")
+
+        df = limpiar_codigos(df)
+        filas = list(df.itertuples(index=False, name=None))
+
+        with transaction.atomic():
+            if options["clear"]:
+                self.stdout.write("🔄 Borrando registros existentes...")
+                CodesDexter.objects.all().delete()
+
+            borrados = 0
+            if options["incremental"]:
+                existentes = {}
+                for pk, *clave in CodesDexter.objects.values_list(
+                    "pk", "brand", "provider_code", "dexter_code"
+                ).iterator():
+                    existentes.setdefault(tuple(clave), []).append(pk)
 
-            if pd.isna(marca) and pd.isna(prov) and pd.isna(dex):
-                continue
+                en_excel = set(filas)
+                filas = [f for f in filas if f not in existentes]
+                sobrantes = [
+                    pk
+                    for clave, pks in existentes.items()
+                    for pk in (pks if clave not in en_excel else pks[1:])
+                ]
+                for i in range(0, len(sobrantes), BATCH_SIZE):
+                    borrados += CodesDexter.objects.filter(
+                        pk__in=sobrantes[i:i + BATCH_SIZE]
+                    ).delete()[0]
 
-            CodesDexter.objects.create(
-                brand=str(marca).strip() if not pd.isna(marca) else None,
-                provider_code=str(prov).strip() if not pd.isna(prov) else None,
-                dexter_code=str(dex).strip() if not pd.isna(dex) else None,
+            CodesDexter.objects.bulk_create(
+                [
+                    CodesDexter(brand=marca, provider_code=prov, dexter_code=dex)
+                    for marca, prov, dex in filas
+                ],
+                batch_size=BATCH_SIZE,
             )
-            total += 1
 
-        send_alert_message(f"Importados {total} códigos para CodesDexter.")
-        self.stdout.write(self.style.SUCCESS(f"✔️ Importados {total} códigos."))
+        total = len(filas)
+        if options["incremental"]:
+            resumen = f"Importados {total} códigos nuevos y borrados {borrados} obsoletos para CodesDexter."
+        else:
+            resumen = f"Importados {total} códigos para CodesDexter."
+        send_alert_message(resumen)
+        self.stdout.write(self.style.SUCCESS(f"✔️ {resumen}"))
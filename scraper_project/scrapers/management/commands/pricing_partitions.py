@@ -0,0 +1,106 @@
+import re
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+PATRON_PARTICION = re.compile(r"^pricing_y(\d{4})m(\d{2})$")
+
+
+def sumar_meses(fecha, meses):
+    total = fecha.year * 12 + fecha.month - 1 + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def nombre_particion(mes):
+    return f"pricing_y{mes.year}m{mes.month:02d}"
+
+
+def listar_particiones(cursor):
+    """Devuelve {primer día del mes: nombre} de las particiones mensuales adjuntas a pricing."""
+    cursor.execute("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'pricing'::regclass
+    """)
+    particiones = {}
+    for (nombre,) in cursor.fetchall():
+        m = PATRON_PARTICION.match(nombre)
+        if m:
+            particiones[date(int(m.group(1)), int(m.group(2)), 1)] = nombre
+    return particiones
+
+
+def crear_particion(cursor, mes):
+    """
+    Crea la partición mensual. Si la partición default ya tiene filas de ese mes
+    (porque nadie creó la partición a tiempo), las mueve antes de adjuntarla.
+    """
+    nombre = nombre_particion(mes)
+    desde, hasta = mes.isoformat(), sumar_meses(mes, 1).isoformat()
+    cursor.execute(f"CREATE TABLE {nombre} (LIKE pricing INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    cursor.execute(
+        f"WITH movidas AS ("
+        f"  DELETE FROM pricing_default WHERE recorded_at >= %s AND recorded_at < %s RETURNING *"
+        f") INSERT INTO {nombre} SELECT * FROM movidas",
+        [desde, hasta],
+    )
+    movidas = cursor.rowcount
+    cursor.execute(f"ALTER TABLE pricing ATTACH PARTITION {nombre} FOR VALUES FROM ('{desde}') TO ('{hasta}')")
+    return nombre, movidas
+
+
+class Command(BaseCommand):
+    help = "Crea las particiones mensuales futuras de pricing y archiva (detach) las viejas"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--meses-adelante",
+            type=int,
+            default=3,
+            help="Cantidad de meses futuros para los que tiene que existir partición (por defecto: 3)"
+        )
+        parser.add_argument(
+            "--retener-meses",
+            type=int,
+            help="Desadjunta las particiones anteriores a estos meses; quedan como tablas sueltas para archivar"
+        )
+        parser.add_argument(
+            "--borrar",
+            action="store_true",
+            help="Con --retener-meses, borra las particiones viejas en vez de dejarlas desadjuntadas"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("pricing_partitions solo está soportado en PostgreSQL")
+        if options["borrar"] and options["retener_meses"] is None:
+            raise CommandError("--borrar requiere --retener-meses")
+
+        hoy = timezone.now().date().replace(day=1)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            existentes = listar_particiones(cursor)
+
+            for i in range(options["meses_adelante"] + 1):
+                mes = sumar_meses(hoy, i)
+                if mes in existentes:
+                    continue
+                nombre, movidas = crear_particion(cursor, mes)
+                extra = f" ({movidas} filas movidas desde pricing_default)" if movidas else ""
+                self.stdout.write(f"➕ Creada {nombre}{extra}")
+
+            if options["retener_meses"] is not None:
+                limite = sumar_meses(hoy, -options["retener_meses"])
+                for mes, nombre in sorted(existentes.items()):
+                    if mes >= limite:
+                        continue
+                    cursor.execute(f"ALTER TABLE pricing DETACH PARTITION {nombre}")
+                    if options["borrar"]:
+                        cursor.execute(f"DROP TABLE {nombre}")
+                        self.stdout.write(f"🗑️ Borrada {nombre}")
+                    else:
+                        self.stdout.write(f"📦 Desadjuntada {nombre} (lista para archivar)")
+
+        self.stdout.write(self.style.SUCCESS("✔️ Particiones de pricing al día."))
@@ -0,0 +1,80 @@
+import time
+from collections import Counter, defaultdict
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from scrapers.models import Product
+from scrapers.taxonomia import Taxonomia, taxonomia
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula la clase (Calzado / Indumentaria / ...) de los productos guardados con la "
+        "taxonomía actual, sin volver a scrapear"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo muestra cuántos productos cambiarían de clase"
+        )
+        parser.add_argument(
+            "--pagina",
+            help="Reclasifica solo los productos de esta página (Page.name)"
+        )
+        parser.add_argument(
+            "--taxonomia",
+            help="Archivo de taxonomía a usar en vez de TAXONOMIA_PATH (para probar cambios)"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Productos por UPDATE (por defecto: {BATCH_SIZE})"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            tax = Taxonomia.desde_archivo(options["taxonomia"]) if options["taxonomia"] else taxonomia()
+        except (OSError, ValueError) as e:
+            raise CommandError(f"No se pudo cargar la taxonomía: {e}")
+        inicio = time.perf_counter()
+
+        productos = Product.objects.all()
+        if options["pagina"]:
+            productos = productos.filter(pages__page__name=options["pagina"]).distinct()
+
+        # Los nombres se repiten entre páginas: clasificar() está memoizado
+        por_clase = defaultdict(list)
+        cambios = Counter()
+        total = 0
+        for pk, nombre, clase in productos.values_list("id", "name", "product_class").iterator(chunk_size=BATCH_SIZE):
+            total += 1
+            nueva = tax.clasificar(nombre or "").categoria
+            if nueva != clase:
+                por_clase[nueva].append(pk)
+                cambios[(clase, nueva)] += 1
+        leidos = time.perf_counter() - inicio
+
+        self.stdout.write(
+            f"🔎 {total} productos clasificados con la taxonomía v{tax.version} en {leidos:.1f}s; "
+            f"{sum(cambios.values())} cambian de clase"
+        )
+        for (antes, despues), cantidad in cambios.most_common():
+            self.stdout.write(f"   {antes or '(vacía)'} → {despues}: {cantidad}")
+
+        if options["dry_run"] or not cambios:
+            return
+
+        batch_size = max(1, options["batch_size"])
+        actualizados = 0
+        with transaction.atomic():
+            for clase, ids in por_clase.items():
+                for i in range(0, len(ids), batch_size):
+                    actualizados += Product.objects.filter(id__in=ids[i:i + batch_size]).update(product_class=clase)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✔️ {actualizados} productos reclasificados en {time.perf_counter() - inicio:.1f}s"
+        ))
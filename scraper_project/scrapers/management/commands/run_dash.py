@@ -1,15 +1,14 @@
-from django.core.management.base import BaseCommand
+from scrapers.perfilado import ComandoPerfilable
 from scrapers.base_scraper import BaseScraper
 from bs4 import BeautifulSoup
-import pandas as pd
 import time
-from scrapers.utils_scraping import normalizar_columnas, inferir_categoria, inferir_tipo_producto, inferir_variante
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-class Command(BaseCommand):
+class Command(ComandoPerfilable):
     help = 'Ejecuta el scraper de Dash Deportes'
+    store = "dash"
 
     def add_arguments(self, parser):
         parser.add_argument('--wait', type=int, default=10, help='Tiempo de espera entre páginas en segundos')
@@ -20,7 +19,7 @@ class Command(BaseCommand):
         try:
             scraper.send_alert("🚀 Iniciando scraping Dash")
             scraper.run()
-            scraper.send_alert("✅ Scraper Dash finalizado correctamente")
+            scraper.send_alert(f"✅ Scraper Dash finalizado correctamente\n{scraper.resumen_rendimiento()}")
         except Exception as e:
             scraper.logger.error(str(e))
             scraper.send_alert(f"❌ Error en scraper Dash: {str(e)}")
@@ -44,16 +43,13 @@ class DashScraper(BaseScraper):
         for seccion, url_base in self.secciones.items():
             self.logger.info(f"Iniciando sección: {seccion}")
             productos = self.scrapear_seccion(url_base, seccion)
-
-            df = pd.DataFrame(productos)
-            df = normalizar_columnas(df)
-            productos_norm = df.to_dict(orient='records')
+            self.registrar_seccion(seccion, len(productos))
 
             json_name = f"productos_dash_{self.session_id}_{seccion.lower().replace(' ', '_')}.json"
-            self.export_to_json(productos_norm, json_name)
-            self.send_alert(f"✅ Sección {seccion} finalizada con {len(productos_norm)} productos.")
+            self.export_to_json(productos, json_name)
+            self.send_alert(f"✅ Sección {seccion} finalizada con {len(productos)} productos.")
 
-            all_items.extend(productos_norm)
+            all_items.extend(productos)
 
         combinado_name = f"productos_dash_{self.session_id}_combinado.json"
         self.exportar_combinado_json(all_items, combinado_name)
@@ -66,14 +62,15 @@ class DashScraper(BaseScraper):
         while True:
             url = url_base if pagina == 1 else f"{url_base}&page={pagina}"
             self.logger.debug(f"Accediendo a: {url}")
-            self.driver.get(url)
+            self.cargar_pagina(url, seccion)
 
             try:
-                WebDriverWait(self.driver, 20).until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "div.vtex-search-result-3-x-galleryItem")
+                with self.fase("wait", seccion):
+                    WebDriverWait(self.driver, 20).until(
+                        EC.presence_of_element_located(
+                            (By.CSS_SELECTOR, "div.vtex-search-result-3-x-galleryItem")
+                        )
                     )
-                )
             except:
                 if pagina == 1:
                     alerta = f"🚨 No se cargaron productos en {seccion} en la página inicial."
@@ -81,16 +78,17 @@ class DashScraper(BaseScraper):
                     self.send_alert(alerta)
                 break
 
-            soup = BeautifulSoup(self.driver.page_source, "html.parser")
-            productos = soup.select("div.vtex-search-result-3-x-galleryItem")
+            # Armar el árbol es lo más caro del parseo: va dentro de la fase
+            with self.medir_parseo(seccion):
+                soup = BeautifulSoup(self.driver.page_source, "html.parser")
+                productos = soup.select("div.vtex-search-result-3-x-galleryItem")
+                for prod in productos:
+                    productos_totales.append(self.parsear_producto(prod, seccion))
 
             if not productos:
                 self.logger.info("🚫 No se encontraron más productos.")
                 break
 
-            for prod in productos:
-                productos_totales.append(self.parsear_producto(prod, seccion))
-
             pagina += 1
 
         return [p for p in productos_totales if p]
@@ -126,63 +124,7 @@ class DashScraper(BaseScraper):
 
     def parsear_producto(self, producto, seccion):
         try:
-            nombre_elem = producto.select_one('span.vtex-product-summary-2-x-productBrand')
-            nombre = nombre_elem.text.strip() if nombre_elem else "N/A"
-
-            precio_elem = producto.select_one('span.vtex-store-components-3-x-sellingPriceValue')
-            precio = precio_elem.text.strip() if precio_elem else "N/A"
-
-            precio_antes_elem = producto.select_one('span.vtex-store-components-3-x-listPriceValue')
-            precio_anterior = precio_antes_elem.text.strip() if precio_antes_elem else "N/A"
-
-            descuento_elem = producto.select_one('div.vtex-store-components-3-x-discountInsideContainer')
-            descuento = descuento_elem.text.strip() if descuento_elem else "N/A"
-
-            img_elem = producto.select_one('img.vtex-product-summary-2-x-image')
-            imagen_url = img_elem["src"] if img_elem else "N/A"
-
-            link_elem = producto.select_one('a.vtex-product-summary-2-x-clearLink')
-            url_relativa = link_elem["href"] if link_elem else ""
-            url_completa = f"https://www.dashdeportes.com.ar{url_relativa}" if url_relativa else "Sin link"
-
-            cuotas_elem = producto.select_one('p.dash-theme-6-x-installmentsTxt')
-            cuotas = cuotas_elem.text.strip() if cuotas_elem else "N/A"
-
-            envio_elem = producto.select_one('div.dash-theme-6-x-freeShipping')
-            envio = envio_elem.text.strip() if envio_elem else "N/A"
-
-            talles = [t.text.strip() for t in producto.select('div.dash-theme-6-x-item')]
-            talles_str = ", ".join(talles) if talles else "N/A"
-
-            marca_elem = producto.select_one('img.vtex-product-summary-2-x-productBrandLogo')
-            marca = marca_elem["alt"].strip() if marca_elem and "alt" in marca_elem.attrs else "N/A"
-
-            id_producto = url_relativa.split('-')[-1].replace('/p', '') if url_relativa else "N/A"
-
-            return {
-                "nombre": nombre,
-                "marca": marca,
-                "precio": precio,
-                "precio_anterior": precio_anterior,
-                "descuento": descuento,
-                "cuotas": cuotas,
-                "envio_gratis": envio,
-                "imagen_url": imagen_url,
-                "link": url_completa,
-                "id_producto": id_producto,
-                "sku": "N/A",
-                "categoria": seccion,
-                "clase_de_producto": inferir_categoria(nombre),
-                "tags": "N/A",
-                "talles": talles_str,
-                "nombre_pagina": "Dash",
-                "tipo_de_producto": inferir_tipo_producto(nombre),
-                "variante": inferir_variante(nombre),
-                "disponible": {},
-                "no_disponible": {},
-                "modelo_id": "N/A",
-            }
-
+            return self.extractor.extraer(producto, seccion)
         except Exception as e:
-            self.logger.error(f"Error parseando producto: {str(e)}")
+            self.logger.error(f"Error parseando producto: {e}")
             return None
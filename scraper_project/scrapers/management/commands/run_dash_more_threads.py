@@ -3,20 +3,28 @@ import re
 import logging
 import time
 import threading
-import resource
 from queue import Queue, Empty
-from django.core.management.base import BaseCommand
+from scrapers.perfilado import ComandoPerfilable
 from selenium import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
-from selenium.common.exceptions import TimeoutException, JavascriptException
+from selenium.common.exceptions import TimeoutException, JavascriptException, WebDriverException
 from pathlib import Path
 from django.conf import settings
 from datetime import datetime
 import os
-from scrapers.utils import send_alert_message
+from scrapers.utils import CIRCUITO_REMOTO, send_alert_message
+from scrapers.jobs import registrar_run
+from scrapers.progreso import ProgressTracker, rss_actual_kb
+from scrapers.metricas import CARGA_PAGINA, PARSEO, CREACION_DRIVER, ERRORES_WEBDRIVER, ITEMS, RSS
+from scrapers.trazas import traza, span
+from scrapers.financiacion import cuotas_dash
+from scrapers.registro import serializar
+from scrapers.ritmo import SOBRECARGA, dominio
+from scrapers.circuito import CircuitoAbierto, circuito
+from scrapers.reintentos import BLOQUEADO, ERROR, SIN_DRIVER, ColaReintentos, FalloItem, clasificar_fallo, verificar_pagina
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +36,11 @@ OUTPUT_JSON = JSON_DIR / "dash_more_threads_2.json"
 
 MAX_THREADS = 4
 PROGRESS_INTERVAL = 30
+PUBLISH_INTERVAL = 5
+STORE = "dash"
+BASE_URL = "https://www.dashdeportes.com.ar"
+# Código de proveedor en la descripción cuando no está en la tabla de especificaciones
+PATRON_CODIGO = re.compile(r"[Cc]ódigo[:\s]*([\w\/\-\d]+)")
 
 def scroll_page(driver):
     try:
@@ -56,7 +69,7 @@ def extraer_modelo_id(soup):
     desc = soup.select_one("div.dash-theme-6-x-DescripcionProd div")
     if desc:
         text = desc.get_text(separator=" ", strip=True)
-        m = re.search(r"[Cc]ódigo[:\s]*([\w\/\-\d]+)", text)
+        m = PATRON_CODIGO.search(text)
         if m:
             return m.group(1)
     return "N/A"
@@ -77,51 +90,17 @@ def extraer_talles(soup):
     return disponibles, no_disponibles
 
 
-def extraer_cuotas_bancos(soup):
-    resultados = []
-    for wrapper in soup.select("div.dash-theme-6-x-wrapperModalCC"):
-        banco = ""
-        banco_el = wrapper.select_one("div.dash-theme-6-x-topBarTarjetasCC p")
-        if banco_el:
-            banco = banco_el.get_text(strip=True)
-
-        texto_cuota = ""
-        cuota_el = wrapper.select_one("div.dash-theme-6-x-containerCuotasCC p")
-        if cuota_el:
-            texto_cuota = cuota_el.get_text(strip=True)
-
-        num_cuotas, precio_por_cuota, sin_interes = None, None, None
-
-        m1 = re.search(r"(\d+)\s+cuotas?", texto_cuota, re.IGNORECASE)
-        if m1:
-            num_cuotas = int(m1.group(1))
-
-        if re.search(r"sin\s+interés", texto_cuota, re.IGNORECASE):
-            sin_interes = True
-        elif re.search(r"con\s+interés", texto_cuota, re.IGNORECASE):
-            sin_interes = False
-
-        m2 = re.search(r"\$\s*([\d\.\,]+)", texto_cuota)
-        if m2:
-            precio_texto = m2.group(1)
-            precio_texto_norm = precio_texto.replace(".", "").replace(",", ".")
-            try:
-                precio_por_cuota = float(precio_texto_norm)
-            except ValueError:
-                precio_por_cuota = None
+def initialize_driver():
+    # Mismo circuito que initialize_driver_remote: comparten el endpoint de browserless
+    return circuito(CIRCUITO_REMOTO).llamar(_medir_driver)
 
-        if num_cuotas is not None or precio_por_cuota is not None or sin_interes is not None:
-            resultados.append({
-                "banco":            banco,
-                "num_cuotas":       num_cuotas,
-                "precio_por_cuota": precio_por_cuota,
-                "sin_interes":      sin_interes,
-            })
 
-    return resultados
+def _medir_driver():
+    with CREACION_DRIVER.medir(store=STORE, mode="remote"):
+        return _crear_driver()
 
 
-def initialize_driver():
+def _crear_driver():
     chrome_options = webdriver.ChromeOptions()
     chrome_options.set_capability('browserless:token', os.environ.get('BROWSER_TOKEN', ''))
     chrome_options.add_argument("--window-size=1920,1080")
@@ -138,97 +117,150 @@ def initialize_driver():
     return driver
 
 
-def worker(task_queue, driver_queue, resultados, lock, total):
-    tname = threading.current_thread().name
-
+def worker(cola, driver_queue, resultados, lock, total, tracker):
     while True:
-        try:
-            idx, item = task_queue.get_nowait()
-        except Empty:
+        tarea = cola.obtener()
+        if tarea is None:
             return
+        try:
+            procesar_tarea(tarea, cola, driver_queue, resultados, lock, total, tracker)
+        except Exception as e:
+            logger.error(f"[{threading.current_thread().name}] Error inesperado con el ítem {tarea.idx}: {e}")
+        finally:
+            # Una tarea que queda abierta deja a los demás hilos esperando para siempre
+            if tarea.en_curso:
+                cola.fallar(tarea, ERROR)
+
 
-        mem_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
-        logger.info(f"[{tname}] Uso de memoria al iniciar tarea {idx}/{total} (KB): {mem_inicial}")
+def procesar_tarea(tarea, cola, driver_queue, resultados, lock, total, tracker):
+    tname = threading.current_thread().name
+    idx, item = tarea.idx, tarea.item
+
+    seccion = item.get("categoria", "")
+    url = item.get("link", "")
 
-        driver = None
+    driver = None
+    turno = None
+    try:
         try:
-            driver = driver_queue.get()
-            url = item.get("link", "")
-            logger.info(f"[{tname}] [{idx}/{total}] Abriendo {url}")
+            with span("driver_queue.get", **{"pool.libres": driver_queue.qsize()}):
+                driver = driver_queue.get(timeout=10)
+        except Empty:
+            # Todos los drivers fallaron al reinicializarse: pruebo crear uno acá
+            try:
+                driver = initialize_driver()
+            except CircuitoAbierto as e_init:
+                raise FalloItem(SIN_DRIVER, str(e_init), espera=e_init.restante)
+            except Exception as e_init:
+                raise FalloItem(SIN_DRIVER, str(e_init))
+        with span("ritmo.turno", url=url):
+            turno = dominio(url).entrar()
+        logger.info(f"[{tname}] [{idx}/{total}] Abriendo {url}")
+        inicio_get = time.perf_counter()
+        with CARGA_PAGINA.medir(store=STORE, section=seccion), span("driver.get", url=url, section=seccion):
             driver.get(url)
+        turno.latencia = time.perf_counter() - inicio_get
 
-            try:
-                WebDriverWait(driver, 10).until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
-            except TimeoutException:
-                logger.warning(f"[{tname}] [{idx}/{total}] document.readyState no llegó a 'complete' en 10s")
+        try:
+            WebDriverWait(driver, 10).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+        except TimeoutException:
+            logger.warning(f"[{tname}] [{idx}/{total}] document.readyState no llegó a 'complete' en 10s")
 
-            scroll_page(driver)
+        scroll_page(driver)
 
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.dash-theme-6-x-wrapperModalCC"))
-                )
-            except TimeoutException:
-                logger.warning(f"[{tname}] [{idx}/{total}] El widget de cuotas no apareció en 10s")
+        try:
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div.dash-theme-6-x-wrapperModalCC"))
+            )
+        except TimeoutException:
+            logger.warning(f"[{tname}] [{idx}/{total}] El widget de cuotas no apareció en 10s")
 
-            time.sleep(1)
-            soup = BeautifulSoup(driver.page_source, "html.parser")
+        time.sleep(1)
+        with PARSEO.medir(store=STORE, section=seccion), span("parse", url=url, section=seccion):
+            html = driver.page_source
+            verificar_pagina(html)
+            soup = BeautifulSoup(html, "html.parser")
 
             modelo, disp, nodisp, cuotas_bancos = "N/A", [], [], []
             try:
                 modelo       = extraer_modelo_id(soup)
                 disp, nodisp = extraer_talles(soup)
-                cuotas_bancos = extraer_cuotas_bancos(soup)
+                cuotas_bancos = cuotas_dash(soup)
             except Exception as e:
                 logger.warning(f"[{tname}] [{idx}/{total}] Error al extraer talles/cuotas: {e}")
 
-            num_wrappers = len(soup.select("div.dash-theme-6-x-wrapperModalCC"))
-            logger.info(f"[{tname}] [{idx}/{total}] Encontré {num_wrappers} wrappers de cuotas en {url}")
-
-            item["modelo_id"]      = modelo
-            item["disponible"]     = disp
-            item["no_disponible"]  = nodisp
-            item["financiacion"]   = cuotas_bancos
-
-            logger.info(f"[{tname}] [{idx}/{total}]   → Modelo: {modelo}")
-            logger.info(f"[{tname}] [{idx}/{total}]   → Disponibles: {disp}")
-            logger.info(f"[{tname}] [{idx}/{total}]   → No disponibles: {nodisp}")
-            logger.info(f"[{tname}] [{idx}/{total}]   → Cuotas/Bancos: {cuotas_bancos}")
-            logger.info(f"[{tname}] ----------------------------------------")
-
-            mem_final = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
-            logger.info(f"[{tname}] Uso de memoria al finalizar {idx}/{total} (KB): {mem_final}")
-
-        except Exception as e:
-            logger.error(f"[{tname}] [{idx}/{total}] Error procesando {url}: {e}")
+        num_wrappers = len(soup.select("div.dash-theme-6-x-wrapperModalCC"))
+        logger.info(f"[{tname}] [{idx}/{total}] Encontré {num_wrappers} wrappers de cuotas en {url}")
+
+        item["modelo_id"]      = modelo
+        item["disponible"]     = disp
+        item["no_disponible"]  = nodisp
+        item["financiacion"]   = cuotas_bancos
+        item.pop("error", None)
+
+        logger.info(f"[{tname}] [{idx}/{total}]   → Modelo: {modelo}")
+        logger.info(f"[{tname}] [{idx}/{total}]   → Disponibles: {disp}")
+        logger.info(f"[{tname}] [{idx}/{total}]   → No disponibles: {nodisp}")
+        logger.info(f"[{tname}] [{idx}/{total}]   → Cuotas/Bancos: {cuotas_bancos}")
+        logger.info(f"[{tname}] ----------------------------------------")
+
+        ITEMS.inc(store=STORE, section=seccion)
+        RSS.set(rss_actual_kb(), store=STORE)
+
+    except Exception as e:
+        clase = clasificar_fallo(e)
+        espera = cola.fallar(tarea, clase, e.espera if isinstance(e, FalloItem) else 0.0)
+        if turno:
+            if clase == BLOQUEADO:
+                turno.marcar(SOBRECARGA, e.detalle)
+            else:
+                turno.fallo(e)
+        if isinstance(e, WebDriverException):
+            ERRORES_WEBDRIVER.inc(store=STORE, section=seccion)
+        if espera is not None:
+            logger.warning(f"[{tname}] [{idx}/{total}] Falla {clase} procesando {url} ({e}); reintento en {espera:.1f}s")
+        else:
+            logger.error(f"[{tname}] [{idx}/{total}] Falla {clase} definitiva procesando {url}: {e}")
             item["modelo_id"]      = item.get("modelo_id", "N/A")
             item["disponible"]     = item.get("disponible", [])
             item["no_disponible"]  = item.get("no_disponible", [])
             item["financiacion"]   = item.get("financiacion", [])
-
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except Exception:
-                    pass
-            try:
-                nuevo_driver = initialize_driver()
-                driver_queue.put(nuevo_driver)
-            except Exception as e_init:
-                logger.error(f"[{tname}] Error reinicializando driver: {e_init}")
-
+            item["error"]          = clase
             with lock:
                 resultados.append(item)
-            task_queue.task_done()
+            tracker.error()
+
+    else:
+        with lock:
+            resultados.append(item)
+        cola.completar(tarea)
+
+    finally:
+        if turno:
+            turno.terminar()
+        # Cada ítem usa una sesión nueva del navegador remoto
+        if driver:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        try:
+            nuevo_driver = initialize_driver()
+            driver_queue.put(nuevo_driver)
+        except CircuitoAbierto as e_init:
+            logger.warning(f"[{tname}] No reinicializo driver: {e_init}")
+        except Exception as e_init:
+            logger.error(f"[{tname}] Error reinicializando driver: {e_init}")
 
-            logger.info(f"[{tname}] Terminado procesamiento de item {idx}/{total}")
+        logger.info(f"[{tname}] Terminado procesamiento de item {idx}/{total}")
 
 
-class Command(BaseCommand):
+class Command(ComandoPerfilable):
     help = 'Scraper Dash con pool de WebDrivers y threading manual'
+    store = "dash"
+    perfil_por_muestreo = True
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -250,69 +282,92 @@ class Command(BaseCommand):
             datefmt="%H:%M:%S"
         )
 
-        with open(JSON_PATH, encoding="utf-8") as f:
-            items = json.load(f)
-        total = len(items)
-        logger.info(f"Hilos activos al inicio: {threading.active_count()}")
-        logger.info(f"Cargados {total} productos desde {JSON_PATH}")
-
-        driver_queue = Queue(maxsize=MAX_THREADS)
-        for _ in range(MAX_THREADS):
-            try:
-                driver_queue.put(initialize_driver())
-            except Exception as e:
-                logger.error(f"Error al inicializar driver remoto: {e}")
-
-        task_queue = Queue()
-        for idx, item in enumerate(items, start=1):
-            task_queue.put((idx, item))
-
-        resultados = []
-        lock = threading.Lock()
-
-        threads = []
-        for i in range(MAX_THREADS):
-            t = threading.Thread(
-                target=worker,
-                name=f"ScraperDash_{i+1}",
-                args=(task_queue, driver_queue, resultados, lock, total)
-            )
-            threads.append(t)
-            t.start()
+        with registrar_run("run_dash_more_threads", STORE) as job, \
+                traza(inicio.strftime("%Y%m%d_%H%M%S"), STORE, "run_dash_more_threads.run"):
+            with open(JSON_PATH, encoding="utf-8") as f:
+                items = json.load(f)
+            total = len(items)
+            logger.info(f"Hilos activos al inicio: {threading.active_count()}")
+            logger.info(f"Cargados {total} productos desde {JSON_PATH}")
+            tracker = ProgressTracker(total, job)
+
+            ritmo = dominio(BASE_URL, maximo=MAX_THREADS)
+            driver_queue = Queue(maxsize=MAX_THREADS)
+            for _ in range(MAX_THREADS):
+                try:
+                    driver_queue.put(initialize_driver())
+                except Exception as e:
+                    logger.error(f"Error al inicializar driver remoto: {e}")
 
-        def progress_reporter():
-            while any(t.is_alive() for t in threads):
-                procesados = len(resultados)
-                porcentaje = (procesados / total) * 100 if total else 100
-                logger.info(f"Progreso: {procesados}/{total} ({porcentaje:.2f}%)")
-                time.sleep(PROGRESS_INTERVAL)
+            cola = ColaReintentos(items, store=STORE)
 
-        reporter_thread = threading.Thread(target=progress_reporter, name="ProgressReporter", daemon=True)
-        reporter_thread.start()
+            resultados = []
+            lock = threading.Lock()
 
-        task_queue.join()
-        reporter_thread.join(timeout=5)
+            threads = []
+            for i in range(MAX_THREADS):
+                t = threading.Thread(
+                    target=worker,
+                    name=f"ScraperDash_{i+1}",
+                    args=(cola, driver_queue, resultados, lock, total, tracker)
+                )
+                threads.append(t)
+                t.start()
+
+            def publicar():
+                return tracker.publicar(
+                    len(resultados),
+                    active_workers=sum(t.is_alive() for t in threads),
+                    idle_drivers=driver_queue.qsize(),
+                    concurrency_limit=ritmo.limite,
+                    retries_pending=cola.reintentos_en_espera,
+                )
 
-        while not driver_queue.empty():
-            try:
-                d = driver_queue.get_nowait()
-                d.quit()
-            except Empty:
-                break
-            except Exception:
-                pass
+            # Publica en el Job cada PUBLISH_INTERVAL segundos y loguea cada PROGRESS_INTERVAL
+            def progress_reporter():
+                ticks_por_log = max(PROGRESS_INTERVAL // PUBLISH_INTERVAL, 1)
+                tick = 0
+                while any(t.is_alive() for t in threads):
+                    datos = publicar()
+                    if tick % ticks_por_log == 0:
+                        logger.info(
+                            f"Progreso: {datos['items_done']}/{total} ({datos['percent']:.2f}%) | concurrencia {ritmo.limite}"
+                            f" | reintentos en espera {datos['retries_pending']}"
+                        )
+                    tick += 1
+                    time.sleep(PUBLISH_INTERVAL)
+
+            reporter_thread = threading.Thread(target=progress_reporter, name="ProgressReporter", daemon=True)
+            reporter_thread.start()
+
+            for t in threads:
+                t.join()
+            reporter_thread.join(timeout=5)
+            publicar()
+
+            while not driver_queue.empty():
+                try:
+                    d = driver_queue.get_nowait()
+                    d.quit()
+                except Empty:
+                    break
+                except Exception:
+                    pass
 
-        with open(OUTPUT_JSON, 'w', encoding='utf-8') as out_f:
-            json.dump(resultados, out_f, ensure_ascii=False, indent=2)
+            with open(OUTPUT_JSON, 'w', encoding='utf-8') as out_f:
+                json.dump(resultados, out_f, ensure_ascii=False, indent=2, default=serializar)
 
         fin = datetime.now()
         duracion = fin - inicio
         logger.info(f"--- Scraper Dash finalizado en: {fin.strftime('%Y-%m-%d %H:%M:%S')} ---")
         logger.info(f"Duración total: {str(duracion)}")
+        resumen_fallos = cola.resumen()
+        logger.info(resumen_fallos)
         send_alert_message(
             f"✅ Scraper Dash completado en: {fin.strftime('%Y-%m-%d %H:%M:%S')}\n"
             f"⏱ Duración: {str(duracion)}\n"
-            f"📄 Resultados guardados en: {OUTPUT_JSON.name}"
+            f"📄 Resultados guardados en: {OUTPUT_JSON.name}\n"
+            f"{resumen_fallos}"
         )
 
         logger.info(f"Hilos activos al final: {threading.active_count()}")
@@ -1,21 +1,15 @@
-from django.core.management.base import BaseCommand
+from scrapers.perfilado import ComandoPerfilable
 from scrapers.base_scraper import BaseScraper
 from bs4 import BeautifulSoup
-import pandas as pd
 import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from scrapers.utils_scraping import (
-    normalizar_columnas,
-    inferir_categoria,
-    inferir_tipo_producto,
-    inferir_variante,
-)
-
-class Command(BaseCommand):
+
+class Command(ComandoPerfilable):
     help = 'Ejecuta el scraper de Dexter'
+    store = "dexter"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -29,7 +23,7 @@ class Command(BaseCommand):
         try:
             scraper.send_alert("🚀 Iniciando scraping Dexter")
             scraper.run()
-            scraper.send_alert("✅ Scraper Dexter finalizado correctamente")
+            scraper.send_alert(f"✅ Scraper Dexter finalizado correctamente\n{scraper.resumen_rendimiento()}")
         except Exception as e:
             scraper.logger.error(str(e))
             scraper.send_alert(f"❌ Error en scraper Dexter: {str(e)}")
@@ -57,16 +51,13 @@ class DexterScraper(BaseScraper):
         for seccion, url in self.secciones.items():
             self.logger.info(f"Iniciando sección: {seccion}")
             productos = self.scrapear_seccion(url, seccion)
-
-            df = pd.DataFrame(productos)
-            df = normalizar_columnas(df)
-            items = df.to_dict(orient='records')
+            self.registrar_seccion(seccion, len(productos))
 
             json_name = f"productos_dexter_{self.session_id}_{seccion.lower()}.json"
-            self.export_to_json(items, json_name)
-            self.send_alert(f"✅ Sección {seccion} finalizada con {len(items)} productos.")
+            self.export_to_json(productos, json_name)
+            self.send_alert(f"✅ Sección {seccion} finalizada con {len(productos)} productos.")
 
-            all_items.extend(items)
+            all_items.extend(productos)
 
         combinado_name = f"productos_dexter_{self.session_id}_combinado.json"
         self.exportar_combinado_json(all_items, combinado_name)
@@ -74,9 +65,11 @@ class DexterScraper(BaseScraper):
         self.close_browser()
 
     def scrapear_seccion(self, url, seccion):
-        self.driver.get(url)
-        self._close_postal_modal()
-        self._cargar_todos()
+        self.cargar_pagina(url, seccion)
+        with self.fase("wait", seccion):
+            self._close_postal_modal()
+        with self.fase("scroll", seccion):
+            self._cargar_todos()
 
         elementos = self.driver.find_elements(By.CSS_SELECTOR, "div.product")
         if not elementos:
@@ -87,15 +80,16 @@ class DexterScraper(BaseScraper):
 
         self.logger.info(f"📦 Total de productos encontrados: {len(elementos)}")
         lista = []
-        for elem in elementos:
-            html = elem.get_attribute("outerHTML")
-            soup = BeautifulSoup(html, "html.parser")
-            prod = self.parsear_producto(soup, seccion)
-            if prod:
-                lista.append(prod)
+        with self.medir_parseo(seccion):
+            for elem in elementos:
+                html = elem.get_attribute("outerHTML")
+                soup = BeautifulSoup(html, "html.parser")
+                prod = self.parsear_producto(soup, seccion)
+                if prod:
+                    lista.append(prod)
 
         # eliminar duplicados por id_producto
-        uniques = {p["id_producto"]: p for p in lista if p["id_producto"] != "N/A"}
+        uniques = {p.id_producto: p for p in lista if p.id_producto}
         return list(uniques.values())
 
     def _close_postal_modal(self):
@@ -161,62 +155,7 @@ class DexterScraper(BaseScraper):
 
     def parsear_producto(self, soup, seccion):
         try:
-            cont = soup.select_one("div.product")
-            pid  = cont.get("data-pid", "N/A") if cont else "N/A"
-
-            title_el = soup.select_one("div.pdp-link a.link")
-            nombre = title_el.text.strip() if title_el else "N/A"
-            href   = title_el["href"] if title_el and title_el.has_attr("href") else ""
-            link   = f"https://www.dexter.com.ar{href}" if href else "N/A"
-
-            price_el = soup.select_one("span.sales .value")
-            precio   = price_el.text.strip() if price_el else "N/A"
-
-            # precio anterior
-            prev_el = soup.select_one("span.sales del span.value")
-            if prev_el:
-                if prev_el.has_attr("content"):
-                    precio_anterior = prev_el["content"]
-                else:
-                    precio_anterior = prev_el.text.strip()
-            else:
-                precio_anterior = "N/A"
-
-            # descuento (opcional, si quieres)
-            discount_el = soup.select_one("fieldset legend")
-            descuento = discount_el.text.strip() if discount_el else "N/A"
-
-            # cuotas
-            cuotas_el = soup.select_one("div.installments-container span")
-            cuotas = cuotas_el.text.strip() if cuotas_el else "N/A"
-
-            img_el = soup.select_one("img.tile-image.primary-image")
-            imagen  = img_el["src"] if img_el and img_el.has_attr("src") else "N/A"
-
-            return {
-                "nombre": nombre,
-                "marca": "N/A",
-                "precio": precio,
-                "precio_anterior": precio_anterior,
-                "descuento": descuento,
-                "cuotas": cuotas,
-                "envio_gratis": "N/A",
-                "imagen_url": imagen,
-                "link": link,
-                "id_producto": pid,
-                "sku": pid,
-                "categoria": seccion,
-                "clase_de_producto": inferir_categoria(nombre),
-                "tags": "N/A",
-                "talles": "N/A",
-                "nombre_pagina": "Dexter",
-                "tipo_de_producto": inferir_tipo_producto(nombre),
-                "variante": inferir_variante(nombre),
-                "disponible": {},
-                "no_disponible": {},
-                "modelo_id": pid,
-            }
-
+            return self.extractor.extraer(soup, seccion)
         except Exception as e:
             self.logger.error(f"Error parseando producto: {e}")
             return None
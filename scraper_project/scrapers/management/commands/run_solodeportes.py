@@ -1,21 +1,15 @@
-from django.core.management.base import BaseCommand
+from scrapers.perfilado import ComandoPerfilable
 from scrapers.base_scraper import BaseScraper
 from bs4 import BeautifulSoup
-import pandas as pd
 import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from scrapers.utils_scraping import (
-    normalizar_columnas,
-    inferir_categoria,
-    inferir_tipo_producto,
-    inferir_variante,
-)
 from selenium.common.exceptions import TimeoutException
 
-class Command(BaseCommand):
+class Command(ComandoPerfilable):
     help = 'Ejecuta el scraper de Solo Deportes'
+    store = "solodeportes"
 
     def add_arguments(self, parser):
         parser.add_argument('--wait', type=int, default=5, help='Timeout máximo de espera en segundos')
@@ -26,7 +20,7 @@ class Command(BaseCommand):
         try:
             scraper.send_alert("🚀 Iniciando scraping Solo Deportes")
             scraper.run()
-            scraper.send_alert("✅ Scraper Solo Deportes finalizado correctamente")
+            scraper.send_alert(f"✅ Scraper Solo Deportes finalizado correctamente\n{scraper.resumen_rendimiento()}")
         except Exception as e:
             scraper.logger.error(str(e))
             scraper.send_alert(f"❌ Error en scraper Solo Deportes: {str(e)}")
@@ -55,16 +49,13 @@ class SoloDeportesScraper(BaseScraper):
         for seccion, url_base in self.secciones.items():
             self.logger.info(f"Iniciando sección: {seccion}")
             productos = self.scrapear_seccion(url_base, seccion)
-
-            df = pd.DataFrame(productos)
-            df = normalizar_columnas(df)
-            productos_norm = df.to_dict(orient='records')
+            self.registrar_seccion(seccion, len(productos))
 
             json_name = f"productos_solodeportes_{self.session_id}_{seccion.lower()}.json"
-            self.export_to_json(productos_norm, json_name)
-            self.send_alert(f"✅ Sección {seccion} finalizada con {len(productos_norm)} productos.")
+            self.export_to_json(productos, json_name)
+            self.send_alert(f"✅ Sección {seccion} finalizada con {len(productos)} productos.")
 
-            all_items.extend(productos_norm)
+            all_items.extend(productos)
 
         combinado_name = f"productos_solodeportes_{self.session_id}_combinado.json"
         self.exportar_combinado_json(all_items, combinado_name)
@@ -88,28 +79,31 @@ class SoloDeportesScraper(BaseScraper):
                 url = f"{url_base}?p={pagina}"
 
             self.logger.info(f"  → Abriendo página {pagina} de {seccion}: {url}")
-            self.driver.get(url)
+            self.cargar_pagina(url, seccion)
 
             try:
-                WebDriverWait(self.driver, self.wait_time).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "li.item.product.product-item"))
-                )
+                with self.fase("wait", seccion):
+                    WebDriverWait(self.driver, self.wait_time).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "li.item.product.product-item"))
+                    )
             except TimeoutException:
                 self.logger.warning(f"    → Timeout esperando productos en página {pagina}.")
                 break
 
-            soup = BeautifulSoup(self.driver.page_source, "html.parser")
             nuevos_en_esta_pagina = 0
 
-            for prod in soup.select("li.item.product.product-item"):
-                parsed = self.parsear_producto(prod, seccion)
-                if not parsed:
-                    continue
-                key = parsed.get("sku") or parsed.get("link")
-                if key and key not in seen:
-                    seen.add(key)
-                    productos_totales.append(parsed)
-                    nuevos_en_esta_pagina += 1
+            # Armar el árbol es lo más caro del parseo: va dentro de la fase
+            with self.medir_parseo(seccion):
+                soup = BeautifulSoup(self.driver.page_source, "html.parser")
+                for prod in soup.select("li.item.product.product-item"):
+                    parsed = self.parsear_producto(prod, seccion)
+                    if not parsed:
+                        continue
+                    key = parsed.sku or parsed.link
+                    if key and key not in seen:
+                        seen.add(key)
+                        productos_totales.append(parsed)
+                        nuevos_en_esta_pagina += 1
 
             self.logger.info(f"    → Página {pagina}: se agregaron {nuevos_en_esta_pagina} productos nuevos.")
 
@@ -122,58 +116,7 @@ class SoloDeportesScraper(BaseScraper):
     
     def parsear_producto(self, producto, seccion):
         try:
-            nombre_elem = producto.select_one("p.product-item-name")
-            nombre = nombre_elem.text.strip() if nombre_elem else "N/A"
-
-            sku_elem = producto.select_one("p.product-item-sku span.value")
-            sku = sku_elem.text.strip() if sku_elem else "N/A"
-
-            link_elem = producto.find("a", href=True, onclick=True)
-            link = link_elem["href"] if link_elem else "N/A"
-
-            img = producto.select_one("span.product-image-container img.product-image-photo")
-            imagen_url = img["src"] if img else "N/A"
-
-            brand = producto.select_one("div.brand-container img.brand")
-            marca = brand.get("alt", "N/A").strip() if brand else "N/A"
-
-            precio_elem = producto.select_one("span.special-price span.price")
-            if precio_elem:
-                precio = precio_elem.text.strip()
-            else:
-                precio_elem = producto.select_one("div.price-box span.price")
-                precio = precio_elem.text.strip() if precio_elem else "N/A"
-
-            old_price_elem = producto.select_one("span.old-price span.price")
-            precio_anterior = old_price_elem.text.strip() if old_price_elem else "N/A"
-
-            descuento_elem = producto.select_one("span.quotes-pdp")
-            descuento = descuento_elem.text.strip() if descuento_elem else "N/A"
-            
-            return {
-                "nombre": nombre,
-                "marca": marca,
-                "precio": precio,
-                "precio_anterior": precio_anterior,
-                "descuento": descuento,
-                "cuotas": "N/A",
-                "envio_gratis": False,
-                "imagen_url": imagen_url,
-                "link": link,
-                "id_producto": sku,
-                "sku": sku,
-                "categoria": seccion,
-                "clase_de_producto": inferir_categoria(nombre),
-                "tags": "N/A",
-                "talles": "N/A",
-                "nombre_pagina": "SoloDeportes",
-                "tipo_de_producto": inferir_tipo_producto(nombre),
-                "variante": inferir_variante(nombre),
-                "disponible": {},
-                "no_disponible": {},
-                "modelo_id": sku,
-            }
-
+            return self.extractor.extraer(producto, seccion)
         except Exception as e:
             self.logger.error(f"Error parseando producto: {e}")
             return None
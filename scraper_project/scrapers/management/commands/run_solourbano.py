@@ -1,21 +1,15 @@
-from django.core.management.base import BaseCommand
+from scrapers.perfilado import ComandoPerfilable
 from scrapers.base_scraper import BaseScraper
 from bs4 import BeautifulSoup
-import pandas as pd
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from scrapers.utils_scraping import (
-    normalizar_columnas,
-    inferir_categoria,
-    inferir_tipo_producto,
-    inferir_variante,
-)
 import time
 from selenium.common.exceptions import TimeoutException
 
-class Command(BaseCommand):
+class Command(ComandoPerfilable):
     help = 'Ejecuta el scraper de Solo Urbano en Solo Deportes'
+    store = "solourbano"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -29,7 +23,7 @@ class Command(BaseCommand):
         try:
             scraper.send_alert("🚀 Iniciando scraping Solo Urbano")
             scraper.run()
-            scraper.send_alert("✅ Scraper Solo Urbano finalizado correctamente")
+            scraper.send_alert(f"✅ Scraper Solo Urbano finalizado correctamente\n{scraper.resumen_rendimiento()}")
         except Exception as e:
             scraper.logger.error(str(e))
             scraper.send_alert(f"❌ Error en scraper Solo Urbano: {str(e)}")
@@ -59,16 +53,13 @@ class SoloUrbanoScraper(BaseScraper):
         for seccion, url_base in self.secciones.items():
             self.logger.info(f"Iniciando sección: {seccion}")
             productos = self.scrapear_seccion(url_base, seccion)
-
-            df = pd.DataFrame(productos)
-            df = normalizar_columnas(df)
-            productos_norm = df.to_dict(orient='records')
+            self.registrar_seccion(seccion, len(productos))
 
             json_name = f"productos_solourbano_{self.session_id}_{seccion.lower()}.json"
-            self.export_to_json(productos_norm, json_name)
-            self.send_alert(f"✅ Sección {seccion} finalizada con {len(productos_norm)} productos.")
+            self.export_to_json(productos, json_name)
+            self.send_alert(f"✅ Sección {seccion} finalizada con {len(productos)} productos.")
 
-            all_items.extend(productos_norm)
+            all_items.extend(productos)
 
         combinado_name = f"productos_solourbano_{self.session_id}_combinado.json"
         self.exportar_combinado_json(all_items, combinado_name)
@@ -88,104 +79,52 @@ class SoloUrbanoScraper(BaseScraper):
                 url = f"{url_base}?p={pagina}"
 
             self.logger.info(f"  → Abriendo página {pagina}: {url}")
-            self.driver.get(url)
+            self.cargar_pagina(url, seccion)
 
             try:
-                WebDriverWait(self.driver, self.wait_time).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "li.item.product.product-item"))
-                )
+                with self.fase("wait", seccion):
+                    WebDriverWait(self.driver, self.wait_time).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "li.item.product.product-item"))
+                    )
             except TimeoutException:
                 self.logger.info(f"    * No se encontraron productos en página {pagina}. Deteniendo paginación.")
                 break
 
-            total_altura = self.driver.execute_script("return document.body.scrollHeight")
-            altura_actual = 0
-            paso = max(int(total_altura / 5), 200)
-            while altura_actual < total_altura:
-                altura_actual += paso
-                self.driver.execute_script(f"window.scrollTo(0, {altura_actual});")
-                time.sleep(0.5)
+            with self.fase("scroll", seccion):
                 total_altura = self.driver.execute_script("return document.body.scrollHeight")
-            time.sleep(1)
+                altura_actual = 0
+                paso = max(int(total_altura / 5), 200)
+                while altura_actual < total_altura:
+                    altura_actual += paso
+                    self.driver.execute_script(f"window.scrollTo(0, {altura_actual});")
+                    time.sleep(0.5)
+                    total_altura = self.driver.execute_script("return document.body.scrollHeight")
+                time.sleep(1)
+
+            # Armar el árbol es lo más caro del parseo: va dentro de la fase
+            with self.medir_parseo(seccion):
+                soup = BeautifulSoup(self.driver.page_source, "html.parser")
+                elementos = soup.select("li.item.product.product-item")
+                for prod in elementos:
+                    parsed = self.parsear_producto(prod, seccion)
+                    if not parsed:
+                        continue
+                    key = parsed.sku or parsed.link
+                    if key not in seen:
+                        seen.add(key)
+                        todos_productos.append(parsed)
 
-            soup = BeautifulSoup(self.driver.page_source, "html.parser")
-            elementos = soup.select("li.item.product.product-item")
             if not elementos:
                 self.logger.info(f"    * Lista vacía en página {pagina}. Deteniendo paginación.")
                 break
 
-            for prod in elementos:
-                parsed = self.parsear_producto(prod, seccion)
-                if not parsed:
-                    continue
-                key = parsed.get("sku") or parsed.get("link")
-                if key not in seen:
-                    seen.add(key)
-                    todos_productos.append(parsed)
-
             pagina += 1
 
         return todos_productos
 
     def parsear_producto(self, producto, seccion):
         try:
-            nombre_elem = producto.select_one("p.product-item-name")
-            nombre = nombre_elem.text.strip() if nombre_elem else "N/A"
-
-            sku_elem = producto.select_one("p.product-item-sku span.value")
-            sku = sku_elem.text.strip() if sku_elem else "N/A"
-
-            link_elem = producto.find("a", href=True)
-            link = link_elem["href"] if link_elem else "N/A"
-
-            img = producto.select_one("div.product-item-photo img.product-image-photo")
-            imagen_url = img["src"] if img else "N/A"
-
-            hover = producto.select_one(
-                "span.product-image-hover-container img.product-hover-photo"
-            )
-            imagen_hover_url = hover["src"] if hover else "N/A"
-
-            brand = producto.select_one("div.brand-container img.brand")
-            marca = brand.get("alt", "N/A").strip() if brand else "N/A"
-
-            sp_elem = producto.select_one("div.price-box span.special-price span.price")
-            if sp_elem:
-                precio = sp_elem.get_text(strip=True)
-                old_elem = producto.select_one("div.price-box span.old-price span.price")
-                precio_anterior = old_elem.get_text(strip=True) if old_elem else "N/A"
-            else:
-                normal_elem = producto.select_one("div.price-box span.price")
-                precio = normal_elem.get_text(strip=True) if normal_elem else "N/A"
-                precio_anterior = "N/A"
-
-            descuento_elem = producto.select_one("div.price-box span.quotes-pdp")
-            descuento = descuento_elem.get_text(strip=True) if descuento_elem else "N/A"
-
-            return {
-                "nombre": nombre,
-                "marca": marca,
-                "precio": precio,
-                "precio_anterior": precio_anterior,
-                "descuento": descuento,
-                "cuotas": "N/A",
-                "envio_gratis": False,
-                "imagen_url": imagen_url,
-                "link": link,
-                "id_producto": sku,
-                "sku": sku,
-                "categoria": seccion,
-                "clase_de_producto": inferir_categoria(nombre),
-                "tags": "N/A",
-                "talles": "N/A",
-                "nombre_pagina": "Solo Urbano",
-                "tipo_de_producto": inferir_tipo_producto(nombre),
-                "variante": inferir_variante(nombre),
-                "disponible": {},
-                "no_disponible": {},
-                "modelo_id": sku,
-            }
-
+            return self.extractor.extraer(producto, seccion)
         except Exception as e:
             self.logger.error(f"Error parseando producto: {e}")
             return None
@@ -1,7 +1,7 @@
 import json
 import logging
 import time
-from django.core.management.base import BaseCommand
+from scrapers.perfilado import ComandoPerfilable
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
@@ -9,13 +9,17 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import re
+from scrapers.financiacion import cuotas_gocuotas
+from scrapers.registro import serializar
 
 logger = logging.getLogger(__name__)
 
 JSON_PATH   = "/Users/matiascampos/Anocuta/scraper_project/scraper_project/outputs/solourbano/productos_solourbano_20250601_133731_combinado.json"
 OUTPUT_JSON = "/Users/matiascampos/Anocuta/scraper_project/scraper_project/outputs/solourbano/productos_solourbano_20250601_133731_more.json"
 
-class Command(BaseCommand):
+class Command(ComandoPerfilable):
+    store = "solourbano"
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--headless',
@@ -71,34 +75,6 @@ class Command(BaseCommand):
 
             return disponibles, no_disponibles
 
-        def extraer_cuotas_bancos(soup):
-            resultados = []
-            go_tag = soup.select_one("#gocuotas-widget .gocuotas-widget-text p")
-            if not go_tag:
-                return resultados
-
-            texto_go = go_tag.get_text(" ", strip=True)
-            m1 = re.search(r"Hasta\s+(\d+)\s+cuotas", texto_go, re.IGNORECASE)
-            m2 = re.search(r"de\s+\$([\d\.\,]+)", texto_go)
-            banco_match = re.search(r"con\s+Tarjeta de\s+([A-Za-zÁÉÍÓÚÜáéíóúü ]+)", texto_go)
-
-            if m1 and m2:
-                num_cuotas = int(m1.group(1))
-                precio_texto = m2.group(1).replace(".", "").replace(",", ".")
-                try:
-                    precio_por_cuota = float(precio_texto)
-                except ValueError:
-                    precio_por_cuota = None
-                banco = banco_match.group(1).strip() if banco_match else ""
-                resultados.append({
-                    "banco": banco,
-                    "num_cuotas": num_cuotas,
-                    "precio_por_cuota": precio_por_cuota,
-                    "sin_interes": True
-                })
-
-            return resultados
-
         resultados = []
         for idx, item in enumerate(items, start=1):
             url = item.get("link")
@@ -133,7 +109,7 @@ class Command(BaseCommand):
             soup = BeautifulSoup(driver.page_source, "html.parser")
 
             disp, nodisp = extraer_talles(soup)
-            cuotas_bancos = extraer_cuotas_bancos(soup)
+            cuotas_bancos = cuotas_gocuotas(soup)
 
             item["disponible"]    = disp
             item["no_disponible"] = nodisp
@@ -150,5 +126,5 @@ class Command(BaseCommand):
         driver.quit()
 
         with open(OUTPUT_JSON, 'w', encoding='utf-8') as out_f:
-            json.dump(resultados, out_f, ensure_ascii=False, indent=2)
+            json.dump(resultados, out_f, ensure_ascii=False, indent=2, default=serializar)
         logger.info(f"Resultados guardados en {OUTPUT_JSON}")
@@ -0,0 +1,61 @@
+import signal
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from scrapers.jobs import (
+    nombre_worker,
+    reclamar_job,
+    ejecutar_job,
+    liberar_colgados,
+)
+
+
+class Command(BaseCommand):
+    help = "Worker que toma jobs de la tabla job (SELECT ... FOR UPDATE SKIP LOCKED) y los ejecuta"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=5,
+            help='Segundos de espera entre consultas cuando no hay jobs (por defecto: 5)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Procesa los jobs disponibles y termina'
+        )
+
+    def handle(self, *args, **options):
+        worker = nombre_worker()
+        self.detener = False
+
+        def _detener(signum, frame):
+            self.stdout.write(f"🛑 Señal {signum} recibida: el worker termina después del job actual")
+            self.detener = True
+
+        signal.signal(signal.SIGTERM, _detener)
+        signal.signal(signal.SIGINT, _detener)
+
+        self.stdout.write(f"👷 Worker {worker} iniciado")
+        while not self.detener:
+            close_old_connections()
+            liberados = liberar_colgados()
+            if liberados:
+                self.stdout.write(self.style.WARNING(f"⚠️ {liberados} jobs colgados marcados como fallidos"))
+
+            job = reclamar_job(worker)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll'])
+                continue
+
+            self.stdout.write(f"▶️ Job {job.pk}: {job.command} {' '.join(job.args)} ({job.store})")
+            inicio = time.monotonic()
+            ejecutar_job(job)
+            duracion = time.monotonic() - inicio
+            estilo = self.style.SUCCESS if job.status == job.TERMINADO else self.style.ERROR
+            self.stdout.write(estilo(f"⏹️ Job {job.pk} {job.status} en {duracion:.1f}s"))
+
+        self.stdout.write(f"👋 Worker {worker} detenido")
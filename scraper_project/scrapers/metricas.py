@@ -0,0 +1,318 @@
+import atexit
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from scrapers.trazas import traza, run_id_desde_archivo
+
+# Buckets en segundos para los histogramas de tiempos (carga de página, parseo, imports)
+BUCKETS_SEGUNDOS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+# Cada cuántos segundos el proceso vuelca su registro a la tabla process_metrics
+INTERVALO_VOLCADO = 15
+# Los gauges de procesos que no volcaron en este tiempo no se exponen (proceso muerto)
+VIGENCIA_GAUGES = timedelta(minutes=5)
+# Los snapshots más viejos que esto se borran al exponer
+RETENCION_SNAPSHOTS = timedelta(days=7)
+
+REGISTRO = {}
+
+
+class Metrica:
+    tipo = None
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.valores = {}
+        self.lock = threading.Lock()
+        REGISTRO[nombre] = self
+
+    def _clave(self, etiquetas):
+        return tuple(str(etiquetas.get(e, "")) for e in self.etiquetas)
+
+    def snapshot(self):
+        with self.lock:
+            return [[list(clave), valor] for clave, valor in self.valores.items()]
+
+
+class Contador(Metrica):
+    tipo = "counter"
+
+    def inc(self, n=1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self.lock:
+            self.valores[clave] = self.valores.get(clave, 0) + n
+        _programar_volcado()
+
+
+class Gauge(Metrica):
+    tipo = "gauge"
+
+    def set(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self.lock:
+            self.valores[clave] = valor
+        _programar_volcado()
+
+
+class Histograma(Metrica):
+    """Guarda por combinación de etiquetas [conteo por bucket (no acumulado), suma, cantidad]."""
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(buckets)
+
+    def observe(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        i = next((i for i, b in enumerate(self.buckets) if valor <= b), len(self.buckets))
+        with self.lock:
+            conteos, suma, cantidad = self.valores.get(clave) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            conteos = list(conteos)
+            conteos[i] += 1
+            self.valores[clave] = (conteos, suma + valor, cantidad + 1)
+        _programar_volcado()
+
+    @contextmanager
+    def medir(self, **etiquetas):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - inicio, **etiquetas)
+
+
+# --- Métricas de los scrapers ---
+CARGA_PAGINA = Histograma(
+    "scraper_page_load_seconds", "Tiempo de driver.get() por página", ("store", "section")
+)
+PARSEO = Histograma(
+    "scraper_parse_seconds", "Tiempo de parseo del HTML de una página", ("store", "section")
+)
+CREACION_DRIVER = Histograma(
+    "scraper_driver_create_seconds", "Tiempo de creación de un WebDriver", ("store", "mode")
+)
+ERRORES_WEBDRIVER = Contador(
+    "scraper_webdriver_exceptions_total", "WebDriverException capturadas", ("store", "section")
+)
+ITEMS = Contador(
+    "scraper_items_total", "Productos extraídos por sección", ("store", "section")
+)
+SELECTORES = Contador(
+    "scraper_selector_hits_total",
+    "Productos por campo según qué selector del spec acertó (0 = principal, sin_dato = ninguno)",
+    ("store", "field", "selector"),
+)
+LIMITE_CONCURRENCIA = Gauge(
+    "scraper_concurrency_limit", "Límite de concurrencia AIMD actual por dominio", ("domain",)
+)
+RETROCESOS = Contador(
+    "scraper_backoff_total", "Veces que se bajó la concurrencia de un dominio, por motivo", ("domain", "reason")
+)
+ESPERA_RITMO = Histograma(
+    "scraper_rate_limit_wait_seconds", "Espera por un token del rate limiter antes de cada pedido", ("domain",)
+)
+FALLOS_ITEM = Contador(
+    "scraper_item_failures_total",
+    "Fallas por ítem según su clase; outcome=retry si se reagendó, final si se dio por perdido",
+    ("store", "kind", "outcome"),
+)
+ESTADO_CIRCUITO = Gauge(
+    "scraper_circuit_state", "Estado del circuit breaker (0 cerrado, 1 semiabierto, 2 abierto)", ("circuit",)
+)
+RECHAZOS_CIRCUITO = Contador(
+    "scraper_circuit_rejections_total", "Llamadas rechazadas sin intentar por un circuito abierto", ("circuit",)
+)
+RSS = Gauge(
+    "scraper_process_rss_kb", "RSS actual del proceso que corre el scraper (KB)", ("store",)
+)
+
+# --- Métricas de los importers ---
+FILAS_ESCRITAS = Contador(
+    "importer_rows_written_total", "Filas insertadas/actualizadas/borradas por tabla", ("store", "table", "operation")
+)
+DURACION_IMPORT = Histograma(
+    "importer_duration_seconds", "Duración total de un import_productos_*", ("store",)
+)
+
+
+# --- Filas escritas por tabla, sin tocar cada .create() de los importers ---
+PATRON_ESCRITURA = re.compile(
+    r'^\s*(?:WITH\b.*?\)\s*)?(INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+"?(\w+)"?',
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _contar_filas(store):
+    def wrapper(execute, sql, params, many, context):
+        resultado = execute(sql, params, many, context)
+        m = PATRON_ESCRITURA.match(sql)
+        if m:
+            filas = context["cursor"].rowcount
+            if filas and filas > 0:
+                operacion = m.group(1).split()[0].lower()
+                FILAS_ESCRITAS.inc(filas, store=store, table=m.group(2), operation=operacion)
+        return resultado
+    return wrapper
+
+
+@contextmanager
+def instrumentar_import(store, archivo=None):
+    """
+    Mide la duración del import y cuenta las filas escritas por tabla
+    interceptando las consultas de la conexión (connection.execute_wrapper).
+    Si el JSON trae el session_id del scraper en el nombre, los spans del import
+    van a la misma traza que la corrida que lo generó.
+    """
+    run_id = (archivo and run_id_desde_archivo(archivo)) or datetime.now().strftime("%Y%m%d_%H%M%S")
+    inicio = time.perf_counter()
+    try:
+        with connection.execute_wrapper(_contar_filas(store)), \
+                traza(run_id, store, "import", **{"import.store": store, "import.archivo": archivo}):
+            yield
+    finally:
+        DURACION_IMPORT.observe(time.perf_counter() - inicio, store=store)
+        _volcar_seguro()
+
+
+# --- Volcado a la base: el web (/metrics) y los workers son procesos distintos ---
+_hilo_volcado = None
+_lock_hilo = threading.Lock()
+
+
+def snapshot():
+    return {
+        m.nombre: {"tipo": m.tipo, "valores": m.snapshot()}
+        for m in REGISTRO.values()
+        if m.valores
+    }
+
+
+def volcar():
+    """Guarda el registro de este proceso en process_metrics (una fila por worker)."""
+    datos = snapshot()
+    if not datos:
+        return
+    from scrapers.jobs import nombre_worker
+    from scrapers.models import ProcessMetrics
+
+    ProcessMetrics.objects.update_or_create(
+        worker=nombre_worker(),
+        defaults={"data": datos, "updated_at": timezone.now()},
+    )
+
+
+def purgar():
+    """Borra los snapshots de procesos que no vuelcan hace más de RETENCION_SNAPSHOTS."""
+    from scrapers.models import ProcessMetrics
+
+    ProcessMetrics.objects.filter(updated_at__lt=timezone.now() - RETENCION_SNAPSHOTS).delete()
+
+
+def _loop_volcado():
+    while True:
+        time.sleep(INTERVALO_VOLCADO)
+        try:
+            close_old_connections()
+            volcar()
+            purgar()
+        except Exception:
+            pass
+
+
+def _programar_volcado():
+    global _hilo_volcado
+    if _hilo_volcado is not None:
+        return
+    with _lock_hilo:
+        if _hilo_volcado is None:
+            _hilo_volcado = threading.Thread(target=_loop_volcado, name="MetricasVolcado", daemon=True)
+            _hilo_volcado.start()
+            atexit.register(_volcar_seguro)
+
+
+def _volcar_seguro():
+    try:
+        volcar()
+    except Exception:
+        pass
+
+
+# --- Exposición en formato texto de Prometheus ---
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _etiquetas_texto(nombres, valores, extra=()):
+    pares = [f'{n}="{_escapar(v)}"' for n, v in list(zip(nombres, valores)) + list(extra)]
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def combinar(snapshots):
+    """
+    Junta los snapshots de todos los procesos: contadores e histogramas se suman,
+    los gauges se exponen por worker (sumar el RSS de dos procesos no tiene sentido).
+    `snapshots` es una lista de (worker, datos, vigente).
+    """
+    combinado = {}
+    for worker, datos, vigente in snapshots:
+        for nombre, metrica in datos.items():
+            metrica_local = REGISTRO.get(nombre)
+            if metrica_local is None:
+                continue
+            valores = combinado.setdefault(nombre, {})
+            for clave, valor in metrica["valores"]:
+                clave = tuple(clave)
+                if metrica["tipo"] == "gauge":
+                    if vigente:
+                        valores[clave + (worker,)] = valor
+                elif metrica["tipo"] == "counter":
+                    valores[clave] = valores.get(clave, 0) + valor
+                else:
+                    conteos, suma, cantidad = valores.get(clave) or ([0] * len(valor[0]), 0.0, 0)
+                    valores[clave] = (
+                        [a + b for a, b in zip(conteos, valor[0])],
+                        suma + valor[1],
+                        cantidad + valor[2],
+                    )
+    return combinado
+
+
+def exponer():
+    """
+    Texto para /metrics con las métricas de todos los procesos que volcaron a la base.
+    Solo lee: el volcado y la purga los hace el hilo de cada proceso (_loop_volcado).
+    """
+    from scrapers.models import ProcessMetrics
+
+    ahora = timezone.now()
+    snapshots = [
+        (p.worker, p.data, p.updated_at >= ahora - VIGENCIA_GAUGES)
+        for p in ProcessMetrics.objects.filter(updated_at__gte=ahora - RETENCION_SNAPSHOTS)
+    ]
+    combinado = combinar(snapshots)
+
+    lineas = []
+    for nombre, metrica in REGISTRO.items():
+        lineas.append(f"# HELP {nombre} {metrica.ayuda}")
+        lineas.append(f"# TYPE {nombre} {metrica.tipo}")
+        for clave, valor in sorted(combinado.get(nombre, {}).items()):
+            if metrica.tipo == "gauge":
+                etiquetas = _etiquetas_texto(metrica.etiquetas + ("worker",), clave)
+                lineas.append(f"{nombre}{etiquetas} {valor}")
+            elif metrica.tipo == "counter":
+                lineas.append(f"{nombre}{_etiquetas_texto(metrica.etiquetas, clave)} {valor}")
+            else:
+                conteos, suma, cantidad = valor
+                acumulado = 0
+                for limite, conteo in zip(list(metrica.buckets) + ["+Inf"], conteos):
+                    acumulado += conteo
+                    etiquetas = _etiquetas_texto(metrica.etiquetas, clave, [("le", limite)])
+                    lineas.append(f"{nombre}_bucket{etiquetas} {acumulado}")
+                lineas.append(f"{nombre}_sum{_etiquetas_texto(metrica.etiquetas, clave)} {suma}")
+                lineas.append(f"{nombre}_count{_etiquetas_texto(metrica.etiquetas, clave)} {cantidad}")
+    return "\n".join(lineas) + "\n"
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:34
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def deduplicar(apps, schema_editor):
+    # Antes de crear los UNIQUE hay que limpiar los duplicados que ya existan.
+    Size = apps.get_model('scrapers', 'Size')
+    ProductSize = apps.get_model('scrapers', 'ProductSize')
+    ProductPage = apps.get_model('scrapers', 'ProductPage')
+
+    repetidos = Size.objects.values('name').annotate(n=Count('id'), keep=Min('id')).filter(n__gt=1)
+    for row in repetidos:
+        otros = Size.objects.filter(name=row['name']).exclude(pk=row['keep'])
+        ProductSize.objects.filter(size__in=otros).update(size_id=row['keep'])
+        otros.delete()
+
+    repetidos = ProductPage.objects.values('product', 'page').annotate(n=Count('id'), keep=Min('id')).filter(n__gt=1)
+    for row in repetidos:
+        ProductPage.objects.filter(
+            product_id=row['product'], page_id=row['page']
+        ).exclude(pk=row['keep']).delete()
+
+    # Los FK son DEFERRABLE INITIALLY DEFERRED: sin esto los chequeos de los UPDATE/DELETE
+    # de arriba quedan pendientes y Postgres no deja hacer el ALTER TABLE de la misma
+    # transacción ("cannot ALTER TABLE ... because it has pending trigger events")
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrapers', '0003_codesdexter_product_provider_code'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicar, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='size',
+            name='name',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='codesdexter',
+            index=models.Index(fields=['dexter_code'], name='dexter_code_dexter_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricing',
+            index=models.Index(fields=['product', 'page'], name='pricing_product_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['model_code'], name='product_model_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['sku'], name='product_sku_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['link'], name='product_link_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productpage',
+            index=models.Index(fields=['page', 'product'], name='product_page_page_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productquota',
+            index=models.Index(fields=['product', 'page'], name='product_quota_product_page_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='productpage',
+            constraint=models.UniqueConstraint(fields=('product', 'page'), name='product_page_product_page_uniq'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:38
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+CREAR_LATEST_PRICING = """
+CREATE MATERIALIZED VIEW latest_pricing AS
+SELECT DISTINCT ON (product_id, page_id)
+    id, product_id, page_id, price_current, price_prev, discount,
+    free_shipping, currency, recorded_at
+FROM pricing
+ORDER BY product_id, page_id, recorded_at DESC, id DESC;
+
+CREATE UNIQUE INDEX latest_pricing_product_page_uniq ON latest_pricing (product_id, page_id);
+CREATE INDEX latest_pricing_page_idx ON latest_pricing (page_id);
+"""
+
+BORRAR_LATEST_PRICING = "DROP MATERIALIZED VIEW IF EXISTS latest_pricing;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrapers', '0004_indexes_and_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestPricing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price_current', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('price_prev', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('discount', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('free_shipping', models.BooleanField(default=False)),
+                ('currency', models.CharField(max_length=10)),
+                ('recorded_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'latest_pricing',
+                'managed': False,
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='pricing',
+            name='pricing_product_page_idx',
+        ),
+        migrations.AddIndex(
+            model_name='pricing',
+            index=models.Index(fields=['product', 'page', '-recorded_at'], name='pricing_product_page_rec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricing',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['recorded_at'], name='pricing_recorded_at_brin'),
+        ),
+        migrations.RunSQL(CREAR_LATEST_PRICING, BORRAR_LATEST_PRICING),
+    ]
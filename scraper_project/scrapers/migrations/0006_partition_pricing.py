@@ -0,0 +1,120 @@
+from datetime import date
+
+from django.db import migrations
+from django.utils import timezone
+
+
+COLUMNAS = "id, price_current, price_prev, discount, free_shipping, currency, recorded_at, page_id, product_id"
+
+CREAR_TABLA = """
+CREATE TABLE {tabla} (
+    id bigint NOT NULL,
+    price_current numeric(12,2) NOT NULL,
+    price_prev numeric(12,2) NULL,
+    discount numeric(5,2) NULL,
+    free_shipping boolean NOT NULL,
+    currency varchar(10) NOT NULL,
+    recorded_at timestamp with time zone NOT NULL,
+    page_id bigint NOT NULL,
+    product_id bigint NOT NULL
+){particion}
+"""
+
+# Índices y FKs con los mismos nombres que generó Django para la tabla original
+INDICES_Y_FKS = [
+    "CREATE INDEX pricing_page_id_f5a07009 ON pricing (page_id)",
+    "CREATE INDEX pricing_product_id_bbf6883c ON pricing (product_id)",
+    "CREATE INDEX pricing_product_page_rec_idx ON pricing (product_id, page_id, recorded_at DESC)",
+    "CREATE INDEX pricing_recorded_at_brin ON pricing USING brin (recorded_at)",
+    "ALTER TABLE pricing ADD CONSTRAINT pricing_page_id_f5a07009_fk_page_id "
+    "FOREIGN KEY (page_id) REFERENCES page (id) DEFERRABLE INITIALLY DEFERRED",
+    "ALTER TABLE pricing ADD CONSTRAINT pricing_product_id_bbf6883c_fk_product_id "
+    "FOREIGN KEY (product_id) REFERENCES product (id) DEFERRABLE INITIALLY DEFERRED",
+]
+
+CREAR_LATEST_PRICING = [
+    """
+    CREATE MATERIALIZED VIEW latest_pricing AS
+    SELECT DISTINCT ON (product_id, page_id)
+        id, product_id, page_id, price_current, price_prev, discount,
+        free_shipping, currency, recorded_at
+    FROM pricing
+    ORDER BY product_id, page_id, recorded_at DESC, id DESC
+    """,
+    "CREATE UNIQUE INDEX latest_pricing_product_page_uniq ON latest_pricing (product_id, page_id)",
+    "CREATE INDEX latest_pricing_page_idx ON latest_pricing (page_id)",
+]
+
+MESES_ADELANTE = 3
+
+
+def sumar_meses(fecha, meses):
+    total = fecha.year * 12 + fecha.month - 1 + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def particionar(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    ejecutar = schema_editor.execute
+
+    ejecutar("DROP MATERIALIZED VIEW IF EXISTS latest_pricing")
+    ejecutar("ALTER TABLE pricing RENAME TO pricing_old")
+    ejecutar(CREAR_TABLA.format(tabla="pricing", particion=" PARTITION BY RANGE (recorded_at)"))
+    ejecutar("CREATE TABLE pricing_default PARTITION OF pricing DEFAULT")
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT min(recorded_at) FROM pricing_old")
+        minimo = cursor.fetchone()[0]
+    hoy = timezone.now().date().replace(day=1)
+    mes = (minimo.date() if minimo else hoy).replace(day=1)
+    while mes <= sumar_meses(hoy, MESES_ADELANTE):
+        siguiente = sumar_meses(mes, 1)
+        ejecutar(
+            f"CREATE TABLE pricing_y{mes.year}m{mes.month:02d} PARTITION OF pricing "
+            f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{siguiente.isoformat()}')"
+        )
+        mes = siguiente
+
+    ejecutar(f"INSERT INTO pricing ({COLUMNAS}) SELECT {COLUMNAS} FROM pricing_old")
+    ejecutar("DROP TABLE pricing_old")
+
+    ejecutar("CREATE SEQUENCE pricing_id_seq OWNED BY pricing.id")
+    ejecutar("ALTER TABLE pricing ALTER COLUMN id SET DEFAULT nextval('pricing_id_seq')")
+    ejecutar("SELECT setval('pricing_id_seq', COALESCE((SELECT max(id) FROM pricing), 0) + 1, false)")
+    # En una tabla particionada la PK tiene que incluir la clave de partición
+    ejecutar("ALTER TABLE pricing ADD CONSTRAINT pricing_pkey PRIMARY KEY (id, recorded_at)")
+    for sql in INDICES_Y_FKS + CREAR_LATEST_PRICING:
+        ejecutar(sql)
+
+
+def desparticionar(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    ejecutar = schema_editor.execute
+
+    ejecutar("DROP MATERIALIZED VIEW IF EXISTS latest_pricing")
+    ejecutar("ALTER TABLE pricing RENAME TO pricing_particionada")
+    ejecutar(CREAR_TABLA.format(tabla="pricing", particion=""))
+    ejecutar(f"INSERT INTO pricing ({COLUMNAS}) SELECT {COLUMNAS} FROM pricing_particionada")
+    ejecutar("DROP TABLE pricing_particionada CASCADE")
+
+    ejecutar("ALTER TABLE pricing ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY")
+    ejecutar(
+        "SELECT setval(pg_get_serial_sequence('pricing', 'id'), "
+        "COALESCE((SELECT max(id) FROM pricing), 0) + 1, false)"
+    )
+    ejecutar("ALTER TABLE pricing ADD CONSTRAINT pricing_pkey PRIMARY KEY (id)")
+    for sql in INDICES_Y_FKS + CREAR_LATEST_PRICING:
+        ejecutar(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrapers', '0005_pricing_history_latest_view'),
+    ]
+
+    operations = [
+        migrations.RunPython(particionar, desparticionar),
+    ]
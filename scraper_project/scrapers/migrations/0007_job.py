@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrapers', '0006_partition_pricing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('command', models.CharField(max_length=100)),
+                ('args', models.JSONField(blank=True, default=list)),
+                ('store', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'Corriendo'), ('done', 'Terminado'), ('failed', 'Fallido')], default='pending', max_length=20)),
+                ('worker', models.CharField(blank=True, max_length=255, null=True)),
+                ('output', models.TextField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'job',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='job_status_created_idx'), models.Index(fields=['store', 'status'], name='job_store_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrapers', '0008_job_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('worker', models.CharField(max_length=255, unique=True)),
+                ('data', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'process_metrics',
+            },
+        ),
+    ]
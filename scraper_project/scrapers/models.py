@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.postgres.indexes import BrinIndex
 
 class Category(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -36,6 +37,11 @@ class Product(models.Model):
 
     class Meta:
         db_table = 'product'
+        indexes = [
+            models.Index(fields=['model_code'], name='product_model_code_idx'),
+            models.Index(fields=['sku'], name='product_sku_idx'),
+            models.Index(fields=['link'], name='product_link_idx'),
+        ]
 
 class ProductVariant(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='variants')
@@ -60,6 +66,12 @@ class ProductPage(models.Model):
 
     class Meta:
         db_table = 'product_page'
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'page'], name='product_page_product_page_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['page', 'product'], name='product_page_page_product_idx'),
+        ]
 
 class Pricing(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='pricings')
@@ -73,6 +85,28 @@ class Pricing(models.Model):
 
     class Meta:
         db_table = 'pricing'
+        indexes = [
+            models.Index(fields=['product', 'page', '-recorded_at'], name='pricing_product_page_rec_idx'),
+            BrinIndex(fields=['recorded_at'], name='pricing_recorded_at_brin'),
+        ]
+
+class LatestPricing(models.Model):
+    """
+    Vista materializada con el último Pricing de cada (producto, página).
+    Se refresca al final de cada importación con refrescar_ultimos_precios().
+    """
+    product = models.ForeignKey(Product, on_delete=models.DO_NOTHING, related_name='+')
+    page = models.ForeignKey(Page, on_delete=models.DO_NOTHING, related_name='+')
+    price_current = models.DecimalField(max_digits=12, decimal_places=2)
+    price_prev = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    discount = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    free_shipping = models.BooleanField(default=False)
+    currency = models.CharField(max_length=10)
+    recorded_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'latest_pricing'
 
 class ProductQuota(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='quotas')
@@ -84,9 +118,12 @@ class ProductQuota(models.Model):
 
     class Meta:
         db_table = 'product_quota'
+        indexes = [
+            models.Index(fields=['product', 'page'], name='product_quota_product_page_idx'),
+        ]
 
 class Size(models.Model):
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, unique=True)
 
     class Meta:
         db_table = 'size'
@@ -107,6 +144,59 @@ class CodesDexter(models.Model):
 
     class Meta:
         db_table = 'dexter_code'
+        indexes = [
+            models.Index(fields=['dexter_code'], name='dexter_code_dexter_code_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.brand} - {self.provider_code} - {self.dexter_code}"
+
+class Job(models.Model):
+    PENDIENTE = 'pending'
+    CORRIENDO = 'running'
+    TERMINADO = 'done'
+    FALLIDO = 'failed'
+    ESTADOS = [
+        (PENDIENTE, 'Pendiente'),
+        (CORRIENDO, 'Corriendo'),
+        (TERMINADO, 'Terminado'),
+        (FALLIDO, 'Fallido'),
+    ]
+
+    command = models.CharField(max_length=100)
+    args = models.JSONField(default=list, blank=True)
+    store = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)
+    worker = models.CharField(max_length=255, null=True, blank=True)
+    output = models.TextField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    progress = models.JSONField(null=True, blank=True)
+    progress_at = models.DateTimeField(null=True, blank=True)
+    # Lo refresca el proceso que corre el job mientras está vivo (scrapers.jobs.latido)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'job'
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+            models.Index(fields=['store', 'status'], name='job_store_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.command} ({self.store}) - {self.status}"
+
+
+class ProcessMetrics(models.Model):
+    """Último snapshot del registro de métricas (scrapers.metricas) de cada proceso."""
+    worker = models.CharField(max_length=255, unique=True)
+    data = models.JSONField(default=dict)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'process_metrics'
 
     def __str__(self):
-        return f"{self.brand} - {self.provider_code} - {self.dexter_code}"
\ No newline at end of file
+        return f"{self.worker} - {self.updated_at}"
@@ -0,0 +1,132 @@
+import re
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+# Textos distintos que se recuerdan: en una corrida los mismos precios se repiten mucho
+TAMANO_CACHE_PARSEO = 8192
+
+# "$ 1.234,56", "$\xa099.999,00", "$189.999": el número que sigue al signo pesos
+PATRON_PRECIO = re.compile(r"\$\s*(\d[\d.,]*)")
+PATRON_NUMERO = re.compile(r"\d[\d.,]*")
+# "20% OFF", "-30%", "30 %"
+PATRON_PORCENTAJE = re.compile(r"(\d[\d.,]*)\s*%")
+# "12999.00" (atributo content, JSON): punto decimal, no de miles
+PATRON_PUNTO_DECIMAL = re.compile(r"\d+\.\d{1,2}")
+
+VERDADEROS = frozenset({"true", "1", "sí", "si", "yes", "gratis", "envío gratis", "envio gratis"})
+
+CENTESIMOS = Decimal("0.01")
+
+
+def normalizar_numero(numero: str) -> Decimal | None:
+    """'1.234,56' → 1234.56, '189.999' → 189999, '12999.00' → 12999.00."""
+    numero = numero.rstrip(".,")
+    if not PATRON_PUNTO_DECIMAL.fullmatch(numero):
+        # Formato argentino: punto de miles, coma decimal
+        numero = numero.replace(".", "")
+        if numero.count(",") == 1:
+            numero = numero.replace(",", ".")
+    try:
+        return Decimal(numero)
+    except InvalidOperation:
+        return None
+
+
+@lru_cache(maxsize=TAMANO_CACHE_PARSEO)
+def _precio_texto(texto: str) -> Decimal | None:
+    # Con "$" se toma ese número ("6 cuotas de $ 2.000" → 2000); si no, el primero
+    match = PATRON_PRECIO.search(texto)
+    if match:
+        return normalizar_numero(match.group(1))
+    match = PATRON_NUMERO.search(texto)
+    return normalizar_numero(match.group()) if match else None
+
+
+@lru_cache(maxsize=TAMANO_CACHE_PARSEO)
+def _porcentaje_texto(texto: str) -> Decimal | None:
+    # El signo no se captura: "-30%" → 30
+    match = PATRON_PORCENTAJE.search(texto)
+    if match:
+        return normalizar_numero(match.group(1))
+    match = PATRON_NUMERO.search(texto)
+    return normalizar_numero(match.group()) if match else None
+
+
+def _numero(valor):
+    """Números ya tipados (JSON nuevo, Excel) sin pasar por texto; bool no cuenta como número."""
+    if isinstance(valor, Decimal):
+        return valor
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool) and valor == valor:
+        return Decimal(str(valor))
+    return None
+
+
+def parsear_precio(valor) -> Decimal | None:
+    """'$ 12.999', '$\xa099.999,00', 12999 → Decimal; 'N/A', 'Sin precio anterior', None → None."""
+    if valor is None or isinstance(valor, bool):
+        return None
+    if not isinstance(valor, str):
+        return _numero(valor)
+    return _precio_texto(valor)
+
+
+def parsear_porcentaje(valor) -> Decimal | None:
+    """'20% OFF', '-30%', 30 → Decimal positivo; 'Sin descuento' → None."""
+    if valor is None or isinstance(valor, bool):
+        return None
+    if not isinstance(valor, str):
+        numero = _numero(valor)
+        return abs(numero) if numero is not None else None
+    return _porcentaje_texto(valor)
+
+
+def parsear_bool(valor) -> bool:
+    """'Si', 'Envío gratis', True → True; 'No', 'Sin envío gratis', 'N/A', None → False."""
+    if isinstance(valor, bool):
+        return valor
+    if valor is None:
+        return False
+    return str(valor).strip().lower() in VERDADEROS
+
+
+def calcular_descuento(precio, precio_anterior) -> Decimal | None:
+    if precio and precio_anterior and precio_anterior > precio:
+        return ((precio_anterior - precio) / precio_anterior * 100).quantize(CENTESIMOS)
+    return None
+
+
+def parsear_precios(valores):
+    """
+    Variante para columnas enteras. Con una Series de pandas usa las operaciones
+    vectorizadas de .str y devuelve floats (NaN lo que no es precio); con cualquier
+    otro iterable devuelve una lista de Decimal parseando cada texto distinto una vez.
+    """
+    if hasattr(valores, "str") and hasattr(valores, "where"):
+        return _parsear_precios_series(valores)
+    vistos = {}
+    resultado = []
+    for valor in valores:
+        if valor.__class__ is str:
+            if valor not in vistos:
+                vistos[valor] = _precio_texto(valor)
+            resultado.append(vistos[valor])
+        else:
+            resultado.append(parsear_precio(valor))
+    return resultado
+
+
+def _parsear_precios_series(serie):
+    import pandas as pd
+
+    tipos = serie.map(type)
+    numericos = pd.to_numeric(serie.where(tipos.isin((int, float, Decimal))), errors="coerce")
+    textos = serie.where(tipos == str).astype("string")
+    extraido = textos.str.extract(PATRON_PRECIO, expand=False)
+    extraido = extraido.fillna(textos.str.extract(f"({PATRON_NUMERO.pattern})", expand=False))
+    extraido = extraido.str.rstrip(".,")
+    punto_decimal = extraido.str.fullmatch(PATRON_PUNTO_DECIMAL.pattern).fillna(False).astype(bool)
+    argentino = extraido.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    # Más de una coma no es un número argentino válido
+    argentino = argentino.where(extraido.str.count(",").fillna(0) <= 1)
+    normalizado = argentino.where(~punto_decimal, extraido)
+    return numericos.fillna(pd.to_numeric(normalizado, errors="coerce")).astype("float64")
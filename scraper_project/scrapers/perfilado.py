@@ -0,0 +1,154 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from django.core.management.base import BaseCommand, OutputWrapper
+
+TOP_FUNCIONES = 25
+INTERVALO_MUESTREO = 0.005
+
+
+class Muestreador:
+    """
+    Profiler por muestreo para los comandos con hilos (cProfile solo ve el hilo
+    principal). Cada INTERVALO_MUESTREO segundos toma la pila de todos los hilos con
+    sys._current_frames() y cuenta pilas colapsadas ("hilo;f1;f2;f3 N"), el formato
+    que leen flamegraph.pl y speedscope.
+    """
+    def __init__(self, intervalo=INTERVALO_MUESTREO):
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self.muestras = 0
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._loop, name="Muestreador", daemon=True)
+
+    def start(self):
+        self._hilo.start()
+
+    def stop(self):
+        self._detener.set()
+        self._hilo.join()
+
+    def _loop(self):
+        propio = threading.get_ident()
+        while not self._detener.wait(self.intervalo):
+            nombres = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                if tid == propio:
+                    continue
+                pila = []
+                while frame is not None:
+                    code = frame.f_code
+                    pila.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                pila.append(nombres.get(tid, str(tid)))
+                self.pilas[";".join(reversed(pila))] += 1
+            self.muestras += 1
+
+    def escribir(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for pila, cantidad in self.pilas.most_common():
+                f.write(f"{pila} {cantidad}\n")
+
+    def top(self, n=TOP_FUNCIONES):
+        """Funciones por muestras acumuladas (la función o algo que llamó estaba en la pila)."""
+        acumuladas = Counter()
+        propias = Counter()
+        for pila, cantidad in self.pilas.items():
+            funciones = pila.split(";")[1:]
+            for funcion in set(funciones):
+                acumuladas[funcion] += cantidad
+            if funciones:
+                propias[funciones[-1]] += cantidad
+        total = sum(self.pilas.values()) or 1
+        lineas = [f"{'acum %':>7} {'propio %':>8}  función"]
+        for funcion, cantidad in acumuladas.most_common(n):
+            lineas.append(f"{cantidad / total * 100:7.1f} {propias[funcion] / total * 100:8.1f}  {funcion}")
+        return "\n".join(lineas)
+
+
+@contextmanager
+def perfilar(store, nombre, modo, stdout):
+    """
+    Corre el bloque bajo cProfile (modo "cprofile") o el Muestreador ("sampling"),
+    guarda el resultado en outputs/<store>/ e imprime las funciones más costosas.
+    """
+    output_dir = f"outputs/{store}"
+    os.makedirs(output_dir, exist_ok=True)
+    sello = datetime.now().strftime("%Y%m%d_%H%M%S")
+    inicio = time.perf_counter()
+
+    if modo == "sampling":
+        perfil = Muestreador()
+        path = os.path.join(output_dir, f"profile_{nombre}_{sello}.folded")
+        perfil.start()
+    else:
+        perfil = cProfile.Profile()
+        path = os.path.join(output_dir, f"profile_{nombre}_{sello}.prof")
+        perfil.enable()
+
+    try:
+        yield
+    finally:
+        duracion = time.perf_counter() - inicio
+        if modo == "sampling":
+            perfil.stop()
+            perfil.escribir(path)
+            resumen = perfil.top()
+            detalle = f"{perfil.muestras} muestras"
+        else:
+            perfil.disable()
+            perfil.dump_stats(path)
+            buffer = io.StringIO()
+            pstats.Stats(perfil, stream=buffer).sort_stats("cumulative").print_stats(TOP_FUNCIONES)
+            resumen = buffer.getvalue()
+            detalle = "cProfile"
+
+        stdout.write(f"🔬 Perfil ({detalle}, {duracion:.1f}s) guardado en {path}")
+        stdout.write(resumen)
+
+
+class ComandoPerfilable(BaseCommand):
+    """
+    BaseCommand con la opción --profile. Cada comando define `store` (carpeta de
+    outputs/ donde se guarda el perfil) y, si corre con hilos, `perfil_por_muestreo = True`.
+    """
+    store = None
+    perfil_por_muestreo = False
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help=f"Perfila la corrida y guarda el resultado en outputs/{self.store}/"
+        )
+        parser.add_argument(
+            "--profile-mode",
+            choices=["cprofile", "sampling"],
+            default="sampling" if self.perfil_por_muestreo else "cprofile",
+            help="cprofile (.prof para pstats/snakeviz) o sampling (.folded para flamegraph, ve todos los hilos)"
+        )
+        self._subcomando = subcommand
+        return parser
+
+    def execute(self, *args, **options):
+        if not options.get("profile"):
+            return super().execute(*args, **options)
+        nombre = getattr(self, "_subcomando", None) or self.__module__.rsplit(".", 1)[-1]
+        stdout = OutputWrapper(options["stdout"]) if options.get("stdout") else self.stdout
+        handle = self.handle
+
+        # Se perfila solo handle(), no los system checks que corre execute()
+        def handle_perfilado(*a, **kw):
+            with perfilar(self.store, nombre, options["profile_mode"], stdout):
+                return handle(*a, **kw)
+
+        self.handle = handle_perfilado
+        return super().execute(*args, **options)
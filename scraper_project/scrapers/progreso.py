@@ -0,0 +1,66 @@
+import os
+import resource
+import threading
+import time
+from django.utils import timezone
+from scrapers.models import Job
+
+
+def rss_actual_kb():
+    """RSS actual del proceso en KB (ru_maxrss es el pico, no el valor actual)."""
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class ProgressTracker:
+    """
+    Progreso estructurado de una corrida, publicado en Job.progress para que la
+    API (/api/runs/<id>/progress/) lo pueda leer desde otro proceso.
+
+    Uso:
+      tracker = ProgressTracker(total, job)
+      tracker.error()                      # por cada ítem fallido
+      tracker.publicar(done=len(resultados), active_workers=..., idle_drivers=...)
+    """
+    def __init__(self, total, job=None):
+        self.total = total
+        self.job = job
+        self.inicio = time.monotonic()
+        self.errores = 0
+        self.lock = threading.Lock()
+
+    def error(self, n=1):
+        with self.lock:
+            self.errores += n
+
+    def snapshot(self, done, **extra):
+        transcurrido = time.monotonic() - self.inicio
+        por_minuto = done / transcurrido * 60 if transcurrido > 0 else 0.0
+        restantes = max(self.total - done, 0)
+        eta = restantes / por_minuto * 60 if por_minuto > 0 else None
+        with self.lock:
+            errores = self.errores
+        return {
+            "items_done": done,
+            "items_total": self.total,
+            "percent": round(done / self.total * 100, 2) if self.total else 100.0,
+            "items_per_min": round(por_minuto, 2),
+            "errors": errores,
+            "elapsed_seconds": round(transcurrido, 1),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "rss_kb": rss_actual_kb(),
+            "pid": os.getpid(),
+            **extra,
+        }
+
+    def publicar(self, done, **extra):
+        datos = self.snapshot(done, **extra)
+        if self.job is not None:
+            Job.objects.filter(pk=self.job.pk).update(progress=datos, progress_at=timezone.now())
+        return datos
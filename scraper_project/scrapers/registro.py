@@ -0,0 +1,161 @@
+from dataclasses import dataclass, fields
+from decimal import Decimal
+from scrapers.parseo import calcular_descuento, parsear_bool, parsear_porcentaje, parsear_precio
+
+# Textos que los scrapers (y los JSON viejos) usan para "no hay dato"
+VACIOS = frozenset({
+    "", "n/a", "na", "none", "null", "-",
+    "sin link", "sin tags", "sin precio", "sin precio anterior", "sin descuento", "sin cuotas",
+})
+
+# Nombres de campo de otros scrapers / versiones → campo del registro
+ALIAS = {
+    "model_id": "modelo_id",
+    "disponibles": "disponible",
+    "no_disponibles": "no_disponible",
+    "available_sizes": "disponible",
+    "unavailable_sizes": "no_disponible",
+}
+
+
+def texto_o_none(valor):
+    if valor is None:
+        return None
+    texto = str(valor).strip()
+    return None if texto.lower() in VACIOS else texto
+
+
+def a_tupla(valor):
+    """Listas, dicts ({talle: ...}) o 'a, b' → tupla de textos; 'N/A' o {} → ()."""
+    if isinstance(valor, dict):
+        valor = valor.keys()
+    elif isinstance(valor, str):
+        valor = valor.split(",") if texto_o_none(valor) else ()
+    elif valor is None:
+        return ()
+    return tuple(t for t in (texto_o_none(v) for v in valor) if t)
+
+
+def _con_alias(datos):
+    if not any(alias in datos for alias in ALIAS):
+        return datos
+    datos = dict(datos)
+    for alias, campo in ALIAS.items():
+        if alias in datos:
+            datos.setdefault(campo, datos.pop(alias))
+    return datos
+
+
+@dataclass(slots=True, frozen=True)
+class Cuota:
+    banco: str
+    num_cuotas: int
+    precio_por_cuota: Decimal
+    sin_interes: bool
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """None si le falta la cantidad de cuotas o el monto (no se puede guardar)."""
+        try:
+            num_cuotas = int(datos.get("num_cuotas") or 0)
+        except (TypeError, ValueError):
+            return None
+        precio = parsear_precio(datos.get("precio_por_cuota"))
+        if not num_cuotas or not precio:
+            return None
+        return cls(texto_o_none(datos.get("banco")) or "", num_cuotas, precio, parsear_bool(datos.get("sin_interes")))
+
+
+@dataclass(slots=True)
+class Producto:
+    """
+    Producto tal como lo emite parsear_producto y lo leen los import_productos_*:
+    precios y descuento en Decimal, envío en bool, talles/tags en tuplas y None
+    (no "N/A") para lo que falta. Con __slots__ ocupa bastante menos que el dict
+    de 21 claves en las corridas de 10k+ productos.
+    """
+    nombre: str | None = None
+    marca: str | None = None
+    precio: Decimal | None = None
+    precio_anterior: Decimal | None = None
+    descuento: Decimal | None = None
+    cuotas: str | None = None
+    envio_gratis: bool = False
+    imagen_url: str | None = None
+    link: str | None = None
+    id_producto: str | None = None
+    sku: str | None = None
+    categoria: str | None = None
+    clase_de_producto: str | None = None
+    tags: tuple = ()
+    talles: tuple = ()
+    nombre_pagina: str | None = None
+    tipo_de_producto: str | None = None
+    variante: str | None = None
+    disponible: tuple = ()
+    no_disponible: tuple = ()
+    modelo_id: str | None = None
+    financiacion: tuple = ()
+
+    @classmethod
+    def desde_dict(cls, datos: dict) -> "Producto":
+        """
+        Arma el registro desde lo que devuelve un parser o desde un JSON exportado,
+        tanto del formato nuevo (tipado) como del viejo ("N/A", "$ 12.999", "Si"/"No").
+        """
+        if isinstance(datos, cls):
+            return datos
+        datos = _con_alias(datos)
+        return cls(
+            nombre=texto_o_none(datos.get("nombre")),
+            marca=texto_o_none(datos.get("marca")),
+            precio=parsear_precio(datos.get("precio")),
+            precio_anterior=parsear_precio(datos.get("precio_anterior")),
+            descuento=parsear_porcentaje(datos.get("descuento")),
+            cuotas=texto_o_none(datos.get("cuotas")),
+            envio_gratis=parsear_bool(datos.get("envio_gratis")),
+            imagen_url=texto_o_none(datos.get("imagen_url")),
+            link=texto_o_none(datos.get("link")),
+            id_producto=texto_o_none(datos.get("id_producto")),
+            sku=texto_o_none(datos.get("sku")),
+            categoria=texto_o_none(datos.get("categoria")),
+            clase_de_producto=texto_o_none(datos.get("clase_de_producto")),
+            tags=a_tupla(datos.get("tags")),
+            talles=a_tupla(datos.get("talles")),
+            nombre_pagina=texto_o_none(datos.get("nombre_pagina")),
+            tipo_de_producto=texto_o_none(datos.get("tipo_de_producto")),
+            variante=texto_o_none(datos.get("variante")),
+            disponible=a_tupla(datos.get("disponible")),
+            no_disponible=a_tupla(datos.get("no_disponible")),
+            modelo_id=texto_o_none(datos.get("modelo_id")),
+            financiacion=tuple(
+                c for c in (Cuota.desde_dict(d) for d in datos.get("financiacion") or () if isinstance(d, dict)) if c
+            ),
+        )
+
+    def descuento_calculado(self):
+        """El descuento publicado o, si no hay, el que sale de precio y precio anterior."""
+        if self.descuento is not None:
+            return self.descuento
+        return calcular_descuento(self.precio, self.precio_anterior)
+
+    def a_json(self) -> dict:
+        return a_json(self)
+
+
+def a_json(valor):
+    """Valor del registro → JSON: Decimal como número, tuplas como listas, None como null."""
+    if isinstance(valor, Decimal):
+        return int(valor) if valor == valor.to_integral_value() else float(valor)
+    if isinstance(valor, tuple):
+        return [a_json(v) for v in valor]
+    if isinstance(valor, (Producto, Cuota)):
+        return {f.name: a_json(getattr(valor, f.name)) for f in fields(valor)}
+    return valor
+
+
+def serializar(valor):
+    """Para json.dump(..., default=serializar)."""
+    if isinstance(valor, (Producto, Cuota, Decimal)):
+        return a_json(valor)
+    raise TypeError(f"{type(valor).__name__} no es serializable a JSON")
@@ -0,0 +1,200 @@
+import heapq
+import itertools
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from django.conf import settings
+from scrapers.metricas import FALLOS_ITEM
+from scrapers.ritmo import senal_bloqueo
+
+# Clases de falla de un ítem
+DRIVER_CAIDO = "driver_caido"      # la sesión del WebDriver murió: hay que recrearlo
+SIN_DRIVER = "sin_driver"          # no había driver libre ni se pudo crear uno
+TIMEOUT = "timeout"
+NO_ENCONTRADO = "no_encontrado"    # 404: reintentar no sirve
+BLOQUEADO = "bloqueado"            # CAPTCHA / acceso denegado / 429
+ERROR = "error"
+
+# Mensajes de Selenium/urllib3 cuando el navegador (o el endpoint remoto) ya no responde
+PATRON_DRIVER_CAIDO = re.compile(
+    r"invalid session id|no such window|chrome not reachable|disconnected|session deleted|"
+    r"target window already closed|connection refused|max retries exceeded|remote end closed|"
+    r"connection reset|broken pipe|session not created",
+    re.IGNORECASE,
+)
+PATRON_NO_ENCONTRADO = re.compile(
+    r"<title[^>]*>[^<]*(?:404|no encontrad|not found)[^<]*</title>", re.IGNORECASE
+)
+
+# Multiplica la espera base y el tope del backoff: a un bloqueo hay que darle más aire
+FACTOR_CLASE = {BLOQUEADO: 4, SIN_DRIVER: 2}
+
+
+class FalloItem(Exception):
+    """
+    Falla ya clasificada (p. ej. una página de 404 o de CAPTCHA que cargó "bien").
+    `espera`: mínimo antes de reintentar, p. ej. lo que falta para que el circuito
+    del endpoint remoto vuelva a sondear.
+    """
+
+    def __init__(self, clase, detalle="", espera=0.0):
+        super().__init__(f"{clase}: {detalle}" if detalle else clase)
+        self.clase = clase
+        self.detalle = detalle
+        self.espera = espera
+
+
+def clasificar_fallo(error):
+    if isinstance(error, FalloItem):
+        return error.clase
+    nombre = type(error).__name__
+    mensaje = str(error)
+    if "Timeout" in nombre or "timed out" in mensaje.lower():
+        return TIMEOUT
+    if PATRON_DRIVER_CAIDO.search(mensaje) or nombre in ("InvalidSessionIdException", "NoSuchWindowException"):
+        return DRIVER_CAIDO
+    return ERROR
+
+
+def verificar_pagina(html):
+    """Levanta FalloItem si la página cargada es un 404 o una página de bloqueo."""
+    bloqueo = senal_bloqueo(html)
+    if bloqueo:
+        raise FalloItem(BLOQUEADO, bloqueo)
+    if html and PATRON_NO_ENCONTRADO.search(html[:20000]):
+        raise FalloItem(NO_ENCONTRADO)
+
+
+class PoliticaReintentos:
+    """
+    Cuántas veces se reintenta un ítem y cuánto se espera: backoff exponencial con
+    jitter completo (espera al azar entre 0 y base·2^intento, con tope), para que los
+    hilos que fallaron juntos no vuelvan a pegarle al sitio todos a la vez.
+    """
+
+    def __init__(self, max_intentos=None, base=None, tope=None, no_reintentables=(NO_ENCONTRADO,)):
+        self.max_intentos = max_intentos or settings.REINTENTOS_MAX
+        self.base = base or settings.REINTENTOS_BASE_SEGUNDOS
+        self.tope = tope or settings.REINTENTOS_TOPE_SEGUNDOS
+        self.no_reintentables = frozenset(no_reintentables)
+
+    def reintentar(self, intento, clase):
+        """intento: cuántas veces ya se probó el ítem (1 = primera vez)."""
+        return clase not in self.no_reintentables and intento < self.max_intentos
+
+    def espera(self, intento, clase):
+        factor = FACTOR_CLASE.get(clase, 1)
+        return random.uniform(0, min(self.tope * factor, self.base * factor * 2 ** (intento - 1)))
+
+
+class Tarea:
+    __slots__ = ("idx", "item", "intento", "clases", "en_curso")
+
+    def __init__(self, idx, item):
+        self.idx = idx
+        self.item = item
+        self.intento = 0
+        # Historial de fallas del ítem (para el log y el error final)
+        self.clases = []
+        # Entre obtener() y completar()/fallar(): mientras tanto cuenta como pendiente
+        self.en_curso = False
+
+
+class ColaReintentos:
+    """
+    Cola de trabajo con prioridad para los ítems nuevos: los reintentos esperan su
+    backoff en un heap aparte y se toman recién cuando se cumplió la espera y no
+    quedan ítems nuevos. obtener() devuelve None cuando no queda nada pendiente,
+    contando los ítems en proceso, que todavía pueden volver como reintento.
+
+    Cada tarea obtenida tiene que cerrarse con completar() o fallar() (los dos son
+    no-op si ya se cerró): una que quede abierta deja a los demás hilos esperando.
+    """
+
+    def __init__(self, items, politica=None, store=""):
+        self.politica = politica or PoliticaReintentos()
+        self.store = store
+        self.nuevos = deque(Tarea(idx, item) for idx, item in enumerate(items, start=1))
+        self.reintentos = []
+        self.orden = itertools.count()
+        self.pendientes = len(self.nuevos)
+        self.cond = threading.Condition()
+        self.intentos_por_clase = Counter()
+        self.fallos_finales = Counter()
+        self.recuperados = 0
+
+    def obtener(self):
+        with self.cond:
+            while True:
+                if self.nuevos:
+                    tarea = self.nuevos.popleft()
+                    break
+                ahora = time.monotonic()
+                if self.reintentos and self.reintentos[0][0] <= ahora:
+                    tarea = heapq.heappop(self.reintentos)[2]
+                    break
+                if not self.pendientes:
+                    return None
+                self.cond.wait(self.reintentos[0][0] - ahora if self.reintentos else None)
+            tarea.intento += 1
+            tarea.en_curso = True
+        return tarea
+
+    def completar(self, tarea):
+        with self.cond:
+            if not tarea.en_curso:
+                return
+            tarea.en_curso = False
+            if tarea.clases:
+                self.recuperados += 1
+            self._cerrar()
+
+    def fallar(self, tarea, clase, minimo=0.0):
+        """Reagenda la tarea con backoff (no antes de `minimo` s) o la da por perdida. Devuelve la espera o None."""
+        with self.cond:
+            if not tarea.en_curso:
+                return None
+            tarea.en_curso = False
+            tarea.clases.append(clase)
+            self.intentos_por_clase[clase] += 1
+            if self.politica.reintentar(tarea.intento, clase):
+                espera = minimo + self.politica.espera(tarea.intento, clase)
+                heapq.heappush(self.reintentos, (time.monotonic() + espera, next(self.orden), tarea))
+                self.cond.notify_all()
+                FALLOS_ITEM.inc(store=self.store, kind=clase, outcome="retry")
+                return espera
+            self.fallos_finales[clase] += 1
+            self._cerrar()
+        FALLOS_ITEM.inc(store=self.store, kind=clase, outcome="final")
+        return None
+
+    def _cerrar(self):
+        self.pendientes -= 1
+        if not self.pendientes:
+            self.cond.notify_all()
+
+    @property
+    def reintentos_en_espera(self):
+        with self.cond:
+            return len(self.reintentos)
+
+    def resumen(self):
+        """Texto con los reintentos y las fallas finales por clase, para el log y Slack."""
+        with self.cond:
+            intentos = dict(self.intentos_por_clase)
+            finales = dict(self.fallos_finales)
+            recuperados = self.recuperados
+        if not intentos:
+            return "Sin fallas"
+        lineas = [
+            "🔁 Fallas por clase: " + ", ".join(f"{c} {n}" for c, n in sorted(intentos.items(), key=lambda x: -x[1])),
+            f"✅ Recuperados con reintento: {recuperados}",
+        ]
+        if finales:
+            lineas.append(
+                f"❌ Fallas finales ({sum(finales.values())}): "
+                + ", ".join(f"{c} {n}" for c, n in sorted(finales.items(), key=lambda x: -x[1]))
+            )
+        return "\n".join(lineas)
@@ -0,0 +1,111 @@
+import resource
+import time
+from contextlib import contextmanager
+
+FASES = ("navigate", "wait", "scroll", "parse", "export")
+# Cuántas URLs lentas se guardan en el reporte
+TOP_URLS_LENTAS = 10
+
+# Bytes transferidos por la página y sus recursos según la Performance API del navegador
+JS_BYTES_DESCARGADOS = """
+return performance.getEntriesByType('navigation')
+    .concat(performance.getEntriesByType('resource'))
+    .reduce((total, e) => total + (e.transferSize || 0), 0);
+"""
+
+
+def pico_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class ReporteRendimiento:
+    """
+    Acumula tiempos por sección y fase (navigate / wait / scroll / parse / export),
+    páginas cargadas, bytes descargados y URLs más lentas de una corrida de BaseScraper.
+    """
+    def __init__(self, store, session_id):
+        self.store = store
+        self.session_id = session_id
+        self.inicio = time.perf_counter()
+        self.secciones = {}
+        self.urls = []
+
+    def _seccion(self, seccion):
+        if seccion not in self.secciones:
+            self.secciones[seccion] = {
+                **dict.fromkeys(FASES, 0.0),
+                "pages": 0,
+                "bytes": 0,
+                "items": 0,
+            }
+        return self.secciones[seccion]
+
+    def sumar(self, seccion, fase, segundos):
+        self._seccion(seccion)[fase] += segundos
+
+    @contextmanager
+    def fase(self, seccion, fase):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sumar(seccion, fase, time.perf_counter() - inicio)
+
+    def pagina(self, seccion, url, segundos, bytes_descargados):
+        datos = self._seccion(seccion)
+        datos["navigate"] += segundos
+        datos["pages"] += 1
+        datos["bytes"] += bytes_descargados
+        self.urls.append((segundos, url, seccion))
+
+    def items(self, seccion, cantidad):
+        self._seccion(seccion)["items"] += cantidad
+
+    def generar(self, estado="ok"):
+        duracion = time.perf_counter() - self.inicio
+        total_items = sum(s["items"] for s in self.secciones.values())
+        secciones = {
+            nombre: {
+                **{f"{fase}_seconds": round(datos[fase], 3) for fase in FASES},
+                "pages": datos["pages"],
+                "bytes": datos["bytes"],
+                "items": datos["items"],
+            }
+            for nombre, datos in self.secciones.items()
+        }
+        return {
+            "store": self.store,
+            "session_id": self.session_id,
+            "status": estado,
+            "duration_seconds": round(duracion, 3),
+            "pages": sum(s["pages"] for s in self.secciones.values()),
+            "bytes": sum(s["bytes"] for s in self.secciones.values()),
+            "items": total_items,
+            "items_per_second": round(total_items / duracion, 3) if duracion > 0 else 0.0,
+            "peak_rss_kb": pico_rss_kb(),
+            "totals": {
+                f"{fase}_seconds": round(sum(s[fase] for s in self.secciones.values()), 3)
+                for fase in FASES
+            },
+            "sections": secciones,
+            "slowest_urls": [
+                {"url": url, "section": seccion, "seconds": round(segundos, 3)}
+                for segundos, url, seccion in sorted(self.urls, reverse=True)[:TOP_URLS_LENTAS]
+            ],
+        }
+
+
+def resumir(reporte):
+    """Texto corto del reporte para la alerta final de Slack."""
+    totales = reporte["totals"]
+    fases = " | ".join(f"{fase} {totales[f'{fase}_seconds']:.0f}s" for fase in FASES)
+    lineas = [
+        f"⏱️ {reporte['duration_seconds']:.0f}s · {reporte['pages']} páginas · "
+        f"{reporte['bytes'] / 1_048_576:.1f} MB · {reporte['items']} items "
+        f"({reporte['items_per_second']:.2f}/s) · pico RSS {reporte['peak_rss_kb'] / 1024:.0f} MB",
+        f"🧩 {fases}",
+    ]
+    if reporte["slowest_urls"]:
+        mas_lenta = reporte["slowest_urls"][0]
+        lineas.append(f"🐢 URL más lenta: {mas_lenta['url']} ({mas_lenta['seconds']:.1f}s)")
+    return "\n".join(lineas)
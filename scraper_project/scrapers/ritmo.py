@@ -0,0 +1,295 @@
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from django.conf import settings
+from scrapers.metricas import LIMITE_CONCURRENCIA, RETROCESOS, ESPERA_RITMO
+
+OK = "ok"
+# El sitio pide que bajemos el ritmo: timeouts, CAPTCHA o bloqueo
+SOBRECARGA = "sobrecarga"
+# Falló pero no por carga (404, driver caído, error de parseo): no mueve la concurrencia
+ERROR = "error"
+
+# Marcas de página de bloqueo / desafío; se buscan en el <title> y en páginas cortas
+PATRON_BLOQUEO = re.compile(
+    r"captcha|are you a robot|access denied|acceso denegado|too many requests|"
+    r"just a moment|attention required|service unavailable|bad gateway|gateway time-?out",
+    re.IGNORECASE,
+)
+PATRON_TITULO = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+# Una página de producto real pesa bastante más; una de error o desafío, poco
+LARGO_PAGINA_CORTA = 5000
+# Ante una sobrecarga explícita la concurrencia (y la tasa de la cubeta) se divide por 2;
+# si solo subió la latencia, se achica menos
+FACTOR_RETROCESO = 0.5
+FACTOR_RETROCESO_LATENCIA = 0.75
+# Cuánto recupera la tasa de la cubeta con cada aumento de concurrencia
+FRACCION_RECUPERO = 0.1
+# Cuánto puede subir por pedido la latencia de referencia del AIMD (0,5%)
+DERIVA_BASE = 0.005
+
+
+def senal_bloqueo(html):
+    """Texto de la marca de bloqueo/CAPTCHA que aparece en la página, o None."""
+    if not html:
+        return None
+    titulo = PATRON_TITULO.search(html[:LARGO_PAGINA_CORTA * 4])
+    if titulo:
+        match = PATRON_BLOQUEO.search(titulo.group(1))
+        if match:
+            return match.group().lower()
+    if len(html) < LARGO_PAGINA_CORTA:
+        match = PATRON_BLOQUEO.search(html)
+        if match:
+            return match.group().lower()
+    return None
+
+
+def clasificar_excepcion(error):
+    """Timeouts (del driver o de la página) cuentan como sobrecarga; el resto como error."""
+    nombre = type(error).__name__.lower()
+    if "timeout" in nombre or "timed out" in str(error).lower():
+        return SOBRECARGA
+    return ERROR
+
+
+class Cubeta:
+    """
+    Token bucket: `tasa` pedidos por segundo sostenidos con ráfagas de hasta `rafaga`.
+    adquirir() bloquea hasta que haya un token y devuelve cuánto esperó. `reloj` y
+    `dormir` se pueden cambiar para probarla sin esperas reales.
+    """
+
+    def __init__(self, tasa, rafaga, reloj=time.monotonic, dormir=time.sleep):
+        self.tasa_maxima = tasa
+        self.tasa = tasa
+        self.rafaga = max(1, rafaga)
+        self.reloj = reloj
+        self.dormir = dormir
+        self.tokens = float(self.rafaga)
+        self.ultimo = reloj()
+        self.lock = threading.Lock()
+
+    def _recargar(self, ahora):
+        self.tokens = min(self.rafaga, self.tokens + (ahora - self.ultimo) * self.tasa)
+        self.ultimo = ahora
+
+    def adquirir(self):
+        if self.tasa_maxima <= 0:
+            return 0.0
+        inicio = self.reloj()
+        while True:
+            with self.lock:
+                ahora = self.reloj()
+                self._recargar(ahora)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return ahora - inicio
+                espera = (1 - self.tokens) / self.tasa
+            self.dormir(espera)
+
+    def fijar_tasa(self, tasa):
+        with self.lock:
+            self._recargar(self.reloj())
+            self.tasa_maxima = self.tasa = tasa
+
+    def frenar(self):
+        with self.lock:
+            self._recargar(self.reloj())
+            self.tasa = max(self.tasa_maxima * FRACCION_RECUPERO, self.tasa * FACTOR_RETROCESO)
+
+    def acelerar(self):
+        with self.lock:
+            self._recargar(self.reloj())
+            self.tasa = min(self.tasa_maxima, self.tasa + self.tasa_maxima * FRACCION_RECUPERO)
+
+
+class ControlAIMD:
+    """
+    Concurrencia adaptativa (aumento aditivo, disminución multiplicativa).
+
+    Cada vez que se completan `limite` pedidos seguidos sanos (sin sobrecarga y con
+    latencia promedio de hasta `tolerancia` veces la mejor vista) el límite sube en 1;
+    ante una sobrecarga se divide por 2 y ante una latencia fuera de tolerancia se
+    achica a 3/4, una sola vez por ventana para que los pedidos que ya estaban en
+    vuelo cuando empezó el problema no lo hundan a 1.
+    """
+
+    def __init__(self, minimo=1, inicial=2, maximo=8, tolerancia=2.0, suavizado=0.3):
+        self.minimo = max(1, minimo)
+        self.maximo = max(self.minimo, maximo)
+        self.limite = min(max(inicial, self.minimo), self.maximo)
+        self.tolerancia = tolerancia
+        self.suavizado = suavizado
+        self.en_vuelo = 0
+        self.sanos = 0
+        self.latencia = None
+        self.latencia_base = None
+        # Pedidos que tienen que terminar antes de poder volver a bajar el límite
+        self.gracia = 0
+        self.cond = threading.Condition()
+
+    def ajustar_maximo(self, maximo):
+        with self.cond:
+            self.maximo = max(self.minimo, maximo)
+            self.limite = min(self.limite, self.maximo)
+            self.cond.notify_all()
+
+    def entrar(self):
+        with self.cond:
+            while self.en_vuelo >= self.limite:
+                self.cond.wait()
+            self.en_vuelo += 1
+
+    def salir(self, latencia, resultado=OK):
+        """Devuelve +1 / -1 / 0 según cómo cambió el límite."""
+        with self.cond:
+            self.en_vuelo -= 1
+            self.gracia = max(0, self.gracia - 1)
+            cambio = 0
+            if resultado == SOBRECARGA:
+                cambio = self._disminuir(FACTOR_RETROCESO)
+            elif resultado == OK and self._lenta(latencia):
+                cambio = self._disminuir(FACTOR_RETROCESO_LATENCIA)
+            elif resultado == OK:
+                self.sanos += 1
+                if self.sanos >= self.limite and self.limite < self.maximo:
+                    self.limite += 1
+                    self.sanos = 0
+                    cambio = 1
+            self.cond.notify_all()
+            return cambio
+
+    def _lenta(self, latencia):
+        if latencia is None:
+            return False
+        self.latencia = latencia if self.latencia is None else (
+            self.suavizado * latencia + (1 - self.suavizado) * self.latencia
+        )
+        # La mejor latencia vista, que sube de a poco por si el sitio se pone más lento
+        # para siempre (si no, nunca más se consideraría sana)
+        if self.latencia_base is None:
+            self.latencia_base = self.latencia
+        else:
+            self.latencia_base = min(self.latencia_base * (1 + DERIVA_BASE), self.latencia)
+        return self.latencia > self.latencia_base * self.tolerancia
+
+    def _disminuir(self, factor):
+        self.sanos = 0
+        if self.gracia:
+            return 0
+        anterior = self.limite
+        self.limite = max(self.minimo, int(self.limite * factor))
+        self.gracia = self.en_vuelo + self.limite
+        return -1 if self.limite < anterior else 0
+
+
+class Turno:
+    """
+    Un pedido en curso contra un dominio; el resultado por defecto es OK. La latencia
+    que juzga el AIMD es todo el turno salvo que se fije `latencia` (p. ej. solo el
+    driver.get, sin las esperas fijas de scroll y widgets).
+    """
+
+    def __init__(self, dominio, espera):
+        self.dominio = dominio
+        self.espera = espera
+        self.resultado = OK
+        self.motivo = None
+        self.latencia = None
+        self.inicio = time.perf_counter()
+        self.terminado = False
+
+    def marcar(self, resultado, motivo=None):
+        # Una sobrecarga no se pisa con un error posterior del mismo pedido
+        if self.resultado != SOBRECARGA:
+            self.resultado = resultado
+            self.motivo = motivo
+
+    def fallo(self, error):
+        self.marcar(clasificar_excepcion(error), type(error).__name__)
+
+    def terminar(self):
+        if not self.terminado:
+            self.terminado = True
+            latencia = self.latencia if self.latencia is not None else time.perf_counter() - self.inicio
+            self.dominio.salir(self, latencia)
+
+
+class Dominio:
+    """Cubeta + control AIMD de un host, compartidos por todos los hilos del proceso."""
+
+    def __init__(self, host, rps, rafaga, minimo, inicial, maximo, tolerancia):
+        self.host = host
+        self.cubeta = Cubeta(rps, rafaga)
+        self.control = ControlAIMD(minimo, inicial, maximo, tolerancia)
+        LIMITE_CONCURRENCIA.set(self.control.limite, domain=host)
+
+    def entrar(self):
+        """Espera un lugar en la concurrencia y un token; hay que cerrar el turno con terminar()."""
+        self.control.entrar()
+        espera = self.cubeta.adquirir()
+        ESPERA_RITMO.observe(espera, domain=self.host)
+        return Turno(self, espera)
+
+    def salir(self, turno, latencia):
+        cambio = self.control.salir(latencia, turno.resultado)
+        if cambio < 0:
+            self.cubeta.frenar()
+            RETROCESOS.inc(domain=self.host, reason=turno.motivo or "latencia")
+        elif cambio > 0:
+            self.cubeta.acelerar()
+        if cambio:
+            LIMITE_CONCURRENCIA.set(self.control.limite, domain=self.host)
+
+    @contextmanager
+    def turno(self):
+        turno = self.entrar()
+        try:
+            yield turno
+        except Exception as e:
+            turno.fallo(e)
+            raise
+        finally:
+            turno.terminar()
+
+    @property
+    def limite(self):
+        return self.control.limite
+
+
+_dominios = {}
+_lock = threading.Lock()
+
+
+def host_de(url):
+    return urlsplit(url).hostname or url
+
+
+def dominio(url, maximo=None, rps=None):
+    """
+    Ritmo del host de `url` (se crea la primera vez con RITMO_* y RITMO_POR_DOMINIO).
+    `maximo` es el techo de concurrencia de quien lo usa (p. ej. la cantidad de drivers)
+    y `rps` pisa la tasa configurada (p. ej. desde un argumento del comando).
+    """
+    host = host_de(url)
+    with _lock:
+        if host not in _dominios:
+            config = {**settings.RITMO_POR_DOMINIO.get("*", {}), **settings.RITMO_POR_DOMINIO.get(host, {})}
+            _dominios[host] = Dominio(
+                host,
+                rps=config.get("rps", settings.RITMO_RPS),
+                rafaga=config.get("rafaga", settings.RITMO_RAFAGA),
+                minimo=config.get("min", settings.RITMO_CONCURRENCIA_MIN),
+                inicial=config.get("inicial", settings.RITMO_CONCURRENCIA_INICIAL),
+                maximo=maximo or config.get("max", settings.RITMO_CONCURRENCIA_MAX),
+                tolerancia=config.get("tolerancia", settings.RITMO_LATENCIA_TOLERANCIA),
+            )
+        elif maximo:
+            _dominios[host].control.ajustar_maximo(maximo)
+        if rps:
+            _dominios[host].cubeta.fijar_tasa(rps)
+        return _dominios[host]
+
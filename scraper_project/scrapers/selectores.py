@@ -0,0 +1,271 @@
+import json
+import re
+import threading
+from collections import Counter, defaultdict
+from django.conf import settings
+from scrapers.metricas import SELECTORES
+from scrapers.taxonomia import inferir_tipo_producto
+from scrapers.utils_scraping import inferir_categoria, inferir_variante
+
+SIN_DATO = "sin_dato"
+# Último compuesto de un selector ("div.price-box span.price" → "span.price")
+PATRON_COMBINADOR = re.compile(r"\s*[\s>+~]\s*")
+PATRON_TAG = re.compile(r"[a-zA-Z][\w-]*")
+PATRON_CLASE = re.compile(r"\.([\w-]+)")
+
+
+def _url_absoluta(valor, tienda):
+    return f"{tienda.base_url}{valor}" if valor.startswith("/") else valor
+
+
+def _id_desde_href(valor, tienda):
+    # ".../zapatilla-nike-air-12345/p" → "12345"
+    return valor.split("-")[-1].replace("/p", "")
+
+
+def _cuotas_sin_interes(valor, tienda):
+    return f"{valor} cuotas sin interés"
+
+
+POSTPROCESOS = {
+    "url_absoluta": _url_absoluta,
+    "id_desde_href": _id_desde_href,
+    "cuotas_sin_interes": _cuotas_sin_interes,
+}
+
+
+def _como_lista(valor):
+    if valor is None:
+        return []
+    return [valor] if isinstance(valor, str) else list(valor)
+
+
+class Selector:
+    """
+    Un selector CSS compilado una vez con soupsieve, más lo que tiene que cumplir el
+    elemento para que valga la pena probarlo (tag y clases del último compuesto).
+    """
+    __slots__ = ("campo", "orden", "todos", "css", "patron", "tag", "clases")
+
+    def __init__(self, campo, orden, css, todos=False):
+        self.campo = campo
+        self.orden = orden
+        self.todos = todos
+        self.css = css
+        # soupsieve arrastra bs4: se importa al compilar el spec, no al importar el módulo
+        # (base_scraper lo importa y tiene que arrancar liviano)
+        import soupsieve as sv
+
+        self.patron = sv.compile(css)
+        self.tag = None
+        self.clases = frozenset()
+        if "," in css:
+            return
+        ultimo = PATRON_COMBINADOR.split(css.strip())[-1]
+        match = PATRON_TAG.match(ultimo)
+        if match:
+            self.tag = match.group().lower()
+        if "(" not in ultimo:
+            self.clases = frozenset(PATRON_CLASE.findall(ultimo.split("[", 1)[0].split(":", 1)[0]))
+
+
+class Campo:
+    """
+    Un campo del spec: selectores en orden de preferencia (el primero que encuentra
+    algo gana, como los select_one encadenados con if/else), de qué atributo sale el
+    valor y qué post-procesos se le aplican. En vez de selectores puede tomar el valor
+    que extrajo otro campo ("de"), antes de los post-procesos de ese campo.
+    """
+    __slots__ = ("nombre", "selectores", "atributos", "todos", "presencia", "de", "post")
+
+    def __init__(self, nombre, spec):
+        self.nombre = nombre
+        self.todos = bool(spec.get("todos"))
+        self.selectores = [
+            Selector(nombre, i, css, self.todos) for i, css in enumerate(_como_lista(spec.get("css")))
+        ]
+        self.atributos = _como_lista(spec.get("atributo")) or ["texto"]
+        self.presencia = bool(spec.get("presencia"))
+        self.de = spec.get("de")
+        if bool(self.selectores) == bool(self.de):
+            raise ValueError(f"El campo '{nombre}' necesita 'css' o 'de' (uno de los dos)")
+        try:
+            self.post = [POSTPROCESOS[p] for p in _como_lista(spec.get("post"))]
+        except KeyError as e:
+            raise ValueError(f"Post-proceso {e} desconocido en el campo '{nombre}'")
+
+    def valor(self, elemento):
+        for atributo in self.atributos:
+            if atributo == "texto":
+                return elemento.text.strip()
+            if atributo == "texto_unido":
+                return elemento.get_text(strip=True)
+            valor = elemento.get(atributo)
+            if valor is not None:
+                return valor.strip() if isinstance(valor, str) else " ".join(valor)
+        return None
+
+
+class Extractor:
+    """
+    Spec de una tienda compilado: recorre la tarjeta del producto una sola vez y a cada
+    elemento le prueba solo los selectores cuyo tag y clases coinciden, en vez de un
+    select_one (un recorrido entero) por campo. Cuenta por campo qué selector acertó.
+    """
+
+    def __init__(self, tienda, spec):
+        self.tienda = tienda
+        self.nombre_pagina = spec["nombre_pagina"]
+        self.base_url = spec.get("base_url", "")
+        self.campos = [Campo(nombre, campo) for nombre, campo in spec["campos"].items()]
+        con_selectores = set()
+        for campo in self.campos:
+            if campo.selectores:
+                con_selectores.add(campo.nombre)
+            elif campo.de not in con_selectores:
+                raise ValueError(f"'{campo.nombre}' copia '{campo.de}', que tiene que ser un campo con 'css' declarado antes")
+        # Con su primer selector un campo queda resuelto y, si lo están todos, se deja de
+        # recorrer; un campo "todos" junta hasta el final, así que ahí se recorre entero
+        self.resolubles = (
+            None if any(c.todos for c in self.campos)
+            else sum(1 for c in self.campos if c.selectores)
+        )
+        self.selectores = [s for c in self.campos for s in c.selectores]
+        self.por_tag = defaultdict(list)
+        self.comodines = []
+        for selector in self.selectores:
+            if selector.tag:
+                self.por_tag[selector.tag].append(selector)
+            else:
+                self.comodines.append(selector)
+        self.aciertos = defaultdict(Counter)
+        self.lock = threading.Lock()
+
+    def _encontrar(self, raiz):
+        """{selector: elemento (o lista si el campo es 'todos')} en un solo recorrido."""
+        encontrados = {}
+        # Campos cuyo primer selector ya acertó: no hace falta probarles nada más
+        resueltos = set()
+        for elemento in raiz.descendants:
+            nombre = elemento.name
+            if nombre is None:
+                continue
+            candidatos = self.por_tag.get(nombre)
+            if self.comodines:
+                candidatos = (candidatos or []) + self.comodines
+            if not candidatos:
+                continue
+            clases = None
+            for selector in candidatos:
+                if selector.campo in resueltos or (selector in encontrados and not selector.todos):
+                    continue
+                if selector.clases:
+                    if clases is None:
+                        clases = set(elemento.get("class") or ())
+                    if not selector.clases <= clases:
+                        continue
+                if not selector.patron.match(elemento):
+                    continue
+                if selector.todos:
+                    encontrados.setdefault(selector, []).append(elemento)
+                    continue
+                encontrados[selector] = elemento
+                if selector.orden == 0:
+                    resueltos.add(selector.campo)
+            if len(resueltos) == self.resolubles:
+                break
+        return encontrados
+
+    def extraer(self, raiz, seccion):
+        """Dict con los campos del spec (None lo que no está) más los derivados comunes."""
+        encontrados = self._encontrar(raiz)
+        producto = {}
+        crudos = {}
+        usados = {}
+        for campo in self.campos:
+            if campo.de:
+                valor = crudos.get(campo.de)
+            else:
+                valor, usados[campo.nombre] = None, SIN_DATO
+                for selector in campo.selectores:
+                    elemento = encontrados.get(selector)
+                    if elemento is None:
+                        continue
+                    usados[campo.nombre] = str(selector.orden)
+                    if campo.presencia:
+                        valor = True
+                    elif campo.todos:
+                        valor = [v for v in (campo.valor(e) for e in elemento) if v]
+                    else:
+                        valor = campo.valor(elemento)
+                    break
+                crudos[campo.nombre] = valor
+            if valor and not campo.presencia:
+                for post in campo.post:
+                    valor = post(valor, self)
+            producto[campo.nombre] = valor or None
+        self._contar(usados)
+
+        nombre = producto.get("nombre") or ""
+        producto.update({
+            "categoria": seccion,
+            "clase_de_producto": inferir_categoria(nombre),
+            "nombre_pagina": self.nombre_pagina,
+            "tipo_de_producto": inferir_tipo_producto(nombre),
+            "variante": inferir_variante(nombre),
+        })
+        return producto
+
+    def _contar(self, usados):
+        with self.lock:
+            for campo, orden in usados.items():
+                self.aciertos[campo][orden] += 1
+        for campo, orden in usados.items():
+            SELECTORES.inc(store=self.tienda, field=campo, selector=orden)
+
+    def tasas(self):
+        """
+        Por campo: productos vistos, fracción con dato, fracción que salió de un selector
+        de respaldo y el detalle por selector ("0" es el principal).
+        """
+        with self.lock:
+            aciertos = {campo: dict(conteo) for campo, conteo in self.aciertos.items()}
+        resumen = {}
+        for campo, conteo in aciertos.items():
+            total = sum(conteo.values())
+            respaldo = sum(n for orden, n in conteo.items() if orden not in ("0", SIN_DATO))
+            resumen[campo] = {
+                "total": total,
+                "hit_rate": round(1 - conteo.get(SIN_DATO, 0) / total, 4),
+                "fallback_rate": round(respaldo / total, 4),
+                "by_selector": {orden: n for orden, n in sorted(conteo.items())},
+            }
+        return resumen
+
+
+class Specs:
+    def __init__(self, datos):
+        self.version = datos.get("version", 1)
+        self.extractores = {tienda: Extractor(tienda, spec) for tienda, spec in datos["tiendas"].items()}
+
+    @classmethod
+    def desde_archivo(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+
+_specs = None
+_lock = threading.Lock()
+
+
+def extractor(tienda):
+    """Extractor compilado de la tienda (se compila una vez por proceso, la primera vez que se pide)."""
+    global _specs
+    if _specs is None:
+        with _lock:
+            if _specs is None:
+                _specs = Specs.desde_archivo(settings.SELECTORES_PATH)
+    try:
+        return _specs.extractores[tienda]
+    except KeyError:
+        raise KeyError(f"No hay selectores para la tienda '{tienda}' en {settings.SELECTORES_PATH}")
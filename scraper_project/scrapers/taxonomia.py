@@ -0,0 +1,151 @@
+import json
+import re
+import threading
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+from django.conf import settings
+
+MODOS = ("palabra", "prefijo", "subcadena")
+# Nombres distintos que se recuerdan (un scraper ve el mismo producto en varias secciones)
+TAMANO_CACHE_CLASIFICACION = 16384
+PATRON_TOKEN = re.compile(r"[a-z0-9]+")
+
+Clasificacion = namedtuple("Clasificacion", ["categoria", "tipo_producto", "variante"])
+Regla = namedtuple("Regla", ["nombre", "rango"])
+
+
+def limpiar_texto(texto: str) -> str:
+    texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('utf-8')
+    return texto.lower()
+
+
+def inferir_tipo_producto(nombre: str) -> str:
+    if not nombre:
+        return "N/A"
+    return nombre.split()[0]
+
+
+class Indice:
+    """
+    Índice de términos → nombre (categoría o color). Cada término tiene un modo:
+
+    - palabra: el token del nombre tiene que ser exactamente el término ("top" no
+      coincide con "laptop" ni con "tops").
+    - prefijo: el token empieza con el término ("zapatilla" → "zapatillas").
+    - subcadena: aparece en cualquier parte del nombre (cómo se buscaba antes).
+
+    Dentro de un mismo token gana el término más largo ("botinero" le gana a "botin");
+    entre tokens, el de mayor prioridad y, a igual prioridad, el que está antes en el archivo.
+    """
+    def __init__(self, entradas, modo_defecto):
+        self.palabras = {}
+        self.prefijos = {}
+        self.subcadenas = []
+        total = len(entradas)
+        for orden, entrada in enumerate(entradas):
+            regla = Regla(entrada["nombre"], (entrada.get("prioridad", 0), total - orden))
+            for termino in entrada.get("terminos", []):
+                if isinstance(termino, str):
+                    termino = {"termino": termino}
+                modo = termino.get("modo", modo_defecto)
+                if modo not in MODOS:
+                    raise ValueError(f"Modo '{modo}' inválido en '{termino['termino']}' ({entrada['nombre']})")
+                texto = limpiar_texto(termino["termino"]).strip()
+                if modo == "subcadena":
+                    self.subcadenas.append((texto, regla))
+                    continue
+                if not PATRON_TOKEN.fullmatch(texto):
+                    raise ValueError(f"'{termino['termino']}' ({entrada['nombre']}) tiene que ser una sola palabra")
+                destino = self.palabras if modo == "palabra" else self.prefijos
+                anterior = destino.get(texto)
+                if anterior and anterior.nombre != regla.nombre:
+                    raise ValueError(f"'{texto}' está en '{anterior.nombre}' y en '{regla.nombre}'")
+                destino[texto] = regla
+        self.largos_prefijo = sorted({len(t) for t in self.prefijos}, reverse=True)
+
+    def regla_token(self, token):
+        regla = self.palabras.get(token) or self.prefijos.get(token)
+        if regla:
+            return regla
+        for largo in self.largos_prefijo:
+            if largo < len(token):
+                regla = self.prefijos.get(token[:largo])
+                if regla:
+                    return regla
+        return None
+
+    def buscar_subcadenas(self, texto, mejor):
+        for termino, regla in self.subcadenas:
+            if (mejor is None or regla.rango > mejor.rango) and termino in texto:
+                mejor = regla
+        return mejor
+
+
+class Taxonomia:
+    """
+    Categorías y colores de scrapers/taxonomia.json (o TAXONOMIA_PATH) compilados en
+    índices por token: un nombre se normaliza y se parte en palabras una sola vez, y
+    cada palabra se busca en un dict en vez de recorrer todas las listas.
+    """
+    def __init__(self, datos, tamano_cache=TAMANO_CACHE_CLASIFICACION):
+        self.version = datos.get("version")
+        modo = datos.get("modo_defecto", "prefijo")
+        self.categoria_defecto = datos.get("categoria_defecto", "Otros")
+        self.variante_defecto = datos.get("variante_defecto", "N/A")
+        self.categorias = Indice(datos.get("categorias", []), modo)
+        self.variantes = Indice(datos.get("variantes", []), modo)
+        self.clasificar = lru_cache(maxsize=tamano_cache)(self._clasificar)
+        # token → (regla de categoría, regla de color); el vocabulario de los nombres es chico
+        self._por_token = {}
+
+    @classmethod
+    def desde_archivo(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _reglas_token(self, token):
+        reglas = self._por_token.get(token)
+        if reglas is None:
+            reglas = self._por_token[token] = (
+                self.categorias.regla_token(token), self.variantes.regla_token(token)
+            )
+        return reglas
+
+    def _clasificar(self, nombre):
+        texto = limpiar_texto(nombre)
+        categoria = variante = None
+        for token in PATRON_TOKEN.findall(texto):
+            regla_categoria, regla_variante = self._reglas_token(token)
+            if regla_categoria and (categoria is None or regla_categoria.rango > categoria.rango):
+                categoria = regla_categoria
+            if regla_variante and (variante is None or regla_variante.rango > variante.rango):
+                variante = regla_variante
+        categoria = self.categorias.buscar_subcadenas(texto, categoria)
+        variante = self.variantes.buscar_subcadenas(texto, variante)
+        return Clasificacion(
+            categoria.nombre if categoria else self.categoria_defecto,
+            inferir_tipo_producto(nombre),
+            variante.nombre if variante else self.variante_defecto,
+        )
+
+
+_taxonomia = None
+_lock = threading.Lock()
+
+
+def taxonomia():
+    global _taxonomia
+    if _taxonomia is None:
+        with _lock:
+            if _taxonomia is None:
+                _taxonomia = Taxonomia.desde_archivo(settings.TAXONOMIA_PATH)
+    return _taxonomia
+
+
+def recargar(path=None):
+    """Vuelve a leer el archivo (por ejemplo después de editarlo, sin reiniciar el worker)."""
+    global _taxonomia
+    with _lock:
+        _taxonomia = Taxonomia.desde_archivo(path or settings.TAXONOMIA_PATH)
+    return _taxonomia
@@ -1,3 +1,909 @@
-from django.test import TestCase
+import io
+import json
+import os
+import re
+from decimal import Decimal, InvalidOperation
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from unittest import mock
+from django.conf import settings
+from django.test import SimpleTestCase
+from scrapers import alertas
+from scrapers.alertas import BackendStub, DespachadorAlertas
+from scrapers.financiacion import extraer_financiacion
+from scrapers.management.commands.benchmark import OBJETIVOS_IMPORTS, cargar_registros, medir_import
+from scrapers.parseo import parsear_precio
+from scrapers.registro import Cuota, Producto, serializar
+from scrapers.ritmo import OK, SOBRECARGA, ControlAIMD, Cubeta, Dominio
+from scrapers.selectores import SIN_DATO, Extractor, Specs
+from scrapers.taxonomia import Taxonomia, inferir_tipo_producto, limpiar_texto
+from scrapers.reintentos import (
+    BLOQUEADO,
+    DRIVER_CAIDO,
+    ERROR,
+    NO_ENCONTRADO,
+    TIMEOUT,
+    ColaReintentos,
+    FalloItem,
+    PoliticaReintentos,
+    clasificar_fallo,
+)
 
-# Create your tests here.
+
+def politica(max_intentos=3, base=0.01, tope=0.05):
+    return PoliticaReintentos(max_intentos=max_intentos, base=base, tope=tope)
+
+
+class PoliticaReintentosTests(SimpleTestCase):
+    def test_no_reintenta_404_ni_pasado_el_maximo(self):
+        p = politica(max_intentos=3)
+        self.assertTrue(p.reintentar(1, TIMEOUT))
+        self.assertTrue(p.reintentar(2, TIMEOUT))
+        self.assertFalse(p.reintentar(3, TIMEOUT))
+        self.assertFalse(p.reintentar(1, NO_ENCONTRADO))
+
+    def test_backoff_exponencial_con_tope(self):
+        p = PoliticaReintentos(max_intentos=10, base=1, tope=5)
+        # Jitter completo: se pide el máximo del rango para ver el techo de cada intento
+        with mock.patch("scrapers.reintentos.random.uniform", side_effect=lambda a, b: b):
+            self.assertEqual([p.espera(n, TIMEOUT) for n in range(1, 6)], [1, 2, 4, 5, 5])
+            # Un bloqueo espera 4 veces más, con el tope también multiplicado
+            self.assertEqual(p.espera(1, BLOQUEADO), 4)
+            self.assertEqual(p.espera(4, BLOQUEADO), 20)
+
+    def test_jitter_dentro_del_rango(self):
+        p = PoliticaReintentos(max_intentos=10, base=1, tope=5)
+        for _ in range(200):
+            self.assertTrue(0 <= p.espera(3, TIMEOUT) <= 4)
+
+
+class ClasificarFalloTests(SimpleTestCase):
+    def test_clases(self):
+        from selenium.common.exceptions import TimeoutException, WebDriverException
+
+        self.assertEqual(clasificar_fallo(FalloItem(BLOQUEADO, "captcha")), BLOQUEADO)
+        self.assertEqual(clasificar_fallo(TimeoutException("timed out")), TIMEOUT)
+        self.assertEqual(clasificar_fallo(WebDriverException("invalid session id")), DRIVER_CAIDO)
+        self.assertEqual(clasificar_fallo(ValueError("otra cosa")), ERROR)
+
+
+class ColaReintentosTests(SimpleTestCase):
+    def test_nuevos_antes_que_reintentos(self):
+        cola = ColaReintentos(["a", "b", "c"], politica(base=0.001, tope=0.001))
+        primera = cola.obtener()
+        cola.fallar(primera, TIMEOUT)
+        time.sleep(0.01)
+        # El reintento de "a" ya venció pero quedan ítems nuevos: van primero
+        self.assertEqual([cola.obtener().item, cola.obtener().item], ["b", "c"])
+        reintento = cola.obtener()
+        self.assertIs(reintento, primera)
+        self.assertEqual(reintento.intento, 2)
+
+    def test_reintento_no_sale_antes_de_su_espera(self):
+        cola = ColaReintentos(["a"], politica())
+        tarea = cola.obtener()
+        inicio = time.monotonic()
+        espera = cola.fallar(tarea, TIMEOUT, minimo=0.1)
+        self.assertGreaterEqual(espera, 0.1)
+        self.assertIs(cola.obtener(), tarea)
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.1)
+
+    def test_reintentos_salen_en_orden_de_vencimiento(self):
+        cola = ColaReintentos(["a", "b"], politica())
+        a, b = cola.obtener(), cola.obtener()
+        with mock.patch.object(cola.politica, "espera", side_effect=[0.05, 0.0]):
+            cola.fallar(a, TIMEOUT)
+            cola.fallar(b, TIMEOUT)
+        self.assertEqual([cola.obtener().item, cola.obtener().item], ["b", "a"])
+
+    def test_termina_cuando_no_queda_nada_pendiente(self):
+        cola = ColaReintentos(["ok", "404", "timeout"], politica(max_intentos=2))
+        while (tarea := cola.obtener()) is not None:
+            if tarea.item == "ok":
+                cola.completar(tarea)
+            elif tarea.item == "404":
+                self.assertIsNone(cola.fallar(tarea, NO_ENCONTRADO))
+            else:
+                cola.fallar(tarea, TIMEOUT)
+        self.assertEqual(cola.fallos_finales, {NO_ENCONTRADO: 1, TIMEOUT: 1})
+        self.assertEqual(cola.intentos_por_clase, {NO_ENCONTRADO: 1, TIMEOUT: 2})
+        self.assertEqual(cola.pendientes, 0)
+
+    def test_recuperados(self):
+        cola = ColaReintentos(["a"], politica(base=0.001, tope=0.001))
+        tarea = cola.obtener()
+        cola.fallar(tarea, DRIVER_CAIDO)
+        cola.completar(cola.obtener())
+        self.assertIsNone(cola.obtener())
+        self.assertEqual(cola.recuperados, 1)
+        self.assertIn("Recuperados con reintento: 1", cola.resumen())
+
+    def test_cerrar_dos_veces_no_descuenta_dos_veces(self):
+        cola = ColaReintentos(["a", "b"], politica())
+        tarea = cola.obtener()
+        cola.completar(tarea)
+        cola.completar(tarea)
+        self.assertIsNone(cola.fallar(tarea, ERROR))
+        self.assertEqual(cola.pendientes, 1)
+        self.assertFalse(cola.intentos_por_clase)
+
+    def test_hilo_esperando_se_libera_cuando_cierra_el_ultimo(self):
+        cola = ColaReintentos(["a"], politica())
+        tarea = cola.obtener()
+        resultado = []
+        hilo = threading.Thread(target=lambda: resultado.append(cola.obtener()))
+        hilo.start()
+        # Con "a" en proceso el otro hilo tiene que esperar: "a" todavía puede volver
+        hilo.join(0.05)
+        self.assertTrue(hilo.is_alive())
+        cola.completar(tarea)
+        hilo.join(1)
+        self.assertFalse(hilo.is_alive())
+        self.assertEqual(resultado, [None])
+
+    def test_hilo_esperando_toma_el_reintento(self):
+        cola = ColaReintentos(["a"], politica(base=0.001, tope=0.001))
+        tarea = cola.obtener()
+        resultado = []
+        hilo = threading.Thread(target=lambda: resultado.append(cola.obtener()))
+        hilo.start()
+        cola.fallar(tarea, TIMEOUT)
+        hilo.join(1)
+        self.assertEqual(resultado, [tarea])
+
+
+class DespachadorAlertasTests(SimpleTestCase):
+    def setUp(self):
+        directorio = self.enterContext(tempfile.TemporaryDirectory())
+        self.backend = BackendStub(os.path.join(directorio, "alertas.log"))
+        # El stub también imprime cada alerta
+        self.enterContext(redirect_stdout(io.StringIO()))
+
+    def despachador(self, **kwargs):
+        opciones = {"modo": "inmediato", "ventana": 60, "max_por_minuto": 20, "intervalo_digest": 300}
+        return DespachadorAlertas(self.backend, **{**opciones, **kwargs})
+
+    def enviadas(self):
+        """Alertas que llegaron al stub, sin el sello de fecha (un digest ocupa varias líneas)."""
+        if not os.path.exists(self.backend.path):
+            return []
+        with open(self.backend.path, encoding="utf-8") as f:
+            contenido = f.read()
+        partes = re.split(r"^\[\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\] ", contenido, flags=re.MULTILINE)
+        return [p.rstrip("\n") for p in partes[1:]]
+
+    def esperar_enviadas(self, cantidad, timeout=3):
+        limite = time.monotonic() + timeout
+        while len(self.enviadas()) < cantidad and time.monotonic() < limite:
+            time.sleep(0.02)
+        return self.enviadas()
+
+    def test_agrupa_alertas_que_solo_cambian_en_numeros(self):
+        despachador = self.despachador()
+        despachador.enviar("[ScraperDash_3] Falla en ítem 812")
+        despachador.enviar("[ScraperDash_1] Falla en ítem 90")
+        despachador.enviar("[ScraperDash_2] Falla en ítem 7")
+        despachador.enviar("Driver caído")
+        self.assertTrue(despachador.flush())
+        self.assertEqual(self.enviadas(), [
+            "[ScraperDash_3] Falla en ítem 812",
+            "Driver caído",
+            "🔁 2 alertas similares más en 60s. Última: [ScraperDash_2] Falla en ítem 7",
+        ])
+
+    def test_al_cerrar_la_ventana_sale_el_resumen_de_repetidas(self):
+        despachador = self.despachador(ventana=0.1)
+        despachador.enviar("Timeout en ítem 1")
+        despachador.enviar("Timeout en ítem 2")
+        self.assertEqual(self.esperar_enviadas(2), [
+            "Timeout en ítem 1",
+            "🔁 1 alertas similares más en 0.1s. Última: Timeout en ítem 2",
+        ])
+
+    def test_rate_limit_junta_lo_que_sobra_en_un_digest(self):
+        despachador = self.despachador(max_por_minuto=2)
+        for mensaje in ("uno", "dos", "tres", "cuatro", "cinco"):
+            despachador.enviar(mensaje)
+        self.assertTrue(despachador.flush())
+        self.assertEqual(self.enviadas(), [
+            "uno",
+            "dos",
+            "📋 Resumen de 3 alertas:\n• tres\n• cuatro\n• cinco",
+        ])
+
+    def test_modo_digest_manda_un_resumen_por_intervalo(self):
+        despachador = self.despachador(modo="digest", intervalo_digest=0.2)
+        for mensaje in ("uno", "dos", "tres"):
+            despachador.enviar(mensaje)
+        self.assertEqual(self.esperar_enviadas(1), ["📋 Resumen de 3 alertas:\n• uno\n• dos\n• tres"])
+
+    def test_flush_al_salir(self):
+        with mock.patch.object(alertas, "_despachador", None), \
+                mock.patch.object(alertas, "crear_backend", return_value=self.backend), \
+                mock.patch.object(alertas.atexit, "register") as registrar:
+            despachador = alertas.despachador()
+            self.assertIs(alertas.despachador(), despachador)
+        registrar.assert_called_once_with(despachador.flush)
+        despachador.modo = "digest"
+        despachador.enviar("pendiente")
+        # Lo que registró atexit manda lo que quedaba en el digest
+        self.assertTrue(registrar.call_args.args[0]())
+        self.assertEqual(self.enviadas(), ["pendiente"])
+
+    def test_error_del_backend_va_al_log(self):
+        despachador = self.despachador()
+        with mock.patch.object(self.backend, "enviar", side_effect=OSError("sin red")), \
+                self.assertLogs("scrapers.alertas", "ERROR") as logs:
+            despachador.enviar("alerta")
+            self.assertTrue(despachador.flush())
+        self.assertIn("sin red", logs.output[0])
+
+
+class ImportsLivianosTests(SimpleTestCase):
+    def test_web_worker_e_importers_arrancan_sin_modulos_pesados(self):
+        # Lo mismo que `benchmark imports --estricto`, en un proceso nuevo por objetivo
+        for objetivo, (modulo, liviano) in OBJETIVOS_IMPORTS.items():
+            if not liviano:
+                continue
+            with self.subTest(objetivo=objetivo):
+                _, pesados = medir_import(modulo)
+                self.assertEqual(pesados, [], f"{modulo} carga {', '.join(pesados)}")
+
+
+# Implementaciones anteriores congeladas: los módulos nuevos tienen que dar lo mismo sobre json_pruebas
+
+# Listas hard-codeadas que usaba inferir_categoria / inferir_variante antes de taxonomia.json
+CATEGORIAS_ANTERIORES = [
+    ("Calzado", ["zapatilla", "botin", "sandalia", "calzado", "zapato"]),
+    ("Indumentaria", ["remera", "short", "campera", "buzo", "pantalon", "top", "camiseta", "chaqueta", "jogger", "musculosa", "pantalon", "calza", "canguro"]),
+    ("Accesorios", ["pelota", "mochila", "gorra", "bolso", "media", "accesorio", "guante", "riñonera", "silbatos", "guantes"]),
+]
+COLORES_ANTERIORES = [
+    "negro", "blanco", "gris", "rojo", "azul", "verde", "amarillo",
+    "rosa", "marron", "naranja", "purpura", "violeta", "celeste", "beige"
+]
+
+
+def categoria_anterior(nombre):
+    nombre = limpiar_texto(nombre)
+    for categoria, palabras in CATEGORIAS_ANTERIORES:
+        if any(palabra in nombre for palabra in palabras):
+            return categoria
+    return "Otros"
+
+
+def variante_anterior(nombre):
+    texto = limpiar_texto(nombre)
+    for color in COLORES_ANTERIORES:
+        if color in texto:
+            return color
+    return "N/A"
+
+
+# parse_decimal que estaba copiado en cada import_productos_*
+def parse_decimal_anterior(s):
+    if not s or s.strip().upper() in ("N/A", ""):
+        return None
+    clean = s.replace('$', '').replace('.', '').strip().replace('%', '')
+    if ',' in clean and clean.count(',') == 1:
+        clean = clean.replace(',', '.')
+    try:
+        return Decimal(clean)
+    except InvalidOperation:
+        return None
+
+
+# extraer_cuotas_bancos de dash_2 / run_dash_more_threads antes de scrapers.financiacion
+def financiacion_anterior(texto_cuota):
+    num_cuotas = precio_por_cuota = sin_interes = None
+    m1 = re.search(r"(\d+)\s+cuotas?", texto_cuota, re.IGNORECASE)
+    if m1:
+        num_cuotas = int(m1.group(1))
+    if re.search(r"sin\s+interés", texto_cuota, re.IGNORECASE):
+        sin_interes = True
+    elif re.search(r"con\s+interés", texto_cuota, re.IGNORECASE):
+        sin_interes = False
+    m2 = re.search(r"\$\s*([\d\.\,]+)", texto_cuota)
+    if m2:
+        try:
+            precio_por_cuota = float(m2.group(1).replace(".", "").replace(",", "."))
+        except ValueError:
+            precio_por_cuota = None
+    return num_cuotas, precio_por_cuota, sin_interes
+
+
+class EquivalenciaCorpusTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.registros = cargar_registros()
+
+    def valores(self, *campos):
+        distintos = dict.fromkeys(
+            r[campo] for r in self.registros for campo in campos if isinstance(r.get(campo), str)
+        )
+        self.assertTrue(distintos, f"json_pruebas no tiene {', '.join(campos)}")
+        return list(distintos)
+
+    def test_taxonomia_en_modo_subcadena_da_lo_mismo_que_las_listas_anteriores(self):
+        # "riñonera" nunca coincidía (se buscaba en el texto sin tildes): queda afuera
+        taxonomia = Taxonomia({
+            "modo_defecto": "subcadena",
+            "categorias": [
+                {"nombre": c, "terminos": [p for p in palabras if p.isascii()]}
+                for c, palabras in CATEGORIAS_ANTERIORES
+            ],
+            "variantes": [{"nombre": c, "terminos": [c]} for c in COLORES_ANTERIORES],
+        })
+        distintos = [
+            nombre for nombre in self.valores("nombre")
+            if tuple(taxonomia.clasificar(nombre))
+            != (categoria_anterior(nombre), inferir_tipo_producto(nombre), variante_anterior(nombre))
+        ]
+        self.assertEqual(distintos, [])
+
+    def test_parsear_precio_da_lo_mismo_que_parse_decimal(self):
+        # Solo los textos que el parser anterior entendía; el resto ahora puede recuperarse
+        distintos = [
+            texto for texto in self.valores("precio", "precio_anterior")
+            if (anterior := parse_decimal_anterior(texto)) is not None and anterior != parsear_precio(texto)
+        ]
+        self.assertEqual(distintos, [])
+
+    def test_extraer_financiacion_no_pierde_lo_que_encontraban_las_regex(self):
+        distintos = []
+        for texto in self.valores("cuotas"):
+            f = extraer_financiacion(texto)
+            ahora = (
+                (f.num_cuotas, float(f.precio_por_cuota) if f.precio_por_cuota is not None else None, f.sin_interes)
+                if f else (None, None, None)
+            )
+            # El extractor nuevo puede completar datos, pero no cambiar los que ya salían
+            if any(a is not None and a != b for a, b in zip(financiacion_anterior(texto), ahora)):
+                distintos.append(texto)
+        self.assertEqual(distintos, [])
+
+
+class ProductoTests(SimpleTestCase):
+    def test_formato_viejo_con_textos_de_sin_dato(self):
+        producto = Producto.desde_dict({
+            "nombre": "Zapatilla Running",
+            "marca": "N/A",
+            "precio": "$ 12.999",
+            "precio_anterior": "Sin precio anterior",
+            "descuento": "Sin descuento",
+            "cuotas": "N/A",
+            "envio_gratis": "No",
+            "link": "Sin link",
+            "sku": "-",
+            "tags": "Sin tags",
+            "talles": {},
+            "modelo_id": "N/A",
+        })
+        self.assertEqual(producto.nombre, "Zapatilla Running")
+        self.assertEqual(producto.precio, Decimal("12999"))
+        self.assertFalse(producto.envio_gratis)
+        for campo in ("marca", "precio_anterior", "descuento", "cuotas", "link", "sku", "modelo_id"):
+            self.assertIsNone(getattr(producto, campo), campo)
+        self.assertEqual((producto.tags, producto.talles), ((), ()))
+
+    def test_precios_envio_y_listas_del_formato_viejo(self):
+        producto = Producto.desde_dict({
+            "precio": "$ 15.999,50",
+            "precio_anterior": "$ 22.857",
+            "envio_gratis": "Si",
+            "tags": "running, hombre",
+            "talles": {"40": "disponible", "41": "agotado"},
+        })
+        self.assertEqual(producto.precio, Decimal("15999.50"))
+        self.assertEqual(producto.precio_anterior, Decimal("22857"))
+        self.assertTrue(producto.envio_gratis)
+        self.assertEqual(producto.tags, ("running", "hombre"))
+        self.assertEqual(producto.talles, ("40", "41"))
+        self.assertEqual(producto.descuento_calculado(), Decimal("30.00"))
+
+    def test_alias_de_grid_moov_y_stock_center(self):
+        grid = Producto.desde_dict({"model_id": "N/A", "descuento": "-30%", "disponibles": ["38", "39"], "no_disponibles": []})
+        self.assertIsNone(grid.modelo_id)
+        self.assertEqual(grid.descuento, Decimal("30"))
+        self.assertEqual((grid.disponible, grid.no_disponible), (("38", "39"), ()))
+
+        moov = Producto.desde_dict({"model_id": "AB123", "available_sizes": {"40": 1}, "unavailable_sizes": "N/A"})
+        self.assertEqual(moov.modelo_id, "AB123")
+        self.assertEqual((moov.disponible, moov.no_disponible), (("40",), ()))
+
+        # Si vienen los dos nombres gana el del registro
+        self.assertEqual(Producto.desde_dict({"modelo_id": "nuevo", "model_id": "viejo"}).modelo_id, "nuevo")
+
+    def test_financiacion_descarta_cuotas_incompletas(self):
+        producto = Producto.desde_dict({"financiacion": [
+            {"banco": "Visa", "num_cuotas": "6", "precio_por_cuota": "$ 2.166,50", "sin_interes": "Si"},
+            {"banco": "Naranja", "num_cuotas": None, "precio_por_cuota": "$ 1.000"},
+            {"banco": "Amex", "num_cuotas": 3, "precio_por_cuota": "N/A"},
+            "3 cuotas sin interés",
+        ]})
+        self.assertEqual(producto.financiacion, (Cuota("Visa", 6, Decimal("2166.50"), True),))
+
+    def test_ida_y_vuelta_por_json(self):
+        producto = Producto(
+            nombre="Buzo Negro",
+            precio=Decimal("45999.99"),
+            precio_anterior=Decimal("59999"),
+            descuento=Decimal("23.33"),
+            envio_gratis=True,
+            tags=("hombre",),
+            disponible=("M", "L"),
+            modelo_id="BZ-01",
+            financiacion=(Cuota("Visa", 3, Decimal("15333.33"), True), Cuota("", 12, Decimal("5000"), False)),
+        )
+        texto = json.dumps([producto], default=serializar)
+        datos = json.loads(texto)[0]
+        # Contrato del JSON exportado: números, listas y null
+        self.assertEqual(datos["precio"], 45999.99)
+        self.assertEqual(datos["precio_anterior"], 59999)
+        self.assertIsNone(datos["marca"])
+        self.assertEqual(datos["disponible"], ["M", "L"])
+        self.assertEqual(datos["financiacion"][1], {
+            "banco": "", "num_cuotas": 12, "precio_por_cuota": 5000, "sin_interes": False,
+        })
+        self.assertEqual(Producto.desde_dict(datos), producto)
+
+    def test_ida_y_vuelta_del_corpus(self):
+        for registro in cargar_registros():
+            producto = Producto.desde_dict(registro)
+            datos = json.loads(json.dumps(producto, default=serializar))
+            self.assertEqual(Producto.desde_dict(datos), producto, registro.get("link"))
+
+
+# Tarjetas de listado como las ve cada scraper (recortadas a lo que leen los selectores)
+TARJETAS = {
+    "dash": """
+<div class="vtex-search-result-3-x-galleryItem">
+  <a class="vtex-product-summary-2-x-clearLink" href="/zapatilla-nike-revolution-7-12345/p">
+    <img class="vtex-product-summary-2-x-image" src="https://dash.vteximg.com.br/rev7.jpg">
+    <img class="vtex-product-summary-2-x-productBrandLogo" alt="Nike">
+    <span class="vtex-product-summary-2-x-productBrand"> Zapatilla Nike Revolution 7 Negra </span>
+    <span class="vtex-store-components-3-x-listPriceValue">$ 99.999</span>
+    <span class="vtex-store-components-3-x-sellingPriceValue">$ 79.999</span>
+    <div class="vtex-store-components-3-x-discountInsideContainer">-20%</div>
+    <p class="dash-theme-6-x-installmentsTxt">6 cuotas sin interés de $ 13.333</p>
+    <div class="dash-theme-6-x-freeShipping">Envío gratis</div>
+    <div class="dash-theme-6-x-item">40</div>
+    <div class="dash-theme-6-x-item">41</div>
+    <div class="dash-theme-6-x-item"> </div>
+  </a>
+</div>""",
+    "dexter": """
+<div class="product" data-pid="NK-DV3853-001">
+  <div class="image-container">
+    <img class="tile-image primary-image" src="https://dexter.com.ar/dv3853.jpg">
+    <img class="tile-image secondary-image" src="https://dexter.com.ar/dv3853-b.jpg">
+  </div>
+  <div class="pdp-link"><a class="link" href="/zapatilla-nike-revolution-7/NK-DV3853-001.html">Zapatilla Nike Revolution 7</a></div>
+  <fieldset><legend>30% OFF</legend></fieldset>
+  <div class="price">
+    <span class="sales">
+      <span class="value">$ 80.499</span>
+      <del><span class="value" content="114999.00">$ 114.999</span></del>
+    </span>
+  </div>
+  <div class="installments-container"><span>6 cuotas sin interés de $ 13.416</span></div>
+</div>""",
+    "solodeportes": """
+<li class="item product product-item">
+  <a href="https://www.solodeportes.com.ar/remera-adidas-essentials.html" onclick="return true">
+    <span class="product-image-container"><img class="product-image-photo" src="https://solodeportes.com.ar/ess.jpg"></span>
+  </a>
+  <div class="brand-container"><img class="brand" alt="Adidas"></div>
+  <p class="product-item-name">Remera Adidas Essentials Blanca</p>
+  <p class="product-item-sku">SKU: <span class="value">IC9286</span></p>
+  <div class="price-box">
+    <span class="special-price"><span class="price">$ 24.999</span></span>
+    <span class="old-price"><span class="price">$ 34.999</span></span>
+  </div>
+  <span class="quotes-pdp">28% OFF</span>
+</li>""",
+    "solourbano": """
+<li class="item product product-item">
+  <div class="product-item-photo"><img class="product-image-photo" src="https://solourbano.com.ar/gazelle.jpg"></div>
+  <a href="https://www.solourbano.com.ar/zapatillas-adidas-gazelle.html">Zapatillas adidas Gazelle</a>
+  <div class="brand-container"><img class="brand" alt="adidas Originals"></div>
+  <p class="product-item-name">Zapatillas adidas Gazelle Azul</p>
+  <p class="product-item-sku"><span class="value">BB5478</span></p>
+  <div class="price-box">
+    <span class="special-price"><span class="price"><span>$</span> <span>119.999</span></span></span>
+    <span class="old-price"><span class="price">$ 149.999</span></span>
+    <span class="quotes-pdp">20 % OFF</span>
+  </div>
+</li>""",
+    "sportline": """
+<div class="vtex-search-result-3-x-galleryItem">
+  <a class="vtex-product-summary-2-x-clearLink" href="/buzo-puma-essentials-67890/p">
+    <img class="sportline-custom-product-summary-image-0-x-mainImageHovered" src="https://sportline.vteximg.com.br/ess.jpg">
+    <h3 class="vtex-product-summary-2-x-productNameContainer">Buzo Puma Essentials Gris</h3>
+    <span class="vtex-store-components-3-x-productBrandName">Puma</span>
+    <span class="vtex-product-price-1-x-listPriceValue">$ 69.999</span>
+    <span class="vtex-product-price-1-x-sellingPriceValue">$ 55.999</span>
+    <span class="vtex-product-price-1-x-savingsPercentage">20%</span>
+    <span class="vtex-product-price-1-x-installmentsNumber">3</span>
+    <div class="cruce-admin-free-shipping-2-x-highlightContainer">Envío gratis</div>
+  </a>
+</div>""",
+    "stock_center": """
+<div class="product" data-pid="AD-GY5970">
+  <img class="tile-image primary-image" src="https://stockcenter.com.ar/gy5970.jpg">
+  <div class="pdp-link"><a class="link" href="https://www.stockcenter.com.ar/mochila-adidas-classic/AD-GY5970.html">Mochila adidas Classic Negra</a></div>
+  <fieldset><legend>15% OFF</legend></fieldset>
+  <span class="sales">
+    <span class="value">$ 33.999</span>
+    <del><span class="strike-through list"><span class="value" content="39999">$ 39.999</span></span></del>
+  </span>
+  <div class="installments-container"><span>3 cuotas sin interés de $ 11.333</span></div>
+</div>""",
+}
+
+# Las tiendas VTEX/Magento pasan la tarjeta que salió del select del listado; dexter y
+# stock_center pasan un BeautifulSoup del outerHTML del elemento
+SELECTOR_TARJETA = {
+    "dash": "div.vtex-search-result-3-x-galleryItem",
+    "sportline": "div.vtex-search-result-3-x-galleryItem",
+    "solodeportes": "li.item.product.product-item",
+    "solourbano": "li.item.product.product-item",
+}
+
+ESPERADOS = {
+    "dash": {
+        "nombre": "Zapatilla Nike Revolution 7 Negra",
+        "marca": "Nike",
+        "precio": "$ 79.999",
+        "precio_anterior": "$ 99.999",
+        "descuento": "-20%",
+        "cuotas": "6 cuotas sin interés de $ 13.333",
+        "envio_gratis": "Envío gratis",
+        "imagen_url": "https://dash.vteximg.com.br/rev7.jpg",
+        "link": "https://www.dashdeportes.com.ar/zapatilla-nike-revolution-7-12345/p",
+        "id_producto": "12345",
+        "talles": ["40", "41"],
+        "categoria": "Hombre",
+        "clase_de_producto": "Calzado",
+        "nombre_pagina": "Dash",
+        "tipo_de_producto": "Zapatilla",
+        "variante": "negro",
+    },
+    "dexter": {
+        "id_producto": "NK-DV3853-001",
+        "sku": "NK-DV3853-001",
+        "modelo_id": "NK-DV3853-001",
+        "nombre": "Zapatilla Nike Revolution 7",
+        "link": "https://www.dexter.com.ar/zapatilla-nike-revolution-7/NK-DV3853-001.html",
+        "precio": "$ 80.499",
+        "precio_anterior": "114999.00",
+        "descuento": "30% OFF",
+        "cuotas": "6 cuotas sin interés de $ 13.416",
+        "imagen_url": "https://dexter.com.ar/dv3853.jpg",
+        "categoria": "Hombre",
+        "clase_de_producto": "Calzado",
+        "nombre_pagina": "Dexter",
+        "tipo_de_producto": "Zapatilla",
+        "variante": "N/A",
+    },
+    "solodeportes": {
+        "nombre": "Remera Adidas Essentials Blanca",
+        "id_producto": "IC9286",
+        "sku": "IC9286",
+        "modelo_id": "IC9286",
+        "link": "https://www.solodeportes.com.ar/remera-adidas-essentials.html",
+        "imagen_url": "https://solodeportes.com.ar/ess.jpg",
+        "marca": "Adidas",
+        "precio": "$ 24.999",
+        "precio_anterior": "$ 34.999",
+        "descuento": "28% OFF",
+        "categoria": "Hombre",
+        "clase_de_producto": "Indumentaria",
+        "nombre_pagina": "SoloDeportes",
+        "tipo_de_producto": "Remera",
+        "variante": "blanco",
+    },
+    "solourbano": {
+        "nombre": "Zapatillas adidas Gazelle Azul",
+        "id_producto": "BB5478",
+        "sku": "BB5478",
+        "modelo_id": "BB5478",
+        "link": "https://www.solourbano.com.ar/zapatillas-adidas-gazelle.html",
+        "imagen_url": "https://solourbano.com.ar/gazelle.jpg",
+        "marca": "adidas Originals",
+        "precio": "$119.999",
+        "precio_anterior": "$ 149.999",
+        "descuento": "20 % OFF",
+        "categoria": "Hombre",
+        "clase_de_producto": "Calzado",
+        "nombre_pagina": "Solo Urbano",
+        "tipo_de_producto": "Zapatillas",
+        "variante": "azul",
+    },
+    "sportline": {
+        "nombre": "Buzo Puma Essentials Gris",
+        "marca": "Puma",
+        "precio": "$ 55.999",
+        "precio_anterior": "$ 69.999",
+        "descuento": "20%",
+        "imagen_url": "https://sportline.vteximg.com.br/ess.jpg",
+        "link": "https://www.sportline.com.ar/buzo-puma-essentials-67890/p",
+        "id_producto": "67890",
+        "sku": "67890",
+        "modelo_id": "67890",
+        "cuotas": "3 cuotas sin interés",
+        "envio_gratis": True,
+        "categoria": "Hombre",
+        "clase_de_producto": "Indumentaria",
+        "nombre_pagina": "Sportline",
+        "tipo_de_producto": "Buzo",
+        "variante": "gris",
+    },
+    "stock_center": {
+        "id_producto": "AD-GY5970",
+        "sku": "AD-GY5970",
+        "modelo_id": "AD-GY5970",
+        "nombre": "Mochila adidas Classic Negra",
+        "link": "https://www.stockcenter.com.ar/mochila-adidas-classic/AD-GY5970.html",
+        "precio": "$ 33.999",
+        "precio_anterior": "39999",
+        "descuento": "15% OFF",
+        "cuotas": "3 cuotas sin interés de $ 11.333",
+        "imagen_url": "https://stockcenter.com.ar/gy5970.jpg",
+        "categoria": "Hombre",
+        "clase_de_producto": "Accesorios",
+        "nombre_pagina": "StockCenter",
+        "tipo_de_producto": "Mochila",
+        "variante": "negro",
+    },
+}
+
+
+def tarjeta(tienda, html=None):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html or TARJETAS[tienda], "html.parser")
+    return soup.select_one(SELECTOR_TARJETA[tienda]) if tienda in SELECTOR_TARJETA else soup
+
+
+class Recorrido:
+    """Raíz que cuenta cuántos nodos recorre el extractor."""
+
+    def __init__(self, raiz):
+        self.raiz = raiz
+        self.visitados = 0
+
+    @property
+    def descendants(self):
+        for nodo in self.raiz.descendants:
+            self.visitados += 1
+            yield nodo
+
+
+class ExtractorTests(SimpleTestCase):
+    def extractor(self, tienda):
+        # Uno nuevo por test: los contadores de aciertos arrancan en cero
+        return Specs.desde_archivo(settings.SELECTORES_PATH).extractores[tienda]
+
+    def test_tarjeta_completa_por_tienda(self):
+        self.assertEqual(set(TARJETAS), set(Specs.desde_archivo(settings.SELECTORES_PATH).extractores))
+        for tienda, esperado in ESPERADOS.items():
+            with self.subTest(tienda=tienda):
+                self.assertEqual(self.extractor(tienda).extraer(tarjeta(tienda), "Hombre"), esperado)
+
+    def test_selector_de_respaldo_y_tasas(self):
+        extractor = self.extractor("solodeportes")
+        sin_oferta = TARJETAS["solodeportes"].replace(
+            '<span class="special-price"><span class="price">$ 24.999</span></span>\n', ""
+        ).replace('<div class="brand-container"><img class="brand" alt="Adidas"></div>', "")
+        extractor.extraer(tarjeta("solodeportes"), "Hombre")
+        producto = extractor.extraer(tarjeta("solodeportes", sin_oferta), "Hombre")
+        # Sin special-price el precio sale del price-box (el precio anterior, como hacía el parser)
+        self.assertEqual(producto["precio"], "$ 34.999")
+        self.assertIsNone(producto["marca"])
+        tasas = extractor.tasas()
+        self.assertEqual(tasas["precio"], {
+            "total": 2, "hit_rate": 1.0, "fallback_rate": 0.5, "by_selector": {"0": 1, "1": 1},
+        })
+        self.assertEqual(tasas["marca"], {
+            "total": 2, "hit_rate": 0.5, "fallback_rate": 0.0, "by_selector": {"0": 1, SIN_DATO: 1},
+        })
+        # Los campos "de" no tienen selectores propios: no se cuentan
+        self.assertNotIn("sku", tasas)
+
+    def test_respaldo_de_sportline(self):
+        html = TARJETAS["sportline"].replace(
+            '<span class="vtex-product-price-1-x-savingsPercentage">20%</span>',
+            '<div class="vtex-store-components-3-x-discountInsideContainer">-25%</div>',
+        )
+        producto = self.extractor("sportline").extraer(tarjeta("sportline", html), "Hombre")
+        self.assertEqual(producto["descuento"], "-25%")
+
+    def test_gana_el_selector_principal_aunque_el_respaldo_aparezca_antes(self):
+        extractor = Extractor("prueba", {
+            "nombre_pagina": "Prueba",
+            "campos": {
+                "nombre": {"css": "h3.nombre"},
+                "precio": {"css": ["span.oferta", "span.precio"]},
+            },
+        })
+        html = '<div><span class="precio">$ 100</span><h3 class="nombre">Short</h3><span class="oferta">$ 80</span></div>'
+        self.assertEqual(extractor.extraer(tarjeta("prueba", html), "Hombre")["precio"], "$ 80")
+
+    def test_deja_de_recorrer_cuando_resolvio_todos_los_campos(self):
+        extractor = self.extractor("sportline")
+        self.assertEqual(extractor.resolubles, 9)
+        relleno = '<div class="vtex-product-summary-2-x-extra"><span>otro</span></div>' * 50
+        html = TARJETAS["sportline"].replace("</a>\n</div>", f"</a>\n{relleno}</div>")
+        raiz = Recorrido(tarjeta("sportline", html))
+        self.assertEqual(extractor.extraer(raiz, "Hombre"), ESPERADOS["sportline"])
+        # El relleno del final (150 nodos) no se recorre
+        self.assertLess(raiz.visitados, len(list(raiz.raiz.descendants)) - 100)
+
+    def test_campo_todos_recorre_la_tarjeta_entera(self):
+        extractor = self.extractor("dash")
+        self.assertIsNone(extractor.resolubles)
+        html = TARJETAS["dash"].replace("</a>\n</div>", '</a>\n<div class="dash-theme-6-x-item">42</div>\n</div>')
+        raiz = Recorrido(tarjeta("dash", html))
+        self.assertEqual(extractor.extraer(raiz, "Hombre")["talles"], ["40", "41", "42"])
+        self.assertEqual(raiz.visitados, len(list(raiz.raiz.descendants)))
+
+    def test_presencia(self):
+        html = TARJETAS["sportline"].replace(
+            '<div class="cruce-admin-free-shipping-2-x-highlightContainer">Envío gratis</div>', ""
+        )
+        producto = self.extractor("sportline").extraer(tarjeta("sportline", html), "Hombre")
+        self.assertIsNone(producto["envio_gratis"])
+
+    def test_de_copia_el_valor_crudo_del_otro_campo(self):
+        extractor = self.extractor("sportline")
+        html = TARJETAS["sportline"].replace('href="/buzo-puma-essentials-67890/p"', 'href="/buzo-puma-11111/p"')
+        producto = extractor.extraer(tarjeta("sportline", html), "Hombre")
+        # El link pasa por url_absoluta; id, sku y modelo toman el href sin el dominio
+        self.assertEqual(producto["link"], "https://www.sportline.com.ar/buzo-puma-11111/p")
+        self.assertEqual((producto["id_producto"], producto["sku"], producto["modelo_id"]), ("11111",) * 3)
+        sin_link = TARJETAS["sportline"].replace('href="/buzo-puma-essentials-67890/p"', "")
+        producto = extractor.extraer(tarjeta("sportline", sin_link), "Hombre")
+        self.assertEqual((producto["link"], producto["id_producto"], producto["sku"]), (None, None, None))
+
+    def test_spec_invalido(self):
+        with self.assertRaises(ValueError):
+            Extractor("prueba", {"nombre_pagina": "Prueba", "campos": {"sku": {"de": "id"}, "id": {"css": "span.id"}}})
+        with self.assertRaises(ValueError):
+            Extractor("prueba", {"nombre_pagina": "Prueba", "campos": {"id": {"css": "span.id", "post": "no_existe"}}})
+
+    def test_solourbano_precio_anterior_sin_oferta(self):
+        # Diferencia aceptada con el parser anterior: el precio anterior se toma aunque no haya special-price
+        html = TARJETAS["solourbano"].replace(
+            '<span class="special-price"><span class="price"><span>$</span> <span>119.999</span></span></span>\n', ""
+        )
+        producto = self.extractor("solourbano").extraer(tarjeta("solourbano", html), "Hombre")
+        self.assertEqual(producto["precio"], "$ 149.999")
+        self.assertEqual(producto["precio_anterior"], "$ 149.999")
+
+    def test_img_sin_src_no_descarta_el_producto(self):
+        # Diferencia aceptada con el parser anterior: antes se perdía el producto entero
+        html = TARJETAS["dexter"].replace('src="https://dexter.com.ar/dv3853.jpg"', "")
+        producto = self.extractor("dexter").extraer(tarjeta("dexter", html), "Hombre")
+        self.assertIsNone(producto["imagen_url"])
+        self.assertEqual(producto["nombre"], ESPERADOS["dexter"]["nombre"])
+
+
+class Reloj:
+    """Reloj falso para la cubeta: dormir() avanza el tiempo en vez de esperar."""
+
+    def __init__(self):
+        self.ahora = 1000.0
+        self.dormido = []
+
+    def __call__(self):
+        return self.ahora
+
+    def avanzar(self, segundos):
+        self.ahora += segundos
+
+    def dormir(self, segundos):
+        self.dormido.append(segundos)
+        self.ahora += segundos
+
+
+class CubetaTests(SimpleTestCase):
+    def setUp(self):
+        self.reloj = Reloj()
+
+    def cubeta(self, tasa=2, rafaga=3):
+        return Cubeta(tasa, rafaga, reloj=self.reloj, dormir=self.reloj.dormir)
+
+    def test_rafaga_sin_espera_y_despues_al_ritmo_de_la_tasa(self):
+        cubeta = self.cubeta(tasa=2, rafaga=3)
+        self.assertEqual([cubeta.adquirir() for _ in range(3)], [0, 0, 0])
+        self.assertEqual(self.reloj.dormido, [])
+        self.assertAlmostEqual(cubeta.adquirir(), 0.5)
+        self.assertAlmostEqual(cubeta.adquirir(), 0.5)
+        self.assertEqual(len(self.reloj.dormido), 2)
+
+    def test_recarga_con_el_tiempo_hasta_la_rafaga(self):
+        cubeta = self.cubeta(tasa=2, rafaga=3)
+        for _ in range(3):
+            cubeta.adquirir()
+        self.reloj.avanzar(1)
+        self.assertEqual([cubeta.adquirir() for _ in range(2)], [0, 0])
+        self.assertAlmostEqual(cubeta.adquirir(), 0.5)
+        # Parada mucho tiempo no junta más que la ráfaga
+        self.reloj.avanzar(60)
+        self.assertEqual([cubeta.adquirir() for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(cubeta.adquirir(), 0.5)
+
+    def test_frenar_divide_la_tasa_y_acelerar_la_recupera_de_a_poco(self):
+        cubeta = self.cubeta(tasa=2, rafaga=1)
+        cubeta.frenar()
+        self.assertEqual(cubeta.tasa, 1)
+        cubeta.adquirir()
+        self.assertAlmostEqual(cubeta.adquirir(), 1.0)
+        for _ in range(10):
+            cubeta.frenar()
+        # Nunca por debajo de FRACCION_RECUPERO de la tasa configurada
+        self.assertAlmostEqual(cubeta.tasa, 0.2)
+        cubeta.acelerar()
+        self.assertAlmostEqual(cubeta.tasa, 0.4)
+        for _ in range(20):
+            cubeta.acelerar()
+        self.assertEqual(cubeta.tasa, 2)
+
+    def test_tasa_cero_no_limita(self):
+        cubeta = self.cubeta(tasa=0, rafaga=1)
+        self.assertEqual([cubeta.adquirir() for _ in range(5)], [0.0] * 5)
+
+
+def pedido(control, latencia=0.1, resultado=OK):
+    control.entrar()
+    return control.salir(latencia, resultado)
+
+
+class ControlAIMDTests(SimpleTestCase):
+    def test_aumento_aditivo_por_ventana_sana_hasta_el_maximo(self):
+        control = ControlAIMD(minimo=1, inicial=2, maximo=4)
+        self.assertEqual([pedido(control) for _ in range(2)], [0, 1])
+        self.assertEqual(control.limite, 3)
+        # La ventana crece con el límite: hacen falta 3 pedidos sanos para pasar a 4
+        self.assertEqual([pedido(control) for _ in range(3)], [0, 0, 1])
+        self.assertEqual(control.limite, 4)
+        self.assertEqual({pedido(control) for _ in range(10)}, {0})
+        self.assertEqual(control.limite, 4)
+
+    def test_sobrecarga_divide_el_limite_una_vez_por_ventana(self):
+        control = ControlAIMD(minimo=1, inicial=8, maximo=8)
+        for _ in range(4):
+            control.entrar()
+        # Los cuatro pedidos en vuelo vuelven con 429: solo el primero retrocede
+        cambios = [control.salir(0.1, SOBRECARGA) for _ in range(4)]
+        self.assertEqual(cambios, [-1, 0, 0, 0])
+        self.assertEqual(control.limite, 4)
+        for _ in range(20):
+            pedido(control, resultado=SOBRECARGA)
+        self.assertEqual(control.limite, 1)
+
+    def test_latencia_fuera_de_tolerancia_achica_a_tres_cuartos(self):
+        control = ControlAIMD(minimo=1, inicial=8, maximo=8, tolerancia=2.0, suavizado=1.0)
+        for _ in range(3):
+            pedido(control, latencia=0.1)
+        # El doble de la mejor latencia todavía es sana; más, no
+        self.assertEqual(pedido(control, latencia=0.2), 0)
+        self.assertEqual(control.limite, 8)
+        self.assertEqual(pedido(control, latencia=0.5), -1)
+        self.assertEqual(control.limite, 6)
+
+    def test_error_comun_no_mueve_el_limite(self):
+        control = ControlAIMD(minimo=1, inicial=3, maximo=8)
+        self.assertEqual({pedido(control, resultado="error") for _ in range(10)}, {0})
+        self.assertEqual(control.limite, 3)
+
+    def test_dominio_frena_la_cubeta_al_retroceder(self):
+        ritmo = Dominio("prueba.local", rps=4, rafaga=8, minimo=1, inicial=4, maximo=4, tolerancia=2.0)
+        with ritmo.turno() as turno:
+            turno.marcar(SOBRECARGA, "429")
+        self.assertEqual(ritmo.limite, 2)
+        self.assertEqual(ritmo.cubeta.tasa, 2)
@@ -0,0 +1,159 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from django.conf import settings
+
+TRAZAS_ACTIVAS = getattr(settings, "TRAZAS_ACTIVAS", False)
+# Cada cuántos spans se escribe una línea al archivo
+SPANS_POR_LINEA = 200
+SERVICIO = "scraper_dex"
+PATRON_SESSION_ID = re.compile(r"(\d{8}_\d{6})")
+
+_trazador = None
+
+
+def _atributos(valores):
+    atributos = []
+    for clave, valor in valores.items():
+        if valor is None:
+            continue
+        if isinstance(valor, bool):
+            tipado = {"boolValue": valor}
+        elif isinstance(valor, int):
+            tipado = {"intValue": str(valor)}
+        elif isinstance(valor, float):
+            tipado = {"doubleValue": valor}
+        else:
+            tipado = {"stringValue": str(valor)}
+        atributos.append({"key": clave, "value": tipado})
+    return atributos
+
+
+class Trazador:
+    """
+    Tracing mínimo compatible con OpenTelemetry: exporta los spans en formato OTLP/JSON
+    (una ExportTraceServiceRequest por línea, lo que lee el receiver otlpjsonfile del
+    collector) a outputs/<store>/trazas_<run_id>.jsonl.
+
+    El trace_id sale del run_id (BaseScraper.session_id), así que el scraper y el
+    import del JSON que generó caen en la misma traza.
+    """
+    def __init__(self, run_id, store):
+        self.run_id = run_id
+        self.store = store
+        self.trace_id = hashlib.md5(run_id.encode()).hexdigest()
+        output_dir = f"outputs/{store}"
+        os.makedirs(output_dir, exist_ok=True)
+        self.path = os.path.join(output_dir, f"trazas_{run_id}.jsonl")
+        self.pendientes = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.raiz = None
+
+    @contextmanager
+    def span(self, nombre, **atributos):
+        pila = getattr(self.local, "pila", None)
+        if pila is None:
+            pila = self.local.pila = []
+        # Los spans de hilos worker cuelgan del span raíz de la corrida
+        padre = pila[-1] if pila else self.raiz
+        span_id = os.urandom(8).hex()
+        if self.raiz is None:
+            self.raiz = span_id
+        atributos.setdefault("thread.name", threading.current_thread().name)
+        estado = {"code": "STATUS_CODE_OK"}
+        inicio = time.time_ns()
+        pila.append(span_id)
+        try:
+            yield
+        except BaseException as e:
+            estado = {"code": "STATUS_CODE_ERROR", "message": str(e)[:500]}
+            raise
+        finally:
+            pila.pop()
+            self._agregar({
+                "traceId": self.trace_id,
+                "spanId": span_id,
+                "parentSpanId": padre or "",
+                "name": nombre,
+                "kind": 1,
+                "startTimeUnixNano": str(inicio),
+                "endTimeUnixNano": str(time.time_ns()),
+                "attributes": _atributos(atributos),
+                "status": estado,
+            })
+
+    def _agregar(self, span):
+        with self.lock:
+            self.pendientes.append(span)
+            if len(self.pendientes) >= SPANS_POR_LINEA:
+                self._escribir()
+
+    def _escribir(self):
+        if not self.pendientes:
+            return
+        linea = {
+            "resourceSpans": [{
+                "resource": {"attributes": _atributos({
+                    "service.name": SERVICIO,
+                    "scraper.store": self.store,
+                    "scraper.run_id": self.run_id,
+                })},
+                "scopeSpans": [{"scope": {"name": "scrapers.trazas"}, "spans": self.pendientes}],
+            }]
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(linea, ensure_ascii=False) + "\n")
+        self.pendientes = []
+
+    def cerrar(self):
+        with self.lock:
+            self._escribir()
+
+
+def run_id_desde_archivo(path):
+    """Session id (YYYYmmdd_HHMMSS) del nombre del JSON que generó el scraper, si lo tiene."""
+    m = PATRON_SESSION_ID.search(os.path.basename(str(path)))
+    return m.group(1) if m else None
+
+
+@contextmanager
+def traza(run_id, store, nombre, **atributos):
+    """Abre la traza de una corrida con su span raíz; sin TRAZAS_ACTIVAS no hace nada."""
+    global _trazador
+    if not TRAZAS_ACTIVAS or _trazador is not None:
+        with span(nombre, **atributos):
+            yield
+        return
+
+    _trazador = Trazador(run_id, store)
+    try:
+        with _trazador.span(nombre, **{"scraper.run_id": run_id, **atributos}):
+            yield
+    finally:
+        _trazador.cerrar()
+        _trazador = None
+
+
+def span(nombre, **atributos):
+    if _trazador is None:
+        return nullcontext()
+    return _trazador.span(nombre, **atributos)
+
+
+def trazado(nombre):
+    """Decorador: corre la función dentro de un span."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def wrapper(*args, **kwargs):
+            if _trazador is None:
+                return funcion(*args, **kwargs)
+            with _trazador.span(nombre):
+                return funcion(*args, **kwargs)
+        return wrapper
+    return decorador
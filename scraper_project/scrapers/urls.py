@@ -1,6 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import test_connection, run_scraper_dash, run_dash_more_threads, run_management_command
+from .views import (
+    test_connection, run_scraper_dash, run_dash_more_threads, run_management_command, job_detail,
+    run_progress, run_progress_stream,
+)
 
 router = DefaultRouter()
 
@@ -10,5 +13,8 @@ urlpatterns = [
     path('run-dash-more-threads/', run_dash_more_threads, name='run-dash-more-threads'),
 
     path('run-command/', run_management_command, name='run-management-command'),
+    path('jobs/<int:job_id>/', job_detail, name='job-detail'),
+    path('runs/<int:run_id>/progress/', run_progress, name='run-progress'),
+    path('runs/<int:run_id>/progress/stream/', run_progress_stream, name='run-progress-stream'),
 
 ]
\ No newline at end of file
@@ -1,22 +1,15 @@
 import os
 import logging
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
-import os
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from django.conf import settings
+from scrapers.metricas import CREACION_DRIVER
+from scrapers.alertas import despachador
+from scrapers.circuito import CircuitoAbierto, circuito
 
 load_dotenv()
 
-SLACK_TOKEN = os.getenv("SLACK_BOT_TOKEN")
-SLACK_ALERT_USERS = os.getenv("SLACK_ALERT_USERS", "")
-SLACK_CHANNEL = os.getenv("SLACK_CHANNEL")
-
-client = WebClient(token=SLACK_TOKEN)
-
 def setup_logger(name, output_dir="logs"):
     os.makedirs(output_dir, exist_ok=True)
     log_file = os.path.join(output_dir, f"log_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
@@ -41,23 +34,79 @@ def setup_logger(name, output_dir="logs"):
     return logger
 
 def send_alert_message(message):
+    """
+    Encola la alerta y vuelve enseguida: la manda el hilo de scrapers.alertas
+    (con coalescing de repetidas, rate limit y digest).
+    """
+    despachador().enviar(message)
+
+
+# Circuito del endpoint remoto de browserless (BROWSER_WEBDRIVER_ENDPOINT)
+CIRCUITO_REMOTO = "browserless"
+
+_respaldo = None
+_respaldo_lock = threading.Lock()
+
+
+def initialize_driver_remote(store=""):
+    """
+    Driver del endpoint remoto, a través del circuit breaker. Con el circuito abierto
+    levanta CircuitoAbierto sin intentar la conexión o, si CIRCUITO_RESPALDO_LOCAL > 0,
+    devuelve un driver local mientras haya lugar en ese pool reducido.
+    """
+    try:
+        return circuito(CIRCUITO_REMOTO).llamar(_medir_remote, store)
+    except CircuitoAbierto:
+        driver = _driver_respaldo(store)
+        if driver is None:
+            raise
+        return driver
+
+
+def _medir_remote(store):
+    with CREACION_DRIVER.medir(store=store, mode="remote"):
+        return _crear_driver_remote()
+
+
+def _driver_respaldo(store):
+    """Driver local que ocupa un lugar del pool de respaldo hasta su quit(); None si no hay lugar."""
+    global _respaldo
+    with _respaldo_lock:
+        if _respaldo is None:
+            _respaldo = threading.Semaphore(settings.CIRCUITO_RESPALDO_LOCAL)
+    if not _respaldo.acquire(blocking=False):
+        return None
     try:
-        # Enviar al canal
-        # if SLACK_CHANNEL:
-        #     client.chat_postMessage(channel=SLACK_CHANNEL, text=message)
-        #     print(f"✅ Alerta enviada al canal: {SLACK_CHANNEL}")
+        driver = initialize_driver_local(store)
+    except Exception as e:
+        _respaldo.release()
+        logging.getLogger(__name__).warning(f"No se pudo crear el driver local de respaldo: {e}")
+        return None
+
+    quit_original = driver.quit
+    liberado = threading.Event()
+
+    def quit():
+        try:
+            quit_original()
+        finally:
+            if not liberado.is_set():
+                liberado.set()
+                _respaldo.release()
+
+    driver.quit = quit
+    return driver
 
-        # Enviar a usuarios privados
-        user_ids = [uid.strip() for uid in SLACK_ALERT_USERS.split(",") if uid.strip()]
-        for user_id in user_ids:
-            client.chat_postMessage(channel=user_id, text=message)
-            print(f"✅ Alerta enviada a usuario: {user_id}")
 
-    except SlackApiError as e:
-        print(f"❌ Error al enviar alerta a Slack: {e.response['error']}")
+def initialize_driver_local(store=""):
+    with CREACION_DRIVER.medir(store=store, mode="local"):
+        return _crear_driver_local()
 
 
-def initialize_driver_remote():
+def _crear_driver_remote():
+    # selenium se importa acá y no arriba: cuesta ~100 ms y los comandos que no
+    # abren navegador (imports, worker, web) no lo necesitan
+    from selenium import webdriver
 
     chrome_options = webdriver.ChromeOptions()
     chrome_options.set_capability('browserless:token', os.environ['BROWSER_TOKEN'])
@@ -74,7 +123,11 @@ def initialize_driver_remote():
     driver.implicitly_wait(1)
     return driver
 
-def initialize_driver_local():
+def _crear_driver_local():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
     service = Service(ChromeDriverManager().install())
     options = webdriver.ChromeOptions()
     options.add_argument("--window-size=1920,1080")
@@ -0,0 +1,189 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from scrapers.trazas import span, trazado
+from scrapers.models import (
+    Brand, Category, Product, ProductPage,
+    Pricing, ProductQuota, Size, ProductSize
+)
+
+BATCH_SIZE = 500
+
+CAMPOS_PRODUCTO = [
+    "name", "brand", "category", "product_class", "sku",
+    "image_url", "link", "provider_code", "updated_at",
+]
+CAMPOS_PRODUCT_PAGE = ["cuotas", "payment_info", "shipping_info"]
+CAMPOS_PRECIO = ("price_current", "price_prev", "discount")
+
+# Orden de borrado: primero las tablas hijas, al final product
+ORDEN_PURGA = [
+    ("product_size", "DELETE FROM product_size WHERE product_id IN (SELECT id FROM _purga_productos)"),
+    ("product_quota", "DELETE FROM product_quota WHERE page_id = %(page)s OR product_id IN (SELECT id FROM _purga_productos)"),
+    ("product_variant", "DELETE FROM product_variant WHERE product_id IN (SELECT id FROM _purga_productos)"),
+    ("pricing", "DELETE FROM pricing WHERE page_id = %(page)s OR product_id IN (SELECT id FROM _purga_productos)"),
+    ("product_page", "DELETE FROM product_page WHERE page_id = %(page)s OR product_id IN (SELECT id FROM _purga_productos)"),
+    ("product", "DELETE FROM product WHERE id IN (SELECT id FROM _purga_productos)"),
+]
+
+
+def obtener_ids_por_nombre(modelo, nombres):
+    """
+    get_or_create masivo para las tablas con `name` único (Brand, Category, Size):
+    un INSERT ... ON CONFLICT DO NOTHING y un SELECT para armar el mapa nombre → id.
+    """
+    nombres = {n for n in nombres if n is not None}
+    if not nombres:
+        return {}
+    modelo.objects.bulk_create([modelo(name=n) for n in nombres], ignore_conflicts=True)
+    return dict(modelo.objects.filter(name__in=nombres).values_list("name", "id"))
+
+
+@trazado("purgar_pagina")
+def purgar_pagina(page):
+    """
+    Borra todo lo relacionado con una página con DELETEs por conjunto, sin pasar
+    por el collector de Django (que trae cada objeto relacionado a Python antes
+    de borrarlo). Devuelve la cantidad de filas borradas por tabla.
+    """
+    borrados = {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS _purga_productos")
+        cursor.execute(
+            "CREATE TEMP TABLE _purga_productos ON COMMIT DROP AS "
+            "SELECT DISTINCT product_id AS id FROM product_page WHERE page_id = %(page)s",
+            {"page": page.pk},
+        )
+        for tabla, sql in ORDEN_PURGA:
+            cursor.execute(sql, {"page": page.pk})
+            borrados[tabla] = cursor.rowcount
+        cursor.execute("DROP TABLE _purga_productos")
+    return borrados
+
+
+def precio_cambio(ultimo, precio):
+    """True si `precio` (dict de campos de Pricing) difiere del último Pricing registrado."""
+    if ultimo is None:
+        return True
+    return tuple(getattr(ultimo, c) for c in CAMPOS_PRECIO) != tuple(precio.get(c) for c in CAMPOS_PRECIO)
+
+
+def registrar_precio(product, page, precio):
+    """
+    Historial de precios solo con cambios: crea un Pricing únicamente si el precio,
+    el precio anterior o el descuento difieren del último registrado.
+    """
+    ultimo = Pricing.objects.filter(product=product, page=page).order_by("-recorded_at", "-id").first()
+    if not precio_cambio(ultimo, precio):
+        return None
+    return Pricing.objects.create(product=product, page=page, **precio)
+
+
+@trazado("refrescar_ultimos_precios")
+def refrescar_ultimos_precios():
+    """Refresca la vista materializada latest_pricing (último precio por producto y página)."""
+    with connection.cursor() as cursor:
+        cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY latest_pricing")
+
+
+def upsert_productos(page, filas, now=None, batch_size=BATCH_SIZE):
+    """
+    Inserta o actualiza productos de una página usando model_code como clave natural.
+
+    Cada fila es un dict con:
+      - model_code
+      - producto: campos de Product (brand y category por nombre)
+      - pagina: campos de ProductPage
+      - precio: campos de Pricing, o None si no hay precio
+      - talles: lista de (nombre, available)
+      - cuotas: lista de campos de ProductQuota, o None para no tocarlas
+
+    Los productos existentes se actualizan, se agrega un Pricing solo si cambió el
+    precio respecto del último registrado, y los talles/cuotas se reemplazan en bloque.
+    """
+    now = now or timezone.now()
+    # Si el JSON trae el mismo model_code repetido, gana el último
+    filas = list({f["model_code"]: f for f in filas}.values())
+
+    stats = dict.fromkeys(["creados", "actualizados", "precios", "talles", "cuotas"], 0)
+    marcas = obtener_ids_por_nombre(Brand, (f["producto"]["brand"] for f in filas))
+    categorias = obtener_ids_por_nombre(Category, (f["producto"]["category"] for f in filas))
+    talles = obtener_ids_por_nombre(Size, (t for f in filas for t, _ in f["talles"]))
+
+    for i in range(0, len(filas), batch_size):
+        lote = filas[i:i + batch_size]
+        with span("import.lote", **{"import.page_id": page.pk, "import.filas": len(lote)}):
+            _upsert_lote(page, lote, now, marcas, categorias, talles, stats)
+    return stats
+
+
+def _upsert_lote(page, lote, now, marcas, categorias, talles, stats):
+    existentes = dict(
+        Product.objects.filter(
+            pages__page=page, model_code__in=[f["model_code"] for f in lote]
+        ).values_list("model_code", "id")
+    )
+
+    nuevos, actualizar = [], []
+    for fila in lote:
+        datos = dict(fila["producto"])
+        datos["brand_id"] = marcas[datos.pop("brand")]
+        datos["category_id"] = categorias[datos.pop("category")]
+        producto = Product(model_code=fila["model_code"], updated_at=now, **datos)
+        if fila["model_code"] in existentes:
+            producto.pk = existentes[fila["model_code"]]
+            actualizar.append(producto)
+        else:
+            producto.created_at = now
+            nuevos.append(producto)
+
+    # En Postgres bulk_create devuelve los ids generados
+    Product.objects.bulk_create(nuevos)
+    Product.objects.bulk_update(actualizar, CAMPOS_PRODUCTO)
+    stats["creados"] += len(nuevos)
+    stats["actualizados"] += len(actualizar)
+    ids = {p.model_code: p.pk for p in nuevos + actualizar}
+
+    ProductPage.objects.bulk_create(
+        [ProductPage(product_id=ids[f["model_code"]], page=page, **f["pagina"]) for f in lote],
+        update_conflicts=True,
+        unique_fields=["product", "page"],
+        update_fields=CAMPOS_PRODUCT_PAGE,
+    )
+
+    ultimos = {
+        p.product_id: p
+        for p in Pricing.objects.filter(page=page, product_id__in=list(existentes.values()))
+        .order_by("product_id", "-recorded_at", "-id")
+        .distinct("product_id")
+    }
+    precios = []
+    for fila in lote:
+        precio = fila["precio"]
+        if not precio or precio.get("price_current") is None:
+            continue
+        product_id = ids[fila["model_code"]]
+        if not precio_cambio(ultimos.get(product_id), precio):
+            continue
+        precios.append(Pricing(product_id=product_id, page=page, **precio))
+    Pricing.objects.bulk_create(precios)
+    stats["precios"] += len(precios)
+
+    ProductSize.objects.filter(product_id__in=ids.values()).delete()
+    nuevos_talles = ProductSize.objects.bulk_create([
+        ProductSize(product_id=ids[f["model_code"]], size_id=talles[nombre], available=disponible)
+        for f in lote
+        for nombre, disponible in f["talles"]
+    ])
+    stats["talles"] += len(nuevos_talles)
+
+    con_cuotas = [f for f in lote if f["cuotas"] is not None]
+    if con_cuotas:
+        ProductQuota.objects.filter(
+            page=page, product_id__in=[ids[f["model_code"]] for f in con_cuotas]
+        ).delete()
+        nuevas_cuotas = ProductQuota.objects.bulk_create([
+            ProductQuota(product_id=ids[f["model_code"]], page=page, **cuota)
+            for f in con_cuotas
+            for cuota in f["cuotas"]
+        ])
+        stats["cuotas"] += len(nuevas_cuotas)
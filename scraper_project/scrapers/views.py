@@ -1,11 +1,15 @@
+import json
+import time
 from django.shortcuts import render
+from django.http import HttpResponse, StreamingHttpResponse, JsonResponse
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from django.core.management import call_command
-import threading, logging
-import time
+from django.utils import timezone
+import logging
 from rest_framework import status
-from io import StringIO
+from scrapers.jobs import encolar
+from scrapers.metricas import exponer
+from scrapers.models import Job
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,7 @@ def run_scraper_dash(request):
       "output": "<nombre_de_archivo_salida opcional>",
       "local": <booleano opcional para usar driver local>
     }
+    El scraper no corre en el proceso web: se encola un Job que toma `manage.py run_worker`.
     """
     data = request.data or {}
     try:
@@ -33,62 +38,34 @@ def run_scraper_dash(request):
     output_name = data.get('output')
     local_execution = bool(data.get('local', False))
 
-    def _run():
-        try:
-            logger.info(
-                f"Thread-RunDashScraper: arrancando management command "
-                f"con threads={threads}, output={output_name}, local={local_execution}"
-            )
-
-            cmd_args = ["--threads", str(threads)]
-            if local_execution:
-                cmd_args.append("--local")
-            if output_name:
-                cmd_args += ["--output", output_name]
-
-            call_command("dash_2", *cmd_args)
-            time.sleep(1)
-            logger.info("Thread-RunDashScraper: el command finalizó o tiró error")
-        except Exception:
-            logger.exception("Hubo un error al ejecutar el scraper")
-
-    t = threading.Thread(
-        target=_run,
-        name="Thread-RunDashScraper",
-        daemon=False
-    )
-    t.start()
+    cmd_args = ["--threads", str(threads)]
+    if local_execution:
+        cmd_args.append("--local")
+    if output_name:
+        cmd_args += ["--output", output_name]
+
+    job = encolar("dash_2", cmd_args, store="dash")
+    logger.info(f"Encolado job {job.pk}: dash_2 {' '.join(cmd_args)}")
 
     return Response({
-        'status': 'started',
+        'status': 'queued',
+        'job_id': job.pk,
         'threads': threads,
         'output': output_name,
         'local': local_execution,
-        'message': 'Se ha disparado el scraper en background.'
+        'message': 'Se encoló el scraper; lo va a ejecutar un worker.'
     })
 
 
 @api_view(['POST'])
 def run_dash_more_threads(request):
-    def _run():
-        try:
-            logger.info("Thread-RunDashMoreThreads: arrancando management command sin parámetros")
-            call_command("run_dash_more_threads")
-            time.sleep(1)
-            logger.info("Thread-RunDashMoreThreads: el comando finalizó o tiró error")
-        except Exception:
-            logger.exception("Hubo un error al ejecutar run_dash_more_threads")
-
-    t = threading.Thread(
-        target=_run,
-        name="Thread-RunDashMoreThreads",
-        daemon=False
-    )
-    t.start()
+    job = encolar("run_dash_more_threads", store="dash")
+    logger.info(f"Encolado job {job.pk}: run_dash_more_threads")
 
     return Response({
-        'status': 'started',
-        'message': "Se ha disparado 'run_dash_more_threads' en background."
+        'status': 'queued',
+        'job_id': job.pk,
+        'message': "Se encoló 'run_dash_more_threads'; lo va a ejecutar un worker."
     })
 
 
@@ -115,17 +92,125 @@ def run_management_command(request):
             {"detail": "Comando no permitido"},
             status=status.HTTP_400_BAD_REQUEST
         )
+    if not isinstance(extra_args, list):
+        return Response(
+            {"detail": "'args' tiene que ser una lista"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    job = encolar(command, [*ALLOWED_COMMANDS[command], *map(str, extra_args)])
+    logger.info(f"Encolado job {job.pk}: {command} {' '.join(job.args)}")
 
-    out = StringIO()
+    return Response(
+        {"status": "queued", "job_id": job.pk},
+        status=status.HTTP_202_ACCEPTED
+    )
+
+
+def _segundos(desde, hasta):
+    if not desde or not hasta:
+        return None
+    return round((hasta - desde).total_seconds(), 3)
+
+
+@api_view(['GET'])
+def job_detail(request, job_id):
     try:
-        call_command(command, *ALLOWED_COMMANDS[command], *extra_args, stdout=out)
-    except Exception as e:
+        job = Job.objects.get(pk=job_id)
+    except Job.DoesNotExist:
         return Response(
-            {"detail": f"Error ejecutando el comando: {str(e)}"},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            {"detail": "No existe el job"},
+            status=status.HTTP_404_NOT_FOUND
         )
 
-    return Response(
-        {"output": out.getvalue()},
-        status=status.HTTP_200_OK
-    )
\ No newline at end of file
+    ahora = timezone.now()
+    return Response({
+        "id": job.pk,
+        "command": job.command,
+        "args": job.args,
+        "store": job.store,
+        "status": job.status,
+        "worker": job.worker,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "heartbeat_at": job.heartbeat_at,
+        "queued_seconds": _segundos(job.created_at, job.started_at or ahora),
+        "duration_seconds": _segundos(job.started_at, job.finished_at or ahora),
+        "progress": job.progress,
+        "output": job.output,
+        "error": job.error,
+    })
+
+
+def _progreso(job):
+    return {
+        "run_id": job.pk,
+        "status": job.status,
+        "progress": job.progress,
+        "progress_at": job.progress_at.isoformat() if job.progress_at else None,
+    }
+
+
+@api_view(['GET'])
+def run_progress(request, run_id):
+    """
+    Último snapshot de progreso publicado por la corrida (ProgressTracker):
+    items hechos/total, items/min, errores, ETA, workers activos, drivers libres, RSS.
+    """
+    try:
+        job = Job.objects.get(pk=run_id)
+    except Job.DoesNotExist:
+        return Response(
+            {"detail": "No existe la corrida"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response(_progreso(job))
+
+
+SSE_INTERVALO = 3
+# Cada conexión ocupa un worker sync de gunicorn: se corta antes de su timeout (30 s por
+# defecto) y el EventSource del cliente se reconecta solo a los SSE_RECONEXION_MS
+SSE_DURACION_MAX = 20
+SSE_RECONEXION_MS = 1000
+
+
+def run_progress_stream(request, run_id):
+    """
+    Server-Sent Events con el progreso de la corrida: manda un evento cada vez que
+    cambia el snapshot y cierra el stream cuando el job termina o falla. Cada conexión
+    dura hasta SSE_DURACION_MAX segundos; el cliente reconecta y recibe el snapshot actual.
+    """
+    if not Job.objects.filter(pk=run_id).exists():
+        return JsonResponse({"detail": "No existe la corrida"}, status=404)
+
+    def eventos():
+        yield f"retry: {SSE_RECONEXION_MS}\n\n"
+        limite = time.monotonic() + SSE_DURACION_MAX
+        ultimo = None
+        while True:
+            try:
+                job = Job.objects.get(pk=run_id)
+            except Job.DoesNotExist:
+                yield f"event: end\ndata: {json.dumps({'detail': 'No existe la corrida'}, ensure_ascii=False)}\n\n"
+                return
+            datos = _progreso(job)
+            if datos != ultimo:
+                yield f"data: {json.dumps(datos, ensure_ascii=False)}\n\n"
+                ultimo = datos
+            if job.status in (Job.TERMINADO, Job.FALLIDO):
+                yield "event: end\ndata: {}\n\n"
+                return
+            if time.monotonic() + SSE_INTERVALO > limite:
+                return
+            time.sleep(SSE_INTERVALO)
+
+    response = StreamingHttpResponse(eventos(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def metrics(request):
+    """Métricas de scrapers e importers en formato texto de Prometheus."""
+    return HttpResponse(exponer(), content_type="text/plain; version=0.0.4; charset=utf-8")